@@ -1,11 +1,75 @@
+from typing import Any
+from langchain_core.messages import BaseMessage
 from langchain_openai import ChatOpenAI
+from agents.utils.llm_scheduler import INTERACTIVE, llm_scheduler
 from config import Config
 
+# Assumed completion length when a call sets no max_tokens
+DEFAULT_COMPLETION_TOKENS = 512
 
-def get_llm(temperature: float = 0.0) -> ChatOpenAI:
-    """Return a ChatOpenAI instance configured for OpenAI."""
-    return ChatOpenAI(
+
+class ScheduledChatOpenAI(ChatOpenAI):
+    """
+    ChatOpenAI whose async calls are admitted by the shared LLMScheduler.
+
+    The OpenAI client's own retries are disabled so that 429s reach the
+    scheduler, which retries them and slows every caller down together.
+    Synchronous calls are not scheduled; the app only makes async ones.
+    """
+
+    priority: str = INTERACTIVE
+
+    def _estimate_tokens(self, messages: list[BaseMessage]) -> int:
+        prompt_chars = sum(len(str(m.content)) for m in messages)
+        return prompt_chars // 4 + (self.max_tokens or DEFAULT_COMPLETION_TOKENS)
+
+    async def _agenerate(self, messages: list[BaseMessage], stop: list[str] | None = None, run_manager=None, **kwargs: Any):
+        estimate = self._estimate_tokens(messages)
+        generate = super()._agenerate
+        result = await llm_scheduler.run(self.priority, estimate, lambda: generate(messages, stop, run_manager, **kwargs))
+        usage = (result.llm_output or {}).get("token_usage") or {}
+        if usage.get("total_tokens"):
+            llm_scheduler.record_usage(estimate, usage["total_tokens"])
+        return result
+
+    async def _astream(self, messages: list[BaseMessage], stop: list[str] | None = None, run_manager=None, **kwargs: Any):
+        # A stream cannot be replayed once started, so it is admitted once and not retried
+        await llm_scheduler.acquire(self.priority, self._estimate_tokens(messages))
+        async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+            yield chunk
+
+
+def json_response_format(name: str, schema: dict) -> dict | None:
+    """
+    Return the response_format for a call whose answer should match `schema`.
+
+    Config.LLM_RESPONSE_FORMAT picks the mode: "json_schema" (strict
+    structured output; every property must be required and objects must
+    set additionalProperties to false), "json_object" (any valid JSON, for
+    models without structured outputs) or "none" (plain text).
+    """
+    mode = Config.LLM_RESPONSE_FORMAT
+    if mode == "json_schema":
+        return {"type": "json_schema", "json_schema": {"name": name, "schema": schema, "strict": True}}
+    if mode == "json_object":
+        return {"type": "json_object"}
+    return None
+
+
+def get_llm(temperature: float = 0.0, priority: str = INTERACTIVE, response_format: dict | None = None) -> ChatOpenAI:
+    """
+    Return a ChatOpenAI instance configured for OpenAI.
+
+    Calls go through the shared LLM scheduler. Background work such as
+    ingestion passes priority=BATCH so it never holds up chat. Pass a
+    `response_format` (see json_response_format) to constrain the output.
+    """
+    model_kwargs = {"response_format": response_format} if response_format else {}
+    return ScheduledChatOpenAI(
         api_key=Config.OPENAI_API_KEY,
         model=Config.OPENAI_MODEL,
         temperature=temperature,
+        max_retries=0,
+        priority=priority,
+        model_kwargs=model_kwargs,
     )
@@ -0,0 +1,240 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import TypeVar
+import openai
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Priority classes, most urgent first
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, BATCH)
+
+# Errors the OpenAI client would retry itself; only 429s slow the scheduler down
+_RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+
+class _TokenBucket:
+    """A per-minute budget that refills continuously and may be overdrawn."""
+
+    def __init__(self, per_minute: int, now: float):
+        self.per_minute = per_minute
+        self.level = float(per_minute)
+        self.updated = now
+
+    def _refill(self, now: float, factor: float) -> None:
+        capacity = self.per_minute * factor
+        self.level = min(capacity, self.level + (now - self.updated) * capacity / 60)
+        self.updated = now
+
+    def delay(self, amount: float, now: float, factor: float, reserve: float = 0.0) -> float:
+        """Seconds until `amount` can be taken while leaving `reserve` (a fraction) untouched."""
+        self._refill(now, factor)
+        capacity = self.per_minute * factor
+        # A single request larger than the whole budget waits for a full bucket
+        needed = min(amount + reserve * capacity, capacity)
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) * 60 / capacity
+
+    def take(self, amount: float) -> None:
+        self.level -= amount
+
+
+@dataclass(order=True)
+class _Waiter:
+    rank: int
+    seq: int
+    tokens: int = field(compare=False)
+    wakeup: asyncio.Future = field(compare=False)
+
+
+class LLMScheduler:
+    """
+    Shared admission control for every OpenAI chat call in the process.
+
+    Calls wait in a priority queue: interactive calls (chat) always go ahead
+    of batch calls (ingestion), and batch calls may not dip into the last
+    `interactive_reserve` of either budget. The head of the queue is
+    admitted once the requests-per-minute and tokens-per-minute buckets
+    allow it; a limit of 0 disables that bucket.
+
+    On a 429 the budgets are halved and admission pauses for the
+    Retry-After the API sent (or an exponential backoff); every successful
+    call then restores 5% of the budget. Queue depth, wait times and the
+    current budget are reported by stats().
+    """
+
+    def __init__(
+        self,
+        rpm: int,
+        tpm: int,
+        interactive_reserve: float = 0.0,
+        max_retries: int = 5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.clock = clock
+        now = clock()
+        self._requests = _TokenBucket(rpm, now) if rpm > 0 else None
+        self._tokens = _TokenBucket(tpm, now) if tpm > 0 else None
+        self.interactive_reserve = interactive_reserve
+        self.max_retries = max_retries
+        self._queue: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._rate_factor = 1.0
+        self._paused_until = 0.0
+        self._consecutive_429s = 0
+        self._in_flight = 0
+        self._counts = {"requests": 0, "rate_limited": 0, "retried": 0, "tokens": 0}
+        self._waits: dict[str, deque[float]] = {p: deque(maxlen=500) for p in PRIORITIES}
+
+    def _delay(self, waiter: _Waiter) -> float:
+        now = self.clock()
+        reserve = self.interactive_reserve if waiter.rank > 0 else 0.0
+        delays = [self._paused_until - now]
+        if self._requests is not None:
+            delays.append(self._requests.delay(1, now, self._rate_factor, reserve))
+        if self._tokens is not None:
+            delays.append(self._tokens.delay(waiter.tokens, now, self._rate_factor, reserve))
+        return max(delays)
+
+    def _wake_head(self) -> None:
+        if self._queue and not self._queue[0].wakeup.done():
+            self._queue[0].wakeup.set_result(None)
+
+    async def acquire(self, priority: str, tokens: int) -> None:
+        """Wait until a call of `priority` estimated at `tokens` tokens may start."""
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(PRIORITIES.index(priority), next(self._seq), tokens, loop.create_future())
+        heapq.heappush(self._queue, waiter)
+        enqueued = self.clock()
+        try:
+            while True:
+                timeout = None
+                if self._queue[0] is waiter:
+                    timeout = self._delay(waiter)
+                    if timeout <= 0:
+                        break
+                try:
+                    # Woken early if this waiter becomes the head of the queue
+                    await asyncio.wait_for(asyncio.shield(waiter.wakeup), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                if waiter.wakeup.done():
+                    waiter.wakeup = loop.create_future()
+        except BaseException:
+            self._queue.remove(waiter)
+            heapq.heapify(self._queue)
+            self._wake_head()
+            raise
+
+        heapq.heappop(self._queue)
+        if self._requests is not None:
+            self._requests.take(1)
+        if self._tokens is not None:
+            self._tokens.take(tokens)
+        self._counts["requests"] += 1
+        self._counts["tokens"] += tokens
+        waited = self.clock() - enqueued
+        self._waits[priority].append(waited)
+        if waited > 5:
+            logger.info(f"LLM call ({priority}) waited {waited:.1f}s for rate limit budget")
+        self._wake_head()
+
+    def record_usage(self, estimated: int, actual: int) -> None:
+        """Charge the token budget for the difference between an estimate and the real usage."""
+        if self._tokens is not None:
+            self._tokens.take(actual - estimated)
+        self._counts["tokens"] += actual - estimated
+
+    def record_success(self) -> None:
+        self._consecutive_429s = 0
+        self._rate_factor = min(1.0, self._rate_factor + 0.05)
+
+    def record_rate_limited(self, retry_after: float | None = None) -> None:
+        """Halve the budgets and pause admission after a 429."""
+        self._counts["rate_limited"] += 1
+        self._consecutive_429s += 1
+        self._rate_factor = max(0.05, self._rate_factor / 2)
+        pause = retry_after if retry_after is not None else min(60.0, 2.0 ** (self._consecutive_429s - 1))
+        self._paused_until = max(self._paused_until, self.clock() + pause)
+        logger.warning(f"LLM rate limited; pausing {pause:.1f}s, budget now {self._rate_factor:.0%} of configured")
+
+    async def run(self, priority: str, tokens: int, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `call` once admitted, retrying rate limit and transient API errors.
+
+        Only 429s reduce the budget; other retryable errors back off
+        exponentially. The last error is raised after `max_retries` retries.
+        """
+        attempt = 0
+        while True:
+            await self.acquire(priority, tokens)
+            self._in_flight += 1
+            try:
+                result = await call()
+            except _RETRYABLE_ERRORS as e:
+                if isinstance(e, openai.RateLimitError):
+                    self.record_rate_limited(_retry_after(e))
+                if attempt == self.max_retries:
+                    raise
+                self._counts["retried"] += 1
+                if not isinstance(e, openai.RateLimitError):
+                    await asyncio.sleep(min(30.0, 0.5 * 2 ** attempt))
+                attempt += 1
+                continue
+            finally:
+                self._in_flight -= 1
+            self.record_success()
+            return result
+
+    def stats(self) -> dict:
+        now = self.clock()
+        waits = {}
+        for priority, samples in self._waits.items():
+            ordered = sorted(samples)
+            waits[priority] = {
+                "samples": len(ordered),
+                "avg_seconds": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+                "p95_seconds": round(ordered[int(0.95 * (len(ordered) - 1))], 3) if ordered else 0.0,
+                "max_seconds": round(ordered[-1], 3) if ordered else 0.0,
+            }
+        return {
+            "rpm_limit": self._requests.per_minute if self._requests else 0,
+            "tpm_limit": self._tokens.per_minute if self._tokens else 0,
+            "rate_factor": round(self._rate_factor, 3),
+            "paused_seconds": round(max(0.0, self._paused_until - now), 3),
+            "queue_depth": {p: sum(1 for w in self._queue if PRIORITIES[w.rank] == p) for p in PRIORITIES},
+            "in_flight": self._in_flight,
+            **self._counts,
+            "wait": waits,
+        }
+
+
+def _retry_after(error: openai.APIStatusError) -> float | None:
+    headers = error.response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+
+llm_scheduler = LLMScheduler(
+    rpm=Config.LLM_RPM_LIMIT,
+    tpm=Config.LLM_TPM_LIMIT,
+    interactive_reserve=Config.LLM_INTERACTIVE_RESERVE,
+    max_retries=Config.LLM_RATE_LIMIT_RETRIES,
+)
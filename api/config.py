@@ -20,6 +20,10 @@ class Config:
     # OpenAI
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-5.1")
+    LLM_RPM_LIMIT: int = int(os.getenv("LLM_RPM_LIMIT", "500"))
+    LLM_TPM_LIMIT: int = int(os.getenv("LLM_TPM_LIMIT", "200000"))
+    LLM_INTERACTIVE_RESERVE: float = float(os.getenv("LLM_INTERACTIVE_RESERVE", "0.1"))
+    LLM_RATE_LIMIT_RETRIES: int = int(os.getenv("LLM_RATE_LIMIT_RETRIES", "5"))
 
     # Urlbox
     URLBOX_API_KEY: str = os.getenv("URLBOX_API_KEY", "")
@@ -42,6 +46,49 @@ class Config:
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
     JWT_EXPIRY_HOURS: int = int(os.getenv("JWT_EXPIRY_HOURS", "24"))
 
+    # Ingestion
+    INGEST_CONCURRENCY: int = int(os.getenv("INGEST_CONCURRENCY", "4"))
+    INGEST_JOB_WORKERS: int = int(os.getenv("INGEST_JOB_WORKERS", "1"))
+    INGEST_JOB_LEASE_SECONDS: float = float(os.getenv("INGEST_JOB_LEASE_SECONDS", "120"))
+    INGEST_JOB_POLL_SECONDS: float = float(os.getenv("INGEST_JOB_POLL_SECONDS", "30"))
+    INGEST_TASK_WORKERS: int = int(os.getenv("INGEST_TASK_WORKERS", "1"))
+    INGEST_TASK_LEASE_SECONDS: float = float(os.getenv("INGEST_TASK_LEASE_SECONDS", "120"))
+    INGEST_TASK_POLL_SECONDS: float = float(os.getenv("INGEST_TASK_POLL_SECONDS", "5"))
+    INGEST_TASK_MAX_ATTEMPTS: int = int(os.getenv("INGEST_TASK_MAX_ATTEMPTS", "3"))
+    INGEST_UPLOAD_MAX_BYTES: int = int(os.getenv("INGEST_UPLOAD_MAX_BYTES", str(100 * 1024 * 1024)))
+    WATCH_DEBOUNCE_SECONDS: float = float(os.getenv("WATCH_DEBOUNCE_SECONDS", "2.0"))
+    WATCH_FORCE_POLLING: bool = os.getenv("WATCH_FORCE_POLLING", "false").lower() == "true"
+    WATCH_POLL_INTERVAL_SECONDS: float = float(os.getenv("WATCH_POLL_INTERVAL_SECONDS", "1.0"))
+    TS_IMPORT_BATCH_SIZE: int = int(os.getenv("TS_IMPORT_BATCH_SIZE", "100"))
+    TS_EMBEDDING_BATCH_SIZE: int = int(os.getenv("TS_EMBEDDING_BATCH_SIZE", "200"))
+    SPEAKER_DETECTION_CONCURRENCY: int = int(os.getenv("SPEAKER_DETECTION_CONCURRENCY", "4"))
+    SPEAKER_BATCH_TOKENS: int = int(os.getenv("SPEAKER_BATCH_TOKENS", "4000"))
+    SPEAKER_BATCH_MAX_SEGMENTS: int = int(os.getenv("SPEAKER_BATCH_MAX_SEGMENTS", "120"))
+    SPEAKER_CONTEXT_SEGMENTS: int = int(os.getenv("SPEAKER_CONTEXT_SEGMENTS", "2"))
+    SPEAKER_HEURISTICS_ENABLED: bool = os.getenv("SPEAKER_HEURISTICS_ENABLED", "true").lower() == "true"
+    SPEAKER_HEURISTIC_THRESHOLD: float = float(os.getenv("SPEAKER_HEURISTIC_THRESHOLD", "0.85"))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    LLM_RETRY_BACKOFF_SECONDS: float = float(os.getenv("LLM_RETRY_BACKOFF_SECONDS", "1.0"))
+    LLM_RESPONSE_FORMAT: str = os.getenv("LLM_RESPONSE_FORMAT", "json_schema")
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_PATH: str = os.getenv("LLM_CACHE_PATH", "./cache/llm_cache.sqlite3")
+    LLM_CACHE_MAX_MB: int = int(os.getenv("LLM_CACHE_MAX_MB", "512"))
+    ARTIFACTS_ENABLED: bool = os.getenv("ARTIFACTS_ENABLED", "true").lower() == "true"
+    ARTIFACT_DIR: str = os.getenv("ARTIFACT_DIR", "./cache/artifacts")
+    CHUNK_SIZE: int = int(os.getenv("CHUNK_SIZE", "500"))
+    CHUNK_OVERLAP: int = int(os.getenv("CHUNK_OVERLAP", "50"))
+    CHUNK_ID_MODE: str = os.getenv("CHUNK_ID_MODE", "position")  # "position" or "content"
+    DEDUP_MODE: str = os.getenv("DEDUP_MODE", "flag")  # "off", "flag" or "skip"
+    DEDUP_THRESHOLD: float = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+    DEDUP_INDEX_BACKEND: str = os.getenv("DEDUP_INDEX_BACKEND", "sqlite")  # "sqlite" or "mysql"
+    DEDUP_INDEX_PATH: str = os.getenv("DEDUP_INDEX_PATH", "./cache/dedup_index.sqlite3")
+    EMBEDDING_MODE: str = os.getenv("EMBEDDING_MODE", "typesense")  # "typesense" or "client"
+    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "text-embedding-3-large")
+    EMBEDDING_BASE_URL: str = os.getenv("EMBEDDING_BASE_URL", "https://api.openai.com/v1")
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+    EMBEDDING_CACHE_PATH: str = os.getenv("EMBEDDING_CACHE_PATH", "./cache/embedding_cache.sqlite3")
+    EMBEDDING_CACHE_MAX_MB: int = int(os.getenv("EMBEDDING_CACHE_MAX_MB", "2048"))
+
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     LOG_TRUNCATE: int = int(os.getenv("LOG_TRUNCATE", "500"))
@@ -1,7 +1,10 @@
-from sqlalchemy import select, delete
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, func, or_, select, delete, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.models import Conversation, Message, User
+from db.models import Conversation, IngestionJob, IngestionTask, Message, User
 from db.session import async_session
 
 
@@ -153,3 +156,274 @@ async def update_user_password(username: str, password_hash: str) -> bool:
         user.password_hash = password_hash
         await session.commit()
         return True
+
+
+async def create_ingestion_job(
+    directory_path: str,
+    force: bool = False,
+    concurrency: int | None = None,
+    use_cache: bool = True,
+) -> IngestionJob:
+    """Record a new queued ingestion job."""
+    async with async_session() as session:
+        job = IngestionJob(
+            directory_path=directory_path,
+            force=force,
+            concurrency=concurrency,
+            use_cache=use_cache,
+            status="queued",
+            errors=[],
+        )
+        session.add(job)
+        await session.commit()
+        await session.refresh(job)
+        return job
+
+
+async def get_ingestion_job(job_id: str) -> IngestionJob | None:
+    """Fetch an ingestion job by ID."""
+    async with async_session() as session:
+        result = await session.execute(
+            select(IngestionJob).where(IngestionJob.id == job_id)
+        )
+        return result.scalar_one_or_none()
+
+
+async def update_ingestion_job(job_id: str, **fields) -> bool:
+    """Set fields on an ingestion job. Returns True if the job exists."""
+    async with async_session() as session:
+        result = await session.execute(
+            select(IngestionJob).where(IngestionJob.id == job_id)
+        )
+        job = result.scalar_one_or_none()
+        if job is None:
+            return False
+        for name, value in fields.items():
+            setattr(job, name, value)
+        await session.commit()
+        return True
+
+
+async def _db_now(session: AsyncSession) -> datetime:
+    """The database's UTC clock, so leases from every node are timed against one clock."""
+    result = await session.execute(select(func.utc_timestamp()))
+    return result.scalar_one()
+
+
+def _job_claimable(now: datetime):
+    """Jobs nobody is running: queued, or running under a lease that has run out (or predates leases)."""
+    return or_(
+        IngestionJob.status == "queued",
+        and_(
+            IngestionJob.status == "running",
+            or_(IngestionJob.lease_expires_at.is_(None), IngestionJob.lease_expires_at < now),
+        ),
+    )
+
+
+async def get_claimable_ingestion_job_ids() -> list[str]:
+    """List queued ingestion jobs and running ones whose node has gone away, oldest first."""
+    async with async_session() as session:
+        now = await _db_now(session)
+        result = await session.execute(
+            select(IngestionJob.id)
+            .where(_job_claimable(now))
+            .order_by(IngestionJob.created_at)
+        )
+        return list(result.scalars().all())
+
+
+async def claim_ingestion_job(job_id: str, owner: str, lease_seconds: float) -> IngestionJob | None:
+    """
+    Lease a queued job, or a running one whose lease has expired, to `owner`.
+
+    Returns the job marked running, or None if it is finished, missing, or
+    held by a live lease elsewhere. The row is locked with SELECT ... FOR
+    UPDATE SKIP LOCKED, so two nodes claiming the same job cannot both win.
+    """
+    async with async_session() as session:
+        now = await _db_now(session)
+        result = await session.execute(
+            select(IngestionJob)
+            .where(IngestionJob.id == job_id, _job_claimable(now))
+            .with_for_update(skip_locked=True)
+        )
+        job = result.scalar_one_or_none()
+        if job is None:
+            await session.commit()
+            return None
+        job.status = "running"
+        job.lease_owner = owner
+        job.lease_expires_at = now + timedelta(seconds=lease_seconds)
+        job.started_at = now
+        job.finished_at = None
+        await session.commit()
+        return job
+
+
+async def renew_ingestion_job_lease(job_id: str, owner: str, lease_seconds: float) -> bool:
+    """Extend `owner`'s lease on a running job. Returns False if the lease was lost."""
+    async with async_session() as session:
+        now = await _db_now(session)
+        result = await session.execute(
+            update(IngestionJob)
+            .where(IngestionJob.id == job_id, IngestionJob.lease_owner == owner, IngestionJob.status == "running")
+            .values(lease_expires_at=now + timedelta(seconds=lease_seconds))
+        )
+        await session.commit()
+        return result.rowcount == 1
+
+
+async def finish_ingestion_job(job_id: str, owner: str, **fields) -> datetime | None:
+    """
+    Set a leased job's final fields and drop the lease.
+
+    Returns the finish time, or None if `owner` no longer holds the lease.
+    """
+    async with async_session() as session:
+        now = await _db_now(session)
+        result = await session.execute(
+            update(IngestionJob)
+            .where(IngestionJob.id == job_id, IngestionJob.lease_owner == owner, IngestionJob.status == "running")
+            .values(**fields, lease_owner=None, lease_expires_at=None, finished_at=now)
+        )
+        await session.commit()
+        return now if result.rowcount == 1 else None
+
+
+async def release_ingestion_job(job_id: str, owner: str) -> bool:
+    """Hand a leased job back as queued, e.g. on shutdown, so any node can pick it up."""
+    async with async_session() as session:
+        result = await session.execute(
+            update(IngestionJob)
+            .where(IngestionJob.id == job_id, IngestionJob.lease_owner == owner, IngestionJob.status == "running")
+            .values(status="queued", lease_owner=None, lease_expires_at=None)
+        )
+        await session.commit()
+        return result.rowcount == 1
+
+
+async def create_ingestion_tasks(file_paths: list[str], force: bool = False, use_cache: bool = True) -> str:
+    """Queue one pending ingestion task per file under a new batch ID, and return the ID."""
+    batch_id = str(uuid.uuid4())
+    async with async_session() as session:
+        session.add_all([
+            IngestionTask(batch_id=batch_id, file_path=file_path, force=force, use_cache=use_cache, status="pending")
+            for file_path in file_paths
+        ])
+        await session.commit()
+    return batch_id
+
+
+async def claim_ingestion_task(owner: str, lease_seconds: float, max_attempts: int) -> IngestionTask | None:
+    """
+    Lease the oldest pending task, or a running one whose lease has expired, to `owner`.
+
+    The row is locked with SELECT ... FOR UPDATE SKIP LOCKED, so workers on
+    other nodes claiming at the same time pass over it rather than wait. An
+    expired task that has already been attempted `max_attempts` times is
+    marked failed instead, and the next one is tried. Lease times come
+    from the database clock.
+    """
+    async with async_session() as session:
+        while True:
+            now = await _db_now(session)
+            result = await session.execute(
+                select(IngestionTask)
+                .where(or_(
+                    IngestionTask.status == "pending",
+                    and_(IngestionTask.status == "running", IngestionTask.lease_expires_at < now),
+                ))
+                .order_by(IngestionTask.created_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            task = result.scalar_one_or_none()
+            if task is None:
+                await session.commit()
+                return None
+            if task.status == "running" and task.attempts >= max_attempts:
+                task.status = "failed"
+                task.error = f"Lease expired {task.attempts} times (last held by {task.lease_owner})"
+                task.lease_owner = task.lease_expires_at = None
+                task.finished_at = now
+                await session.commit()
+                continue
+            task.status = "running"
+            task.attempts += 1
+            task.lease_owner = owner
+            task.lease_expires_at = now + timedelta(seconds=lease_seconds)
+            task.heartbeat_at = now
+            task.started_at = now
+            await session.commit()
+            return task
+
+
+async def renew_ingestion_task_lease(task_id: str, owner: str, lease_seconds: float) -> bool:
+    """Extend `owner`'s lease on a running task. Returns False if the lease was lost."""
+    async with async_session() as session:
+        now = await _db_now(session)
+        result = await session.execute(
+            update(IngestionTask)
+            .where(IngestionTask.id == task_id, IngestionTask.lease_owner == owner, IngestionTask.status == "running")
+            .values(lease_expires_at=now + timedelta(seconds=lease_seconds), heartbeat_at=now)
+        )
+        await session.commit()
+        return result.rowcount == 1
+
+
+async def finish_ingestion_task(
+    task_id: str,
+    owner: str,
+    status: str,
+    result: dict | None = None,
+    error: str | None = None,
+) -> bool:
+    """Record a leased task's outcome. Returns False if `owner` no longer holds the lease."""
+    async with async_session() as session:
+        now = await _db_now(session)
+        updated = await session.execute(
+            update(IngestionTask)
+            .where(IngestionTask.id == task_id, IngestionTask.lease_owner == owner, IngestionTask.status == "running")
+            .values(
+                status=status, result=result, error=error,
+                lease_owner=None, lease_expires_at=None, finished_at=now,
+            )
+        )
+        await session.commit()
+        return updated.rowcount == 1
+
+
+async def release_ingestion_task(task_id: str, owner: str) -> bool:
+    """Hand a leased task back as pending, without counting the attempt (e.g. on shutdown)."""
+    async with async_session() as session:
+        updated = await session.execute(
+            update(IngestionTask)
+            .where(IngestionTask.id == task_id, IngestionTask.lease_owner == owner, IngestionTask.status == "running")
+            .values(
+                status="pending", attempts=IngestionTask.attempts - 1,
+                lease_owner=None, lease_expires_at=None, heartbeat_at=None,
+            )
+        )
+        await session.commit()
+        return updated.rowcount == 1
+
+
+async def get_ingestion_task_counts(batch_id: str | None = None) -> dict[str, int]:
+    """Number of ingestion tasks in each status, for one batch or all of them."""
+    async with async_session() as session:
+        query = select(IngestionTask.status, func.count()).group_by(IngestionTask.status)
+        if batch_id is not None:
+            query = query.where(IngestionTask.batch_id == batch_id)
+        result = await session.execute(query)
+        return {status: count for status, count in result.all()}
+
+
+async def get_failed_ingestion_tasks(batch_id: str | None = None, limit: int = 50) -> list[IngestionTask]:
+    """Most recently finished failed tasks, for one batch or all of them."""
+    async with async_session() as session:
+        query = select(IngestionTask).where(IngestionTask.status == "failed")
+        if batch_id is not None:
+            query = query.where(IngestionTask.batch_id == batch_id)
+        result = await session.execute(query.order_by(IngestionTask.finished_at.desc()).limit(limit))
+        return list(result.scalars().all())
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, String, Text, DateTime, Integer, ForeignKey, JSON
+from sqlalchemy import Column, String, Text, DateTime, Integer, ForeignKey, JSON, Boolean, Index
 from sqlalchemy.orm import DeclarativeBase, relationship
 
 
@@ -46,3 +46,45 @@ class User(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     conversations = relationship("Conversation", back_populates="user", order_by="Conversation.updated_at.desc()")
+
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    directory_path = Column(String(1024), nullable=False)
+    force = Column(Boolean, default=False, nullable=False)
+    concurrency = Column(Integer, nullable=True)
+    use_cache = Column(Boolean, default=True, nullable=False)
+    status = Column(String(20), default="queued", nullable=False, index=True)  # queued, running, completed, failed
+    files_total = Column(Integer, default=0, nullable=False)
+    files_done = Column(Integer, default=0, nullable=False)
+    files_failed = Column(Integer, default=0, nullable=False)
+    chunks_written = Column(Integer, default=0, nullable=False)
+    errors = Column(JSON, nullable=True)
+    lease_owner = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class IngestionTask(Base):
+    __tablename__ = "ingestion_tasks"
+    __table_args__ = (Index("ix_ingestion_tasks_claim", "status", "lease_expires_at"),)
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    batch_id = Column(String(36), nullable=False, index=True)
+    file_path = Column(String(1024), nullable=False)
+    force = Column(Boolean, default=False, nullable=False)
+    use_cache = Column(Boolean, default=True, nullable=False)
+    status = Column(String(20), default="pending", nullable=False)  # pending, running, completed, failed
+    attempts = Column(Integer, default=0, nullable=False)
+    lease_owner = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,4 @@
+import sys
+from ingestion.cli import main
+
+sys.exit(main())
@@ -0,0 +1,108 @@
+import fnmatch
+import hashlib
+import io
+import posixpath
+import tarfile
+import zipfile
+from collections.abc import Iterator
+from typing import BinaryIO
+from ingestion.vtt_parser import Cue, iter_merged_cues
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - installed with the API's dependencies
+    zstandard = None
+
+ARCHIVE_SUFFIXES = (".zip", ".tar.gz", ".tgz", ".tar.zst", ".tar.zstd")
+
+# Bytes buffered between an archive member and the VTT parser
+_READ_BUFFER = 1 << 16
+
+
+def is_archive(path: str) -> bool:
+    return path.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def _wanted(name: str, pattern: str) -> bool:
+    base = posixpath.basename(name)
+    # macOS resource forks ride along in archives made with Finder
+    if base.startswith("._") or name.startswith("__MACOSX/"):
+        return False
+    return fnmatch.fnmatch(base, pattern)
+
+
+def count_members(archive_path: str, pattern: str = "*.vtt") -> int | None:
+    """Matching members of a zip archive, from its central directory; None for tar archives."""
+    if not archive_path.lower().endswith(".zip"):
+        return None
+    with zipfile.ZipFile(archive_path) as zf:
+        return sum(1 for info in zf.infolist() if not info.is_dir() and _wanted(info.filename, pattern))
+
+
+def iter_members(archive_path: str, pattern: str = "*.vtt") -> Iterator[tuple[str, BinaryIO]]:
+    """
+    Yield (name, stream) for each regular member whose basename matches `pattern`.
+
+    Members are decompressed as they are read; nothing is extracted to disk.
+    Tar archives are read in streaming mode, one pass front to back, so each
+    stream is only valid until the next member is yielded. .tar.zst needs
+    the zstandard package.
+    """
+    lowered = archive_path.lower()
+    if lowered.endswith(".zip"):
+        with zipfile.ZipFile(archive_path) as zf:
+            for info in zf.infolist():
+                if info.is_dir() or not _wanted(info.filename, pattern):
+                    continue
+                with zf.open(info) as stream:
+                    yield info.filename, stream
+        return
+
+    with open(archive_path, "rb") as raw:
+        if lowered.endswith((".tar.zst", ".tar.zstd")):
+            if zstandard is None:
+                raise RuntimeError("Reading .tar.zst archives needs the zstandard package")
+            source, mode = zstandard.ZstdDecompressor().stream_reader(raw), "r|"
+        else:
+            source, mode = raw, "r|gz"
+        with tarfile.open(fileobj=source, mode=mode) as tf:
+            for member in tf:
+                if not member.isfile() or not _wanted(member.name, pattern):
+                    continue
+                stream = tf.extractfile(member)
+                with stream:
+                    yield member.name, stream
+
+
+class _HashingReader(io.RawIOBase):
+    """Pass a binary stream through, adding every byte read to a SHA-256 digest."""
+
+    def __init__(self, stream: BinaryIO):
+        self._stream = stream
+        self.digest = hashlib.sha256()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+        self.digest.update(data)
+        return len(data)
+
+
+def parse_member(stream: BinaryIO) -> tuple[list[Cue], str]:
+    """
+    Parse a VTT stream into merged segments and hash its bytes in the same pass.
+
+    The hash matches pipeline._file_hash of the same file on disk, so an
+    episode ingested from an archive is recognized when it shows up
+    unpacked, and the other way round.
+    """
+    hashing = _HashingReader(stream)
+    text = io.TextIOWrapper(io.BufferedReader(hashing, _READ_BUFFER), encoding="utf-8-sig")
+    cues = list(iter_merged_cues(text))
+    # The parser reads to the end; drain anyway so the hash covers every byte
+    while hashing.read(_READ_BUFFER):
+        pass
+    return cues, hashing.digest.hexdigest()
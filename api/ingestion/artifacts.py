@@ -0,0 +1,107 @@
+import json
+import logging
+import os
+import tempfile
+from collections.abc import Iterator
+from datetime import datetime
+from config import Config
+from ingestion.vtt_parser import Cue
+
+logger = logging.getLogger(__name__)
+
+# Pipeline stages whose output is stored, in pipeline order
+STAGES = ("cues", "metadata", "labeled")
+
+
+def segments_to_json(segments: list[Cue]) -> list[list]:
+    """Encode segments compactly as [start_time, end_time, text, speaker] rows."""
+    return [[seg.start_time, seg.end_time, seg.text, seg.speaker] for seg in segments]
+
+
+def segments_from_json(rows: list[list]) -> list[Cue]:
+    return [Cue(*row) for row in rows]
+
+
+class ArtifactStore:
+    """
+    Local store of each episode's stage outputs, keyed by file content hash.
+
+    Every hash gets a directory holding one JSON file per completed stage
+    and a manifest.json listing the completed stages with the episode id and
+    source file they belong to. Files are written to a temporary name and
+    renamed into place, so a crash never leaves a half-written artifact.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _dir(self, file_hash: str) -> str:
+        return os.path.join(self.root, file_hash[:2], file_hash)
+
+    def _write_json(self, path: str, data) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _read_json(self, path: str):
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError:
+            logger.warning(f"Ignoring unreadable artifact {path}")
+            return None
+
+    def manifest(self, file_hash: str) -> dict | None:
+        return self._read_json(os.path.join(self._dir(file_hash), "manifest.json"))
+
+    def load(self, file_hash: str, stage: str):
+        """Return a stage's stored output, or None if that stage has not completed."""
+        manifest = self.manifest(file_hash)
+        if manifest is None or stage not in manifest.get("stages", []):
+            return None
+        return self._read_json(os.path.join(self._dir(file_hash), f"{stage}.json"))
+
+    def save(self, file_hash: str, stage: str, data, episode_id: str, source_file: str) -> None:
+        """Store a stage's output, then record the stage as completed in the manifest."""
+        directory = self._dir(file_hash)
+        self._write_json(os.path.join(directory, f"{stage}.json"), data)
+
+        manifest = self.manifest(file_hash) or {"file_hash": file_hash, "stages": []}
+        manifest.update(episode_id=episode_id, source_file=source_file, updated_at=datetime.utcnow().isoformat())
+        if stage not in manifest["stages"]:
+            manifest["stages"].append(stage)
+        self._write_json(os.path.join(directory, "manifest.json"), manifest)
+
+    def iter_manifests(self) -> Iterator[dict]:
+        """Yield the manifest of every stored episode."""
+        if not os.path.isdir(self.root):
+            return
+        for prefix in sorted(os.listdir(self.root)):
+            prefix_dir = os.path.join(self.root, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for file_hash in sorted(os.listdir(prefix_dir)):
+                manifest = self.manifest(file_hash)
+                if manifest is not None:
+                    yield manifest
+
+
+_store: ArtifactStore | None = None
+
+
+def get_artifact_store() -> ArtifactStore | None:
+    """Return the shared artifact store, or None when ARTIFACTS_ENABLED is off."""
+    global _store
+    if not Config.ARTIFACTS_ENABLED:
+        return None
+    if _store is None:
+        _store = ArtifactStore(Config.ARTIFACT_DIR)
+    return _store
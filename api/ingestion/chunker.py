@@ -1,75 +1,116 @@
 import logging
-from models.schemas import ParsedCue, TranscriptChunk
+import zlib
+from bisect import bisect_right
+from ingestion.transcript import TokenizedTranscript, tokenize
+from ingestion.vtt_parser import Cue
+from models.schemas import TranscriptChunk
 
 logger = logging.getLogger(__name__)
 
+# With content-defined boundaries, about one segment in ANCHOR_EVERY may end a chunk early
+ANCHOR_EVERY = 8
+
+
+def _next_spoken_segment(offsets, start: int) -> int | None:
+    """Return the first segment index >= start that contains any words."""
+    for i in range(start, len(offsets) - 1):
+        if offsets[i + 1] > offsets[i]:
+            return i
+    return None
+
+
+def _is_anchor(text: str) -> bool:
+    """Whether a segment's text makes it a content-defined chunk boundary."""
+    return zlib.crc32(text.encode()) % ANCHOR_EVERY == 0
+
 
 def chunk_segments(
-    segments: list[ParsedCue],
+    segments: list[Cue],
     episode_id: str,
     metadata: dict,
     chunk_size: int = 500,
     overlap: int = 50,
+    transcript: TokenizedTranscript | None = None,
+    content_defined: bool = False,
 ) -> list[TranscriptChunk]:
     """
     Chunk merged segments into ~500-word chunks with 50-word overlap.
 
-    Prefers breaking at speaker turns and sentence boundaries.
-    Each chunk gets denormalized episode metadata.
+    Chunks break between segments: a segment that would push the chunk past
+    chunk_size starts the next chunk, which also repeats the last `overlap`
+    words. Chunk boundaries are word offsets into the shared tokenized
+    transcript, found by bisecting the cumulative word counts rather than
+    copying word lists. Each chunk gets denormalized episode metadata.
+
+    With content_defined=True, a chunk that has reached half of chunk_size
+    also ends after any "anchor" segment, chosen by a hash of its text.
+    Boundaries then depend on the text near them rather than on word
+    counts since the start, so an edit early in a transcript only changes
+    the chunks around it.
     """
     logger.info(f"chunk_segments called | episode_id={episode_id!r}, segments={len(segments)}, chunk_size={chunk_size}, overlap={overlap}")
-    chunks: list[TranscriptChunk] = []
-    current_words: list[str] = []
-    current_start: float = 0.0
-    current_end: float = 0.0
-    current_speaker: str = ""
-    chunk_index = 0
+    if transcript is None or transcript.segment_count != len(segments):
+        transcript = tokenize(segments)
+    offsets = transcript.offsets
+    overlap = max(overlap, 0)
 
+    # Segments without a speaker label inherit the most recent one
+    speakers: list[str] = []
+    speaker = ""
     for segment in segments:
-        words = segment.text.split()
-        speaker = segment.speaker or current_speaker
-
-        if not current_words:
-            current_start = segment.start_time
-            current_speaker = speaker
-
-        # If adding this segment exceeds chunk_size and we have content, flush
-        if len(current_words) + len(words) > chunk_size and current_words:
-            chunks.append(TranscriptChunk(
-                episode_id=episode_id,
-                text=" ".join(current_words),
-                speaker=current_speaker,
-                start_time=current_start,
-                end_time=current_end,
-                chunk_index=chunk_index,
-                guest_names=metadata.get("guest_names", []),
-                industry=metadata.get("industry", ""),
-                topic_tags=metadata.get("topic_tags", []),
-            ))
-            chunk_index += 1
-
-            # Overlap: carry the last N words into the next chunk
-            overlap_words = current_words[-overlap:] if len(current_words) > overlap else current_words
-            current_words = overlap_words
-            current_start = segment.start_time
-
-        current_words.extend(words)
-        current_end = segment.end_time
-        current_speaker = speaker
-
-    # Flush remaining words
-    if current_words:
+        speaker = segment.speaker or speaker
+        speakers.append(speaker)
+
+    shared = {
+        "episode_id": episode_id,
+        "guest_names": metadata.get("guest_names", []),
+        "industry": metadata.get("industry", ""),
+        "topic_tags": metadata.get("topic_tags", []),
+    }
+    chunks: list[TranscriptChunk] = []
+
+    def emit(start_word: int, end_word: int, start_time: float, last_segment: int) -> None:
         chunks.append(TranscriptChunk(
-            episode_id=episode_id,
-            text=" ".join(current_words),
-            speaker=current_speaker,
-            start_time=current_start,
-            end_time=current_end,
-            chunk_index=chunk_index,
-            guest_names=metadata.get("guest_names", []),
-            industry=metadata.get("industry", ""),
-            topic_tags=metadata.get("topic_tags", []),
+            text=transcript.text(start_word, end_word),
+            speaker=speakers[last_segment],
+            start_time=start_time,
+            end_time=segments[last_segment].end_time,
+            chunk_index=len(chunks),
+            **shared,
         ))
 
+    first = _next_spoken_segment(offsets, 0)
+    if first is None:
+        logger.info("chunk_segments returned | 0 chunks")
+        return chunks
+
+    start_word = offsets[first]
+    start_time = segments[first].start_time
+    next_segment = first + 1
+    while True:
+        # First segment k >= next_segment whose words would overflow the chunk
+        k = bisect_right(offsets, start_word + chunk_size, lo=next_segment + 1) - 1
+        if content_defined:
+            lo = max(next_segment + 1, bisect_right(offsets, start_word + chunk_size // 2 - 1, lo=next_segment + 1))
+            k = next((j for j in range(lo, min(k, len(segments))) if _is_anchor(segments[j - 1].text)), k)
+        if k >= len(segments):
+            break
+        end_word = offsets[k]
+        emit(start_word, end_word, start_time, k - 1)
+
+        # Next chunk: the overlap words, then segment k
+        start_word = max(start_word, end_word - overlap)
+        start_time = segments[k].start_time
+        next_segment = k + 1
+        if offsets[next_segment] == start_word:
+            first = _next_spoken_segment(offsets, next_segment)
+            if first is None:
+                break
+            start_time = segments[first].start_time
+            next_segment = first + 1
+
+    if offsets[-1] > start_word:
+        emit(start_word, offsets[-1], start_time, len(segments) - 1)
+
     logger.info(f"chunk_segments returned | {len(chunks)} chunks")
     return chunks
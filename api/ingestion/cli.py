@@ -0,0 +1,193 @@
+import argparse
+import asyncio
+import fnmatch
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from config import Config
+from ingestion.archives import is_archive
+from ingestion.pipeline import _episode_id, ingest_files, plan_file, rechunk_all
+from ingestion.watcher import TranscriptWatcher
+
+logger = logging.getLogger(__name__)
+
+
+def scan_files(paths: list[str], pattern: str = "*.vtt") -> list[str]:
+    """
+    Return every file under `paths` whose name matches `pattern`, and every
+    transcript archive, sorted.
+
+    Directories are walked recursively with os.scandir; symlinked
+    directories are not followed. Paths that are files are matched too.
+    """
+    found: list[str] = []
+    stack: list[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            stack.append(path)
+        elif fnmatch.fnmatch(os.path.basename(path), pattern) or is_archive(path):
+            found.append(path)
+
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file() and (fnmatch.fnmatch(entry.name, pattern) or is_archive(entry.name)):
+                    found.append(entry.path)
+    return sorted(found)
+
+
+def _print_file_result(result: dict) -> None:
+    line = f"{result['status']:<9} {result['file_path']}"
+    if result.get("error"):
+        line += f"  ({result['error']})"
+    elif result["status"] in ("success", "partial"):
+        line += f"  ({result.get('chunks_created', 0)} chunks, {result.get('duration_seconds', 0):.1f}s)"
+    print(line, flush=True)
+
+
+async def _ingest(args: argparse.Namespace) -> int:
+    files = scan_files(args.paths, args.glob)
+    if not files:
+        print(f"No files matching {args.glob!r} under {', '.join(args.paths)}", file=sys.stderr)
+        return 1
+
+    archives = [f for f in files if is_archive(f)]
+    files = [f for f in files if not is_archive(f)]
+    by_episode: dict[str, list[str]] = {}
+    for file_path in files:
+        by_episode.setdefault(_episode_id(os.path.basename(file_path)), []).append(file_path)
+    for episode_id, same_name in by_episode.items():
+        if len(same_name) > 1:
+            print(f"warning: {len(same_name)} files map to episode {episode_id!r}: {', '.join(same_name)}", file=sys.stderr)
+
+    if args.dry_run:
+        semaphore = asyncio.Semaphore(args.concurrency or Config.INGEST_CONCURRENCY)
+
+        async def plan(file_path: str) -> dict:
+            async with semaphore:
+                return await plan_file(file_path, force=args.force)
+
+        plans = await asyncio.gather(*(plan(f) for f in files))
+        for p in plans:
+            suffix = f"  (same content as {p['duplicate_of']})" if p.get("duplicate_of") else ""
+            print(f"{p['action']:<9} {p['file_path']}{suffix}")
+        # Members are only hashed while they are read, so archives are not planned
+        for archive in archives:
+            print(f"{'archive':<9} {archive}")
+        to_ingest = sum(1 for p in plans if p["action"] == "ingest")
+        print(f"{len(files)} files, {to_ingest} to ingest" + (f", {len(archives)} archives" if archives else ""))
+        return 0
+
+    async def on_progress(event: dict) -> None:
+        if event["type"] == "file" and not args.json:
+            _print_file_result(event["result"])
+
+    # Parsing and chunking are CPU-bound, so they run in worker processes;
+    # the LLM and Typesense calls stay on this event loop
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        result = await ingest_files(
+            files + archives,
+            force=args.force,
+            concurrency=args.concurrency,
+            use_cache=not args.no_cache,
+            on_progress=on_progress,
+            executor=executor,
+            member_pattern=args.glob,
+        )
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        totals = result["metrics"]["totals"]
+        print(
+            f"{result['episodes_processed']} files, {result['episodes_failed']} failed, "
+            f"{result['elapsed_seconds']:.1f}s (concurrency {result['concurrency']}), "
+            f"{totals['llm_calls']} LLM calls, {totals['prompt_tokens']} prompt + "
+            f"{totals['completion_tokens']} completion tokens, "
+            f"{totals['retries']} retries, {totals['repaired_responses']} repaired responses"
+        )
+    return 1 if result["episodes_failed"] else 0
+
+
+async def _watch(args: argparse.Namespace) -> int:
+    if not os.path.isdir(args.directory):
+        print(f"Not a directory: {args.directory}", file=sys.stderr)
+        return 1
+
+    async def on_result(path: str, result: dict) -> None:
+        _print_file_result({**result, "file_path": path})
+
+    watcher = TranscriptWatcher(
+        args.directory,
+        pattern=args.glob,
+        debounce_seconds=args.debounce,
+        force_polling=args.poll or None,
+        poll_interval=args.poll_interval,
+        concurrency=args.concurrency,
+        on_result=on_result,
+    )
+    if args.scan_on_start:
+        watcher.notice(set(scan_files([args.directory], args.glob)))
+    try:
+        await watcher.run()
+    except asyncio.CancelledError:
+        pass
+    return 0
+
+
+async def _rechunk(args: argparse.Namespace) -> int:
+    result = await rechunk_all(chunk_size=args.chunk_size, overlap=args.overlap)
+    print(json.dumps(result, indent=2))
+    return 0 if result["status"] == "success" else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m ingestion", description="Ingest podcast transcripts into Typesense.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="ingest VTT files from files, directories (recursive) and .zip/.tar.gz/.tar.zst archives")
+    ingest.add_argument("paths", nargs="+", help="files or directories to scan")
+    ingest.add_argument("--glob", default="*.vtt", help="filename pattern to match, also in archives (default: *.vtt)")
+    ingest.add_argument("--concurrency", type=int, default=None, help="episodes in flight (default: INGEST_CONCURRENCY)")
+    ingest.add_argument("--workers", type=int, default=None, help="processes for parsing and chunking (default: CPU count)")
+    ingest.add_argument("--force", action="store_true", help="re-ingest unchanged files")
+    ingest.add_argument("--no-cache", action="store_true", help="ignore cached LLM responses and stored artifacts")
+    ingest.add_argument("--dry-run", action="store_true", help="list what would be ingested, without ingesting")
+    ingest.add_argument("--json", action="store_true", help="print the full result as JSON")
+    ingest.set_defaults(handler=_ingest)
+
+    watch = commands.add_parser("watch", help="ingest new or changed VTT files as they appear, and unindex deleted ones")
+    watch.add_argument("directory", help="directory to watch (recursive)")
+    watch.add_argument("--glob", default="*.vtt", help="filename pattern to match (default: *.vtt)")
+    watch.add_argument("--debounce", type=float, default=None,
+                       help="seconds a file must stay unchanged before it is ingested (default: WATCH_DEBOUNCE_SECONDS)")
+    watch.add_argument("--poll", action="store_true", help="poll the directory instead of using inotify")
+    watch.add_argument("--poll-interval", type=float, default=None,
+                       help="seconds between polls (default: WATCH_POLL_INTERVAL_SECONDS)")
+    watch.add_argument("--concurrency", type=int, default=None, help="files in flight (default: INGEST_CONCURRENCY)")
+    watch.add_argument("--scan-on-start", action="store_true",
+                       help="also check every existing file once at startup (unchanged files are skipped by hash)")
+    watch.set_defaults(handler=_watch)
+
+    rechunk = commands.add_parser("rechunk", help="rebuild all chunks from stored artifacts, without LLM calls")
+    rechunk.add_argument("--chunk-size", type=int, default=None)
+    rechunk.add_argument("--overlap", type=int, default=None)
+    rechunk.set_defaults(handler=_rechunk)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=getattr(logging, Config.LOG_LEVEL, logging.INFO),
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    )
+    try:
+        return asyncio.run(args.handler(args))
+    except KeyboardInterrupt:
+        return 130
@@ -0,0 +1,331 @@
+import hashlib
+import logging
+import os
+import random
+import re
+import sqlite3
+from array import array
+from contextlib import contextmanager
+import pymysql
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# MinHash signature length, split into LSH bands of BAND_ROWS values each.
+# 32 bands of 4 rows make chunks with Jaccard similarity 0.8 candidates
+# with probability > 0.999; candidates are then checked against the
+# threshold using the full signature.
+NUM_PERM = 128
+BAND_ROWS = 4
+SHINGLE_WORDS = 5
+
+_MERSENNE = (1 << 61) - 1
+_rng = random.Random(0x5EED)  # Fixed, so signatures stay comparable across runs
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE)) for _ in range(NUM_PERM)]
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def _shingles(text: str) -> set[int]:
+    """Hash each run of SHINGLE_WORDS normalized words in `text`."""
+    words = _WORD.findall(text.lower())
+    grams = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(max(1, len(words) - SHINGLE_WORDS + 1))}
+    return {int.from_bytes(hashlib.blake2b(g.encode(), digest_size=8).digest(), "big") for g in grams}
+
+
+def minhash(text: str) -> list[int]:
+    """Return the MinHash signature of a text's word shingles."""
+    hashes = [h % _MERSENNE for h in _shingles(text)]
+    return [min((a * h + b) % _MERSENNE for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def minhash_all(texts: list[str]) -> list[list[int]]:
+    """Signatures for many texts; CPU-bound, so pipelines can run it in a worker process."""
+    return [minhash(text) for text in texts]
+
+
+def similarity(a: list[int], b: list[int]) -> float:
+    """Estimate the Jaccard similarity of the texts behind two signatures."""
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def _bands(signature: list[int]) -> list[int]:
+    """One bucket key per band, as a signed 64-bit integer for the index's integer columns."""
+    keys = []
+    for start in range(0, NUM_PERM, BAND_ROWS):
+        band = array("Q", signature[start:start + BAND_ROWS]).tobytes()
+        keys.append(int.from_bytes(hashlib.blake2b(band, digest_size=8).digest(), "big", signed=True))
+    return keys
+
+
+class SignatureIndex:
+    """
+    MinHash/LSH index of chunk signatures across the corpus, in SQLite.
+
+    The first copy of a passage to be indexed is canonical; a chunk is a
+    near-duplicate when a canonical chunk of another episode is at least
+    `threshold` similar to it. Only canonical chunks are put in the LSH
+    buckets, so re-ingesting the episode that holds the canonical copy
+    keeps it canonical. Each duplicate records the episode it duplicates;
+    when that episode is re-ingested without the passage or removed,
+    `release` hands the canonical role to one of the remaining copies.
+    Every call opens its own connection and assigning
+    an episode is one transaction, so concurrent ingests see each other's
+    chunks. The SQLite file belongs to one node; replicas share
+    MySQLSignatureIndex instead.
+    """
+
+    SIGNATURES = "signatures"
+    BUCKETS = "buckets"
+
+    def __init__(self, path: str, threshold: float):
+        self.path = path
+        self.threshold = threshold
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._create_tables()
+
+    def _create_tables(self) -> None:
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS signatures ("
+                " episode_id TEXT NOT NULL,"
+                " chunk_index INTEGER NOT NULL,"
+                " canonical INTEGER NOT NULL,"
+                " signature BLOB NOT NULL,"
+                " duplicate_of TEXT,"
+                " PRIMARY KEY (episode_id, chunk_index))"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(signatures)")}
+            if "duplicate_of" not in columns:
+                # Index files from before duplicates recorded their source
+                conn.execute("ALTER TABLE signatures ADD COLUMN duplicate_of TEXT")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                " band INTEGER NOT NULL,"
+                " bucket INTEGER NOT NULL,"
+                " episode_id TEXT NOT NULL,"
+                " chunk_index INTEGER NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_buckets_band ON buckets (band, bucket)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_buckets_episode ON buckets (episode_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_signatures_duplicate_of ON signatures (duplicate_of)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    @contextmanager
+    def _transaction(self):
+        """A connection that alone may write to the index until it commits."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _candidates(self, conn: sqlite3.Connection, episode_id: str, bands: list[int]) -> set[tuple[str, int]]:
+        found = set()
+        for band, bucket in enumerate(bands):
+            rows = conn.execute(
+                f"SELECT episode_id, chunk_index FROM {self.BUCKETS} WHERE band = ? AND bucket = ? AND episode_id != ?",
+                (band, bucket, episode_id),
+            )
+            found.update(rows)
+        return found
+
+    def _match(self, conn: sqlite3.Connection, episode_id: str, signature: list[int], bands: list[int]) -> str | None:
+        """The episode of the first canonical chunk, outside `episode_id`, similar enough to `signature`."""
+        for other_episode, other_index in sorted(self._candidates(conn, episode_id, bands)):
+            row = conn.execute(
+                f"SELECT signature FROM {self.SIGNATURES} WHERE episode_id = ? AND chunk_index = ?",
+                (other_episode, other_index),
+            ).fetchone()
+            if row and similarity(signature, array("Q", row[0]).tolist()) >= self.threshold:
+                return other_episode
+        return None
+
+    def _add_to_buckets(self, conn: sqlite3.Connection, episode_id: str, chunk_index: int, bands: list[int]) -> None:
+        conn.executemany(
+            f"INSERT INTO {self.BUCKETS} (band, bucket, episode_id, chunk_index) VALUES (?, ?, ?, ?)",
+            [(band, bucket, episode_id, chunk_index) for band, bucket in enumerate(bands)],
+        )
+
+    def assign(self, episode_id: str, signatures: list[list[int]]) -> list[str | None]:
+        """
+        Replace an episode's signatures and find its near-duplicate chunks.
+
+        Returns, per chunk, the id of the episode holding the canonical copy
+        it duplicates, or None if the chunk is canonical itself.
+        """
+        duplicate_of: list[str | None] = []
+        with self._transaction() as conn:
+            self._delete(conn, episode_id)
+            for chunk_index, signature in enumerate(signatures):
+                bands = _bands(signature)
+                match = self._match(conn, episode_id, signature, bands)
+                duplicate_of.append(match)
+                conn.execute(
+                    f"INSERT INTO {self.SIGNATURES} (episode_id, chunk_index, canonical, signature, duplicate_of)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (episode_id, chunk_index, match is None, array("Q", signature).tobytes(), match),
+                )
+                if match is None:
+                    self._add_to_buckets(conn, episode_id, chunk_index, bands)
+        return duplicate_of
+
+    def _delete(self, conn: sqlite3.Connection, episode_id: str) -> None:
+        conn.execute(f"DELETE FROM {self.SIGNATURES} WHERE episode_id = ?", (episode_id,))
+        conn.execute(f"DELETE FROM {self.BUCKETS} WHERE episode_id = ?", (episode_id,))
+
+    def remove(self, episode_id: str) -> None:
+        """Forget a deleted episode's signatures. Follow with `release`."""
+        with self._transaction() as conn:
+            self._delete(conn, episode_id)
+
+    def release(self, episode_id: str) -> dict[str, list[int]]:
+        """
+        Re-check the chunks recorded as duplicating `episode_id`.
+
+        Call after `episode_id` is re-assigned or removed. A chunk whose
+        passage is still canonical somewhere keeps its flag (pointing at
+        wherever that is now); the first remaining copy of a passage that
+        no longer is becomes canonical, and later copies duplicate it.
+        Returns the chunk indexes that became canonical, by episode.
+        """
+        promoted: dict[str, list[int]] = {}
+        with self._transaction() as conn:
+            rows = conn.execute(
+                f"SELECT episode_id, chunk_index, signature FROM {self.SIGNATURES}"
+                " WHERE duplicate_of = ? ORDER BY episode_id, chunk_index",
+                (episode_id,),
+            ).fetchall()
+            for other_episode, chunk_index, blob in rows:
+                signature = array("Q", blob).tolist()
+                bands = _bands(signature)
+                match = self._match(conn, other_episode, signature, bands)
+                conn.execute(
+                    f"UPDATE {self.SIGNATURES} SET canonical = ?, duplicate_of = ?"
+                    " WHERE episode_id = ? AND chunk_index = ?",
+                    (match is None, match, other_episode, chunk_index),
+                )
+                if match is None:
+                    self._add_to_buckets(conn, other_episode, chunk_index, bands)
+                    promoted.setdefault(other_episode, []).append(chunk_index)
+        return promoted
+
+
+class _MySQLConnection:
+    """The sqlite3 connection methods SignatureIndex uses, over a PyMySQL connection."""
+
+    def __init__(self, conn: pymysql.connections.Connection):
+        self._conn = conn
+
+    def execute(self, query: str, params: tuple = ()):
+        cursor = self._conn.cursor()
+        cursor.execute(query.replace("?", "%s"), params)
+        return cursor
+
+    def executemany(self, query: str, rows: list[tuple]):
+        cursor = self._conn.cursor()
+        cursor.executemany(query.replace("?", "%s"), rows)
+        return cursor
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class MySQLSignatureIndex(SignatureIndex):
+    """
+    SignatureIndex kept in the application's MySQL database.
+
+    Every API node and task worker sees the same index, so a passage has
+    one canonical copy however many replicas ingest. Writers take the
+    named lock LOCK_NAME for the length of a transaction, as SQLite's
+    BEGIN IMMEDIATE does, so that two episodes holding the same passage
+    cannot both find no canonical copy and both become canonical.
+    """
+
+    SIGNATURES = "dedup_signatures"
+    BUCKETS = "dedup_buckets"
+    LOCK_NAME = "dedup_signature_index"
+    LOCK_TIMEOUT_SECONDS = 30
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self._create_tables()
+
+    def _create_tables(self) -> None:
+        conn = self._connect()
+        try:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.SIGNATURES} ("
+                " episode_id VARCHAR(255) NOT NULL,"
+                " chunk_index INT NOT NULL,"
+                " canonical BOOLEAN NOT NULL,"
+                " signature VARBINARY(1024) NOT NULL,"
+                " duplicate_of VARCHAR(255),"
+                " PRIMARY KEY (episode_id, chunk_index),"
+                f" INDEX idx_{self.SIGNATURES}_duplicate_of (duplicate_of))"
+            )
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.BUCKETS} ("
+                " band SMALLINT NOT NULL,"
+                " bucket BIGINT NOT NULL,"
+                " episode_id VARCHAR(255) NOT NULL,"
+                " chunk_index INT NOT NULL,"
+                f" INDEX idx_{self.BUCKETS}_band (band, bucket),"
+                f" INDEX idx_{self.BUCKETS}_episode (episode_id))"
+            )
+        finally:
+            conn.close()
+
+    def _connect(self) -> _MySQLConnection:
+        return _MySQLConnection(pymysql.connect(
+            host=Config.DB_HOST,
+            port=int(Config.DB_PORT),
+            user=Config.DB_USER,
+            password=Config.DB_PASSWORD,
+            database=Config.DB_NAME,
+            autocommit=True,
+        ))
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connect()
+        try:
+            (locked,) = conn.execute(
+                "SELECT GET_LOCK(?, ?)", (self.LOCK_NAME, self.LOCK_TIMEOUT_SECONDS),
+            ).fetchone()
+            if locked != 1:
+                raise TimeoutError(f"Timed out waiting for the {self.LOCK_NAME} lock")
+            conn.execute("START TRANSACTION")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            # Closing the session also releases the named lock
+            conn.close()
+
+
+_index: SignatureIndex | None = None
+
+
+def get_dedup_index() -> SignatureIndex | None:
+    """Return the shared signature index, or None when DEDUP_MODE is off."""
+    global _index
+    if Config.DEDUP_MODE == "off":
+        return None
+    if _index is None:
+        if Config.DEDUP_INDEX_BACKEND == "sqlite":
+            _index = SignatureIndex(Config.DEDUP_INDEX_PATH, Config.DEDUP_THRESHOLD)
+        else:
+            _index = MySQLSignatureIndex(Config.DEDUP_THRESHOLD)
+    return _index
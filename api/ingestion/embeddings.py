@@ -0,0 +1,139 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from array import array
+import httpx
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed cache of embedding vectors keyed by model name and text hash.
+
+    Vectors are stored as packed float32. When the stored vectors exceed
+    `max_bytes`, the least recently used are evicted. Every call opens its
+    own connection, so the cache is safe to use from worker threads.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS vectors ("
+                " key TEXT PRIMARY KEY,"
+                " vector BLOB NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_vectors_accessed_at ON vectors (accessed_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode()).hexdigest()
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        """Return the cached vectors for whichever of `keys` are present."""
+        found: dict[str, list[float]] = {}
+        with self._connect() as conn:
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                part = keys[start:start + 500]
+                placeholders = ",".join("?" * len(part))
+                for key, blob in conn.execute(f"SELECT key, vector FROM vectors WHERE key IN ({placeholders})", part):
+                    found[key] = array("f", blob).tolist()
+            conn.executemany("UPDATE vectors SET accessed_at = ? WHERE key = ?", [(time.time(), k) for k in found])
+        return found
+
+    def put_many(self, vectors: dict[str, list[float]]) -> None:
+        """Store vectors, evicting least recently used entries if over the size limit."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO vectors (key, vector, accessed_at) VALUES (?, ?, ?)",
+                [(key, array("f", vector).tobytes(), now) for key, vector in vectors.items()],
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM vectors").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in conn.execute("SELECT key, LENGTH(vector) FROM vectors ORDER BY accessed_at"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM vectors WHERE key = ?", evicted)
+        logger.info(f"Embedding cache evicted {len(evicted)} entries")
+
+
+_cache: EmbeddingCache | None = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _cache
+    if _cache is None:
+        _cache = EmbeddingCache(Config.EMBEDDING_CACHE_PATH, Config.EMBEDDING_CACHE_MAX_MB * 1024 * 1024)
+    return _cache
+
+
+def _http_client() -> httpx.AsyncClient:
+    """Return a client for the OpenAI-compatible embeddings API at EMBEDDING_BASE_URL."""
+    return httpx.AsyncClient(
+        base_url=Config.EMBEDDING_BASE_URL,
+        headers={"Authorization": f"Bearer {Config.OPENAI_API_KEY}"},
+        timeout=60,
+    )
+
+
+async def _request_embeddings(client: httpx.AsyncClient, texts: list[str]) -> list[list[float]]:
+    response = await client.post("/embeddings", json={"model": Config.EMBEDDING_MODEL, "input": texts})
+    response.raise_for_status()
+    data = sorted(response.json()["data"], key=lambda item: item["index"])
+    return [item["embedding"] for item in data]
+
+
+async def embed_texts(texts: list[str], stats: dict | None = None) -> list[list[float]]:
+    """
+    Embed texts with Config.EMBEDDING_MODEL, reusing cached vectors.
+
+    Identical texts are embedded once. Only texts missing from the cache are
+    sent, in requests of Config.EMBEDDING_BATCH_SIZE. If `stats` is given it
+    is updated with embedded (texts sent) and cached (texts served from the
+    cache) counts.
+    """
+    logger.info(f"embed_texts called | texts={len(texts)}, model={Config.EMBEDDING_MODEL!r}")
+    cache = get_embedding_cache()
+    keys = [cache.key(Config.EMBEDDING_MODEL, text) for text in texts]
+    unique = dict(zip(keys, texts))
+
+    vectors = await asyncio.to_thread(cache.get_many, list(unique))
+    missing = [key for key in unique if key not in vectors]
+
+    if missing:
+        fresh: dict[str, list[float]] = {}
+        async with _http_client() as client:
+            for start in range(0, len(missing), Config.EMBEDDING_BATCH_SIZE):
+                batch = missing[start:start + Config.EMBEDDING_BATCH_SIZE]
+                embedded = await _request_embeddings(client, [unique[key] for key in batch])
+                fresh.update(zip(batch, embedded))
+        await asyncio.to_thread(cache.put_many, fresh)
+        vectors.update(fresh)
+
+    batch_stats = {"embedded": len(missing), "cached": len(unique) - len(missing)}
+    if stats is not None:
+        stats.update(batch_stats)
+    logger.info(f"embed_texts returned | {batch_stats}")
+    return [vectors[key] for key in keys]
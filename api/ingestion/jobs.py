@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import os
+import socket
+from config import Config
+from db.crud import (
+    claim_ingestion_job,
+    finish_ingestion_job,
+    get_claimable_ingestion_job_ids,
+    release_ingestion_job,
+    renew_ingestion_job_lease,
+    update_ingestion_job,
+)
+from ingestion.pipeline import ingest_directory
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = ("completed", "failed")
+
+
+class IngestionJobQueue:
+    """
+    Queue of directory ingestion jobs stored in MySQL.
+
+    Jobs are persisted by db.crud.create_ingestion_job and submitted here by
+    ID; a pool of worker tasks runs them one at a time each, writing progress
+    back to the job row and publishing it to any subscribed event streams.
+
+    A worker runs a job only once it holds the job's lease (see
+    db.crud.claim_ingestion_job), renewed every third of its length, so with
+    several API nodes each job runs on one of them. Every node also checks
+    every Config.INGEST_JOB_POLL_SECONDS for jobs nobody holds: queued ones,
+    and running ones whose node died and let the lease expire.
+    """
+
+    def __init__(self):
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        # Jobs queued or running here, so polls do not queue them twice
+        self._queued: set[str] = set()
+        self._workers: list[asyncio.Task] = []
+        self._poller: asyncio.Task | None = None
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self.node = f"{socket.gethostname()}:{os.getpid()}"
+
+    async def start(self, workers: int | None = None) -> None:
+        """Start the worker pool, queueing jobs that no node holds."""
+        workers = max(1, workers or Config.INGEST_JOB_WORKERS)
+        await self._requeue()
+        self._workers = [asyncio.create_task(self._worker(n)) for n in range(workers)]
+        self._poller = asyncio.create_task(self._poll())
+        logger.info(f"Ingestion job queue started | node={self.node}, workers={workers}")
+
+    async def stop(self) -> None:
+        """Cancel the workers. Jobs they hold are handed back as queued."""
+        tasks = self._workers + ([self._poller] if self._poller else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._poller = None
+
+    def submit(self, job_id: str) -> None:
+        if job_id not in self._queued:
+            self._queued.add(job_id)
+            self._queue.put_nowait(job_id)
+
+    async def _requeue(self) -> None:
+        for job_id in await get_claimable_ingestion_job_ids():
+            if job_id not in self._queued:
+                logger.info(f"Queueing unclaimed ingestion job {job_id}")
+                self.submit(job_id)
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(Config.INGEST_JOB_POLL_SECONDS)
+            try:
+                await self._requeue()
+            except Exception:
+                logger.exception("Could not check for unclaimed ingestion jobs")
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        """Return a queue that receives this job's progress events."""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(job_id)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[job_id]
+
+    def _publish(self, job_id: str, event: dict) -> None:
+        for queue in self._subscribers.get(job_id, ()):
+            queue.put_nowait(event)
+
+    async def _worker(self, n: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self.run_job(job_id)
+            except Exception:
+                logger.exception(f"Ingestion worker {n} failed on job {job_id}")
+            finally:
+                self._queued.discard(job_id)
+                self._queue.task_done()
+
+    async def _heartbeat(self, job_id: str, ingest: asyncio.Task) -> None:
+        """Renew the job's lease until cancelled; cancel `ingest` if the lease is lost."""
+        lease = Config.INGEST_JOB_LEASE_SECONDS
+        while True:
+            await asyncio.sleep(lease / 3)
+            try:
+                renewed = await renew_ingestion_job_lease(job_id, self.node, lease)
+            except Exception:
+                # The next beat may still land before the lease runs out
+                logger.exception(f"Could not renew the lease on ingestion job {job_id}")
+                continue
+            if not renewed:
+                logger.warning(f"Lost the lease on ingestion job {job_id}; abandoning it")
+                ingest.cancel()
+                return
+
+    async def run_job(self, job_id: str) -> None:
+        """Claim a job and run it to completion, recording progress as files finish."""
+        job = await claim_ingestion_job(job_id, self.node, Config.INGEST_JOB_LEASE_SECONDS)
+        if job is None:
+            # Finished, gone, or running on another node
+            return
+        logger.info(f"run_job called | job_id={job_id}, directory_path={job.directory_path!r}")
+
+        progress = {"files_total": 0, "files_done": 0, "files_failed": 0, "chunks_written": 0}
+        errors: list[dict] = []
+        # Progress callbacks from concurrent files must reach the row in order
+        lock = asyncio.Lock()
+
+        async def save(event_type: str, **fields) -> None:
+            async with lock:
+                await update_ingestion_job(job_id, **progress, errors=list(errors), **fields)
+            self._publish(job_id, {"type": event_type, "job_id": job_id, **progress, **fields})
+
+        async def on_progress(event: dict) -> None:
+            progress["files_total"] = event["files_total"]
+            if event["type"] == "started":
+                return await save("started")
+            result = event["result"]
+            progress["files_done"] += 1
+            progress["chunks_written"] += result.get("chunks_created", 0)
+            if result["status"] == "error":
+                progress["files_failed"] += 1
+                errors.append({"file_path": result["file_path"], "error": result["error"]})
+            await save("file", file_path=result["file_path"], file_status=result["status"])
+
+        ingest = asyncio.create_task(ingest_directory(
+            job.directory_path,
+            force=job.force,
+            concurrency=job.concurrency,
+            use_cache=job.use_cache,
+            on_progress=on_progress,
+        ))
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, ingest))
+        try:
+            await ingest
+            status = "completed"
+        except asyncio.CancelledError:
+            if heartbeat.done():
+                # Lease lost; whoever holds it now runs the job
+                return
+            ingest.cancel()
+            await release_ingestion_job(job_id, self.node)
+            raise
+        except Exception as e:
+            logger.exception(f"Ingestion job {job_id} failed")
+            errors.append({"file_path": None, "error": f"{type(e).__name__}: {e}"})
+            status = "failed"
+        finally:
+            heartbeat.cancel()
+
+        async with lock:
+            finished_at = await finish_ingestion_job(job_id, self.node, **progress, errors=list(errors), status=status)
+        if finished_at is None:
+            logger.warning(f"Lost the lease on ingestion job {job_id} before recording it {status}")
+            return
+        self._publish(job_id, {
+            "type": "finished", "job_id": job_id, **progress, "status": status, "finished_at": finished_at,
+        })
+        logger.info(f"run_job returned | job_id={job_id}, status={status}, {progress}")
+
+
+job_queue = IngestionJobQueue()
@@ -0,0 +1,89 @@
+import json
+import re
+
+_FENCE = re.compile(r"^```[a-zA-Z]*\s*\n?|\n?```\s*$")
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def _strip_fences(content: str) -> str:
+    return _FENCE.sub("", content.strip()).strip()
+
+
+def _complete_prefix(text: str) -> str | None:
+    """
+    Cut truncated JSON back to its last complete value and close what is open.
+
+    Walks the text tracking open brackets and strings. Every closing bracket
+    and every comma outside a string is a point where everything before it
+    is complete; the text is cut at the last such point and the brackets
+    still open there are closed. Returns None if the text is already
+    balanced or has no complete value to keep.
+    """
+    stack: list[str] = []
+    in_string = escaped = False
+    cut: tuple[int, list[str]] | None = None
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(ch)
+            if cut is None:
+                cut = (i + 1, list(stack))
+        elif ch in "}]":
+            if not stack:
+                return None
+            stack.pop()
+            if not stack:
+                # A complete top-level value; anything after it is trailing text
+                return text[:i + 1]
+            cut = (i + 1, list(stack))
+        elif ch == ",":
+            cut = (i, list(stack))
+    if not stack or cut is None:
+        return None
+    end, open_brackets = cut
+    prefix = text[:end].rstrip().rstrip(",")
+    # A dangling key ("key": with no value) cannot be kept
+    prefix = re.sub(r',?\s*"[^"]*"\s*:\s*$', "", prefix)
+    return prefix + "".join(_CLOSERS[b] for b in reversed(open_brackets))
+
+
+def parse_lenient(content: str):
+    """
+    Parse an LLM's JSON answer, repairing common damage.
+
+    Returns (value, repaired). Markdown fences, text before the first { or
+    [, text after the value, trailing commas and output truncated mid-value
+    (e.g. at the completion token limit) are all tolerated; a truncated
+    array keeps its complete elements. `repaired` is True when anything but
+    the fences had to be fixed. Raises json.JSONDecodeError if nothing
+    usable is left.
+    """
+    text = _strip_fences(content)
+    try:
+        return json.loads(text), False
+    except json.JSONDecodeError as e:
+        error = e
+
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        raise error
+    candidate = _TRAILING_COMMA.sub(r"\1", text[min(starts):])
+    prefix = _complete_prefix(candidate)
+    for attempt in (candidate, prefix):
+        if attempt is None:
+            continue
+        try:
+            return json.loads(_TRAILING_COMMA.sub(r"\1", attempt)), True
+        except json.JSONDecodeError:
+            continue
+    raise error
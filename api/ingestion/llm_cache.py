@@ -0,0 +1,109 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """
+    SQLite-backed cache of LLM responses keyed by model name and prompt hash.
+
+    Only meant for deterministic (temperature 0) ingestion prompts. When the
+    stored responses exceed `max_bytes`, the least recently used are evicted.
+    Every call opens its own connection, so the cache is safe to use from
+    worker threads.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " model TEXT NOT NULL,"
+                " response TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses (accessed_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def _key(model: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model}\0{prompt}".encode()).hexdigest()
+
+    def get(self, model: str, prompt: str) -> str | None:
+        """Return the cached response for this model and prompt, or None."""
+        key = self._key(model, prompt)
+        with self._connect() as conn:
+            row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def put(self, model: str, prompt: str, response: str) -> None:
+        """Store a response, evicting least recently used entries if over the size limit."""
+        size = len(response.encode())
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (self._key(model, prompt), model, response, size, time.time()),
+            )
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        logger.info(f"LLM cache evicted {len(evicted)} entries")
+
+
+_cache: LLMCache | None = None
+
+
+def get_llm_cache() -> LLMCache | None:
+    """Return the shared cache, or None when LLM_CACHE_ENABLED is off."""
+    global _cache
+    if not Config.LLM_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = LLMCache(Config.LLM_CACHE_PATH, Config.LLM_CACHE_MAX_MB * 1024 * 1024)
+    return _cache
+
+
+async def lookup(prompt: str, use_cache: bool = True) -> str | None:
+    """Return a cached response for the configured model, or None on a miss or bypass."""
+    cache = get_llm_cache()
+    if cache is None or not use_cache:
+        return None
+    return await asyncio.to_thread(cache.get, Config.OPENAI_MODEL, prompt)
+
+
+async def store(prompt: str, response: str) -> None:
+    """
+    Cache a response that parsed successfully.
+
+    Runs even when lookups are bypassed, so a bypassed run refreshes the cache.
+    """
+    cache = get_llm_cache()
+    if cache is not None:
+        await asyncio.to_thread(cache.put, Config.OPENAI_MODEL, prompt, response)
@@ -1,8 +1,14 @@
-import json
 import logging
 import re
-from agents.utils.llm import get_llm
-from models.schemas import EpisodeMetadata, ParsedCue
+from agents.utils.llm import get_llm, json_response_format
+from agents.utils.llm_scheduler import BATCH
+from config import Config
+from ingestion import llm_cache
+from ingestion.json_repair import parse_lenient
+from ingestion.metrics import IngestMetrics
+from ingestion.transcript import TokenizedTranscript, tokenize
+from ingestion.vtt_parser import Cue
+from models.schemas import EpisodeMetadata
 
 logger = logging.getLogger(__name__)
 
@@ -49,22 +55,64 @@ Extract and return a JSON object with:
 
 Return ONLY the JSON object, no other text."""
 
+# Structured output schema for METADATA_EXTRACTION_PROMPT (strict mode: all fields required)
+METADATA_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "guest_names": {"type": "array", "items": {"type": "string"}},
+        "host_names": {"type": "array", "items": {"type": "string"}},
+        "industry": {"type": "string"},
+        "topic_tags": {"type": "array", "items": {"type": "string"}},
+        "summary": {"type": "string"},
+    },
+    "required": ["title", "guest_names", "host_names", "industry", "topic_tags", "summary"],
+    "additionalProperties": False,
+}
+
+
+def _valid_fields(data: dict) -> dict:
+    """Keep the fields of a parsed response whose values have the schema's type."""
+    valid = {}
+    for name, spec in METADATA_SCHEMA["properties"].items():
+        value = data.get(name)
+        if spec["type"] == "string" and isinstance(value, str):
+            valid[name] = value
+        elif spec["type"] == "array" and isinstance(value, list):
+            valid[name] = [v for v in value if isinstance(v, str)]
+    return valid
+
 
 async def extract_metadata(
     filename: str,
-    segments: list[ParsedCue],
+    segments: list[Cue],
+    use_cache: bool = True,
+    transcript: TokenizedTranscript | None = None,
+    metrics: IngestMetrics | None = None,
 ) -> EpisodeMetadata:
-    """Extract episode metadata from filename and transcript content using LLM."""
+    """
+    Extract episode metadata from filename and transcript content using LLM.
+
+    Pass the episode's TokenizedTranscript to reuse its word split. Responses
+    are served from the LLM cache when available; use_cache=False forces a
+    fresh call. Damaged JSON is repaired where possible but never cached; an
+    unusable answer, or a repaired one missing a required field, is asked
+    for again up to Config.LLM_MAX_RETRIES times before falling back to
+    what the filename gives. LLM calls, token usage, retries,
+    repaired_responses and failed_responses are counted under the
+    "metadata" stage of `metrics`.
+    """
     logger.info(f"extract_metadata called | filename={filename!r}, segments={len(segments)}")
+    metrics = metrics or IngestMetrics()
     file_meta = extract_from_filename(filename)
 
     # Build intro and outro text
-    all_text = " ".join(seg.text for seg in segments)
-    words = all_text.split()
-    intro_text = " ".join(words[:2000])
-    outro_text = " ".join(words[-500:]) if len(words) > 500 else ""
+    if transcript is None:
+        transcript = tokenize(segments)
+    word_count = transcript.word_count
+    intro_text = transcript.text(0, 2000)
+    outro_text = transcript.text(word_count - 500, word_count) if word_count > 500 else ""
 
-    llm = get_llm(temperature=0.0)
     prompt = METADATA_EXTRACTION_PROMPT.format(
         filename=filename,
         title=file_meta["title"],
@@ -73,19 +121,59 @@ async def extract_metadata(
         outro_text=outro_text,
     )
 
-    response = await llm.ainvoke(prompt)
-    content = response.content.strip()
-
-    # Strip markdown code fences if present
-    if content.startswith("```"):
-        content = content.split("\n", 1)[1]
-        content = content.rsplit("```", 1)[0]
-
-    try:
-        data = json.loads(content)
-    except json.JSONDecodeError:
-        logger.warning(f"Failed to parse metadata extraction response for {filename}")
-        data = {}
+    data: dict = {}
+    for attempt in range(Config.LLM_MAX_RETRIES + 1):
+        # Only well-formed answers are cached, so a retry always needs a fresh call
+        content = await llm_cache.lookup(prompt, use_cache) if attempt == 0 else None
+        from_cache = content is not None
+        if from_cache:
+            logger.info(f"Metadata extraction served from LLM cache for {filename}")
+            metrics.count("metadata", llm_cache_hits=1)
+        else:
+            llm = get_llm(
+                temperature=0.0,
+                priority=BATCH,
+                response_format=json_response_format("episode_metadata", METADATA_SCHEMA),
+            )
+            response = await llm.ainvoke(prompt)
+            metrics.record_llm_response("metadata", response)
+            content = response.content
+
+        try:
+            parsed, repaired = parse_lenient(content)
+            if not isinstance(parsed, dict):
+                raise ValueError("metadata response is not a JSON object")
+        except ValueError:
+            logger.warning(
+                f"Failed to parse metadata extraction response for {filename} "
+                f"(attempt {attempt + 1}/{Config.LLM_MAX_RETRIES + 1})"
+            )
+            if attempt < Config.LLM_MAX_RETRIES:
+                metrics.count("metadata", retries=1)
+            continue
+
+        valid = _valid_fields(parsed)
+        if repaired:
+            metrics.count("metadata", repaired_responses=1)
+            missing = [name for name in METADATA_SCHEMA["required"] if name not in valid]
+            if missing:
+                # A repaired (usually truncated) response that lost fields is a failed attempt
+                logger.warning(
+                    f"Repaired metadata extraction response for {filename} is missing {missing} "
+                    f"(attempt {attempt + 1}/{Config.LLM_MAX_RETRIES + 1})"
+                )
+                data = {**valid, **data}
+                if attempt < Config.LLM_MAX_RETRIES:
+                    metrics.count("metadata", retries=1)
+                continue
+        elif not from_cache:
+            await llm_cache.store(prompt, content)
+        data = valid
+        break
+    else:
+        # Whatever fields a partial answer recovered are kept; the filename fills in the rest
+        logger.error(f"Falling back to filename metadata for {filename} after {Config.LLM_MAX_RETRIES + 1} attempts")
+        metrics.count("metadata", failed_responses=1)
 
     result = EpisodeMetadata(
         title=data.get("title", file_meta["title"]),
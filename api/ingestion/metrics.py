@@ -0,0 +1,125 @@
+import math
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Pipeline stages in order; write includes the episode upsert and chunk deletes
+STAGES = ("hash", "parse", "metadata", "speakers", "chunk", "dedup", "embed", "write")
+
+# Counters every stage reports, so totals line up across stages and episodes
+COUNTERS = (
+    "llm_calls", "prompt_tokens", "completion_tokens", "retries", "repaired_responses", "documents_written",
+)
+
+
+# Stack of [metrics, stage, started] frames entered in the current task,
+# innermost last; concurrent tasks each get their own copy
+_active_stages: ContextVar[tuple] = ContextVar("active_ingest_stages", default=())
+
+
+def _stage_order(name: str) -> int:
+    return STAGES.index(name) if name in STAGES else len(STAGES)
+
+
+class IngestMetrics:
+    """
+    Per-stage timings and counters for one ingest_file run.
+
+    Time spent in `stage(name)` blocks is added to that stage. A stage
+    entered inside another (embed inside write) pauses the outer one, so
+    nested stages do not double count. Stages run in concurrent tasks
+    (metadata and speakers) are timed independently and overlap. Besides
+    the common COUNTERS a stage can carry its own, such as
+    heuristic_labeled for speakers.
+    """
+
+    def __init__(self):
+        self.stages: dict[str, dict] = {}
+
+    def _entry(self, name: str) -> dict:
+        return self.stages.setdefault(name, {"seconds": 0.0, **dict.fromkeys(COUNTERS, 0)})
+
+    def _outer_frame(self) -> list | None:
+        frames = _active_stages.get()
+        if frames and frames[-1][0] is self:
+            return frames[-1]
+        return None
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        now = time.perf_counter()
+        outer = self._outer_frame()
+        if outer is not None:
+            self._entry(outer[1])["seconds"] += now - outer[2]
+        frame = [self, name, now]
+        token = _active_stages.set(_active_stages.get() + (frame,))
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            self._entry(name)["seconds"] += now - frame[2]
+            _active_stages.reset(token)
+            if outer is not None:
+                outer[2] = now
+
+    def count(self, stage: str, **counters: int) -> None:
+        entry = self._entry(stage)
+        for name, value in counters.items():
+            entry[name] = entry.get(name, 0) + value
+
+    def record_llm_response(self, stage: str, response) -> None:
+        """Count one LLM call and the token usage reported on its response message."""
+        usage = getattr(response, "usage_metadata", None)
+        if not isinstance(usage, dict):
+            usage = {}
+        self.count(
+            stage,
+            llm_calls=1,
+            prompt_tokens=usage.get("input_tokens", 0),
+            completion_tokens=usage.get("output_tokens", 0),
+        )
+
+    def to_dict(self) -> dict[str, dict]:
+        return {
+            name: {**self.stages[name], "seconds": round(self.stages[name]["seconds"], 4)}
+            for name in sorted(self.stages, key=_stage_order)
+        }
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def summarize(per_file: list[dict[str, dict]], durations: list[float] = ()) -> dict:
+    """
+    Aggregate IngestMetrics.to_dict() outputs from many files.
+
+    Each stage gets the sum of its counters over the files that ran it, the
+    number of such files (`episodes`) and the p50/p95 of its per-file
+    seconds. `totals` sums the common counters over all stages; its seconds
+    is the sum of the files' wall times in `durations`, since stage times
+    overlap (metadata and speakers) and would overstate it.
+    """
+    stages: dict[str, dict] = {}
+    seconds: dict[str, list[float]] = {}
+    for metrics in per_file:
+        for name, entry in metrics.items():
+            summary = stages.setdefault(name, {"episodes": 0})
+            summary["episodes"] += 1
+            for counter, value in entry.items():
+                summary[counter] = summary.get(counter, 0) + value
+            seconds.setdefault(name, []).append(entry.get("seconds", 0.0))
+
+    for name, summary in stages.items():
+        summary["seconds"] = round(summary.get("seconds", 0.0), 4)
+        summary["p50_seconds"] = round(_percentile(seconds[name], 0.5), 4)
+        summary["p95_seconds"] = round(_percentile(seconds[name], 0.95), 4)
+
+    totals = {
+        "seconds": round(sum(durations), 4),
+        **{counter: sum(s.get(counter, 0) for s in stages.values()) for counter in COUNTERS},
+    }
+    return {"stages": {name: stages[name] for name in sorted(stages, key=_stage_order)}, "totals": totals}
@@ -1,11 +1,27 @@
+import asyncio
+import functools
+import hashlib
+import json
 import logging
 import os
+import posixpath
+import threading
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from concurrent.futures import Executor
 import typesense
 from config import Config
+from ingestion.archives import count_members, is_archive, iter_members, parse_member
+from ingestion.artifacts import ArtifactStore, get_artifact_store, segments_from_json, segments_to_json
+from ingestion.dedup import get_dedup_index, minhash_all
+from ingestion.embeddings import embed_texts
+from ingestion.metrics import IngestMetrics, summarize
 from ingestion.vtt_parser import parse_vtt
 from ingestion.chunker import chunk_segments
 from ingestion.speaker_detector import detect_speakers
 from ingestion.metadata_extractor import extract_metadata, extract_from_filename
+from ingestion.transcript import tokenize
+from models.schemas import EpisodeMetadata, TranscriptChunk
 
 logger = logging.getLogger(__name__)
 
@@ -23,100 +39,1038 @@ def _get_typesense_client() -> typesense.Client:
     })
 
 
-async def ingest_file(file_path: str, force: bool = False) -> dict:
+def _import_documents(
+    client: typesense.Client,
+    collection: str,
+    documents: list[dict],
+    action: str = "upsert",
+    metrics: IngestMetrics | None = None,
+) -> dict:
+    """
+    Bulk write documents through Typesense's JSONL import endpoint.
+
+    `action` is "upsert" for whole documents or "update" for partial ones.
+    Documents rejected inside a batch are retried one at a time with the
+    same action (counted as "write" retries in `metrics`); any that still
+    fail are returned with their error. Blocking, so callers on the event
+    loop should run it in a thread.
+    """
+    if not documents:
+        return {"written": 0, "failed": []}
+
+    responses = client.collections[collection].documents.import_(
+        documents,
+        {
+            "action": action,
+            "remote_embedding_batch_size": Config.TS_EMBEDDING_BATCH_SIZE,
+        },
+        batch_size=Config.TS_IMPORT_BATCH_SIZE,
+    )
+
+    rejected = [
+        (doc, outcome.get("error", ""))
+        for doc, outcome in zip(documents, responses)
+        if not outcome.get("success", False)
+    ]
+    if rejected and metrics is not None:
+        metrics.count("write", retries=len(rejected))
+    failed = []
+    for doc, error in rejected:
+        logger.warning(f"Bulk import rejected {doc['id']} ({error}); retrying individually")
+        try:
+            if action == "update":
+                client.collections[collection].documents[doc["id"]].update(doc)
+            else:
+                client.collections[collection].documents.upsert(doc)
+        except typesense.exceptions.TypesenseClientError as e:
+            logger.error(f"Upsert retry failed for {doc['id']}: {e}")
+            failed.append({"id": doc["id"], "error": str(e)})
+
+    return {"written": len(documents) - len(failed), "failed": failed}
+
+
+def _episode_id(filename: str) -> str:
+    """Derive the Typesense episode id from a VTT filename."""
+    return filename.replace(".vtt", "").replace(" ", "_").lower()
+
+
+def _file_hash(file_path: str) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _filter_value(value: str) -> str:
+    """Quote a value for use in a Typesense filter_by expression."""
+    escaped = value.replace("`", "\\`")
+    return f"`{escaped}`"
+
+
+def _retrieve_episode(client: typesense.Client, episode_id: str) -> dict | None:
+    """Return the indexed episode document, or None if it does not exist."""
+    try:
+        return client.collections["episodes"].documents[episode_id].retrieve()
+    except typesense.exceptions.ObjectNotFound:
+        return None
+
+
+def _check_skip(client: typesense.Client, episode_id: str, content_hash: str, existing: dict | None) -> dict | None:
+    """
+    Return a skip result if this content does not need ingesting, else None.
+
+    An episode is unchanged when its stored content_hash matches. Episodes
+    indexed before hashes were stored are treated as unchanged; re-ingest
+    them with force=True. Identical content already indexed under another
+    episode id is reported as a duplicate.
+    """
+    if existing is not None and existing.get("content_hash", content_hash) == content_hash:
+        logger.info(f"Skipping unchanged episode: {episode_id}")
+        return {"status": "skipped", "episode_id": episode_id, "chunks_created": 0}
+
+    results = client.collections["episodes"].documents.search({
+        "q": "*",
+        "filter_by": f"content_hash:={_filter_value(content_hash)}",
+        "include_fields": "id",
+        "per_page": 2,
+    })
+    for hit in results.get("hits", []):
+        other_id = hit["document"]["id"]
+        if other_id != episode_id:
+            logger.info(f"Skipping {episode_id}: same content as already-ingested episode {other_id}")
+            return {"status": "duplicate", "episode_id": episode_id, "chunks_created": 0, "duplicate_of": other_id}
+    return None
+
+
+def _delete_stale_chunks(client: typesense.Client, episode_id: str, chunk_count: int) -> int:
+    """Delete chunks left over from a previous ingest that produced more chunks."""
+    response = client.collections["transcript_chunks"].documents.delete({
+        "filter_by": f"episode_id:={_filter_value(episode_id)} && chunk_index:>={chunk_count}",
+    })
+    return response.get("num_deleted", 0)
+
+
+def _content_chunk_ids(episode_id: str, chunks: list[TranscriptChunk]) -> list[str]:
+    """
+    Derive chunk ids from chunk text, so unchanged text keeps its id when
+    chunks around it move. Repeated text within an episode gets a numbered
+    suffix.
+    """
+    ids = []
+    seen: dict[str, int] = {}
+    for chunk in chunks:
+        digest = hashlib.sha256(chunk.text.encode()).hexdigest()[:16]
+        seen[digest] = seen.get(digest, 0) + 1
+        ids.append(f"{episode_id}_{digest}" if seen[digest] == 1 else f"{episode_id}_{digest}_{seen[digest]}")
+    return ids
+
+
+# Chunk fields besides text; a change to these alone is a partial update
+_CHUNK_FIELDS = tuple(name for name in TranscriptChunk.model_fields if name != "text")
+
+
+def _export_chunks(client: typesense.Client, episode_id: str) -> dict[str, dict]:
+    """Return an episode's indexed chunks by id, without text or embeddings."""
+    jsonl = client.collections["transcript_chunks"].documents.export({
+        "filter_by": f"episode_id:={_filter_value(episode_id)}",
+        "include_fields": ",".join(("id", *_CHUNK_FIELDS)),
+    })
+    docs = (json.loads(line) for line in jsonl.splitlines() if line.strip())
+    return {doc["id"]: doc for doc in docs}
+
+
+def _chunk_fields_changed(new: dict, old: dict) -> bool:
+    for name in _CHUNK_FIELDS:
+        if isinstance(new[name], float):
+            # Typesense stores float fields in single precision
+            if abs(new[name] - old.get(name, float("inf"))) > 1e-3:
+                return True
+        elif new[name] != old.get(name):
+            return True
+    return False
+
+
+def _delete_chunks_by_id(client: typesense.Client, ids: list[str]) -> int:
+    deleted = 0
+    for start in range(0, len(ids), 100):
+        id_list = ",".join(_filter_value(i) for i in ids[start:start + 100])
+        response = client.collections["transcript_chunks"].documents.delete({"filter_by": f"id:[{id_list}]"})
+        deleted += response.get("num_deleted", 0)
+    return deleted
+
+
+async def _write_chunks(
+    client: typesense.Client,
+    episode_id: str,
+    chunks: list[TranscriptChunk],
+    replace: bool,
+    metrics: IngestMetrics | None = None,
+) -> dict:
+    """
+    Write an episode's chunks to Typesense.
+
+    With CHUNK_ID_MODE=position, chunk ids are `{episode_id}_chunk_{i}`;
+    every chunk is imported, then any higher-numbered chunks left by a
+    previous ingest are deleted when `replace` is set.
+
+    With CHUNK_ID_MODE=content, ids come from the chunk text and the new set
+    is diffed against the indexed chunks: only new text is imported (and
+    embedded), chunks whose text is unchanged but whose position, times or
+    metadata moved get a partial update, and chunks no longer present are
+    deleted.
+
+    With EMBEDDING_MODE=client the vectors for imported chunks are computed
+    here (see embeddings.embed_texts) and sent in the `embedding` field, so
+    Typesense does not embed them itself.
+
+    With DEDUP_MODE=skip, chunks flagged as boilerplate (see
+    _flag_boilerplate) are left out, and deleted if a previous ingest wrote
+    them.
+
+    Returns written/failed counts as from _import_documents, plus updated,
+    unchanged, skipped and deleted counts. Embedding time and counts go to the
+    "embed" stage of `metrics`, documents written and retries to "write".
+    """
+    metrics = metrics or IngestMetrics()
+    if Config.CHUNK_ID_MODE == "content":
+        ids = _content_chunk_ids(episode_id, chunks)
+    else:
+        ids = [f"{episode_id}_chunk_{i}" for i in range(len(chunks))]
+    chunk_docs = [{"id": doc_id, **chunk.model_dump()} for doc_id, chunk in zip(ids, chunks)]
+    skipped_ids = []
+    if Config.DEDUP_MODE == "skip":
+        skipped_ids = [doc["id"] for doc in chunk_docs if doc["boilerplate"]]
+        chunk_docs = [doc for doc in chunk_docs if not doc["boilerplate"]]
+
+    indexed: dict[str, dict] = {}
+    if Config.CHUNK_ID_MODE == "content":
+        indexed = await asyncio.to_thread(_export_chunks, client, episode_id)
+    new_docs = [doc for doc in chunk_docs if doc["id"] not in indexed]
+    moved_docs = [
+        {"id": doc["id"], **{name: doc[name] for name in _CHUNK_FIELDS}}
+        for doc in chunk_docs
+        if doc["id"] in indexed and _chunk_fields_changed(doc, indexed[doc["id"]])
+    ]
+
+    if Config.EMBEDDING_MODE == "client" and new_docs:
+        embed_stats: dict = {}
+        with metrics.stage("embed"):
+            vectors = await embed_texts([doc["text"] for doc in new_docs], stats=embed_stats)
+        metrics.count("embed", **embed_stats)
+        for doc, vector in zip(new_docs, vectors):
+            doc["embedding"] = vector
+    import_result = await asyncio.to_thread(
+        _import_documents, client, "transcript_chunks", new_docs, metrics=metrics,
+    )
+    update_result = {"written": 0, "failed": []}
+    if moved_docs:
+        update_result = await asyncio.to_thread(
+            _import_documents, client, "transcript_chunks", moved_docs, "update", metrics,
+        )
+
+    deleted = 0
+    if Config.CHUNK_ID_MODE == "content":
+        current = {doc["id"] for doc in chunk_docs}
+        removed = [doc_id for doc_id in indexed if doc_id not in current]
+        if removed:
+            deleted = await asyncio.to_thread(_delete_chunks_by_id, client, removed)
+    elif replace:
+        deleted = await asyncio.to_thread(_delete_stale_chunks, client, episode_id, len(ids))
+        if skipped_ids:
+            deleted += await asyncio.to_thread(_delete_chunks_by_id, client, skipped_ids)
+
+    result = {
+        "written": import_result["written"],
+        "failed": import_result["failed"] + update_result["failed"],
+        "updated": update_result["written"],
+        "unchanged": len(chunk_docs) - len(new_docs) - len(moved_docs),
+        "skipped": len(skipped_ids),
+        "deleted": deleted,
+    }
+    metrics.count(
+        "write",
+        documents_written=result["written"] + result["updated"],
+        documents_deleted=deleted,
+        documents_skipped=result["skipped"],
+    )
+    logger.info(
+        f"Wrote chunks for {episode_id} | {len(ids)} chunks, written={result['written']}, "
+        f"updated={result['updated']}, unchanged={result['unchanged']}, skipped={result['skipped']}, "
+        f"failed={len(result['failed'])}, deleted={deleted}"
+    )
+    return result
+
+
+async def _flag_boilerplate(
+    episode_id: str,
+    chunks: list[TranscriptChunk],
+    executor: Executor | None = None,
+    metrics: IngestMetrics | None = None,
+) -> None:
+    """
+    Set `boilerplate` on chunks that near-duplicate another episode's.
+
+    Signatures are computed in `executor` when given and checked against
+    the shared signature index (see ingestion.dedup), which then holds this
+    episode's chunks. Chunks of other episodes that this episode no longer
+    holds the canonical copy for are promoted (see _write_promoted). Does
+    nothing with DEDUP_MODE=off. Time and boilerplate_chunks are counted
+    under the "dedup" stage of `metrics`.
+    """
+    index = get_dedup_index()
+    if index is None or not chunks:
+        return
+    metrics = metrics or IngestMetrics()
+    with metrics.stage("dedup"):
+        signatures = await _run_cpu(executor, minhash_all, [chunk.text for chunk in chunks])
+        duplicate_of = await asyncio.to_thread(index.assign, episode_id, signatures)
+        promoted = await asyncio.to_thread(index.release, episode_id)
+    if promoted:
+        await _write_promoted(promoted)
+    for chunk, other in zip(chunks, duplicate_of):
+        chunk.boilerplate = other is not None
+    flagged = sum(other is not None for other in duplicate_of)
+    metrics.count("dedup", boilerplate_chunks=flagged)
+    if flagged:
+        sources = sorted({other for other in duplicate_of if other is not None})
+        logger.info(f"{flagged} of {len(chunks)} chunks of {episode_id} duplicate other episodes: {', '.join(sources)}")
+
+
+async def plan_file(file_path: str, force: bool = False) -> dict:
+    """
+    Report what ingest_file would do with a file, without parsing it or
+    calling the LLM: "ingest", "skipped" (unchanged) or "duplicate".
+    """
+    filename = os.path.basename(file_path)
+    episode_id = _episode_id(filename)
+    plan = {"file_path": file_path, "episode_id": episode_id, "action": "ingest"}
+    if force:
+        return plan
+
+    content_hash = await asyncio.to_thread(_file_hash, file_path)
+    client = _get_typesense_client()
+    existing = await asyncio.to_thread(_retrieve_episode, client, episode_id)
+    skipped = await asyncio.to_thread(_check_skip, client, episode_id, content_hash, existing)
+    if skipped is not None:
+        plan["action"] = skipped["status"]
+        if skipped.get("duplicate_of"):
+            plan["duplicate_of"] = skipped["duplicate_of"]
+    return plan
+
+
+def _same_guest(a: str, b: str) -> bool:
+    """Whether two guest names are the same, ignoring case and spacing."""
+    return " ".join(a.split()).casefold() == " ".join(b.split()).casefold()
+
+
+async def _run_cpu(executor: Executor | None, fn, /, *args, **kwargs):
+    """Run CPU-bound work inline, or in `executor` (e.g. a process pool) when given."""
+    if executor is None:
+        return fn(*args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(executor, functools.partial(fn, *args, **kwargs))
+
+
+async def ingest_file(
+    file_path: str,
+    force: bool = False,
+    use_cache: bool = True,
+    executor: Executor | None = None,
+) -> dict:
     """
     Run the full ingestion pipeline for a single VTT file.
 
-    Flow: parse VTT → detect speakers → extract metadata → chunk → upsert to Typesense
+    Flow: hash → parse VTT → (extract metadata ‖ detect speakers) → chunk → dedup → upsert to Typesense
+
+    Speaker detection runs alongside metadata extraction using the guest
+    name from the filename; it is redone only if the extracted guest differs.
 
-    If the episode already exists in Typesense, it is skipped unless force=True.
+    Unless force=True, files whose content hash matches the indexed episode
+    are skipped, as are files whose content is already indexed under another
+    name. The hash is stored on the episode only once every chunk is written,
+    so an interrupted ingest is redone on the next run. Each stage's output
+    is kept in the artifact store under the content hash, so that rerun
+    resumes after the last completed stage. use_cache=False bypasses the
+    LLM response cache and stored artifacts for this run.
+
+    Parsing and chunking run in `executor` when one is given, so a process
+    pool can take them off the event loop; LLM and Typesense calls stay here.
+
+    The result's `metrics` hold each stage's seconds, LLM calls, token
+    usage, retries and documents written (see ingestion.metrics).
     """
     logger.info(f"ingest_file called | file_path={file_path!r}")
-    filename = os.path.basename(file_path)
-    episode_id = filename.replace(".vtt", "").replace(" ", "_").lower()
+    metrics = IngestMetrics()
+    with metrics.stage("hash"):
+        content_hash = await asyncio.to_thread(_file_hash, file_path)
+
+    async def parse() -> list:
+        return await _run_cpu(executor, parse_vtt, file_path)
+
+    result = await _ingest_content(
+        os.path.basename(file_path), content_hash, parse, force, use_cache, executor, metrics,
+    )
+    logger.info(f"ingest_file returned | {result}")
+    return result
+
+
+async def _ingest_content(
+    filename: str,
+    content_hash: str,
+    parse: Callable[[], Awaitable[list]],
+    force: bool,
+    use_cache: bool,
+    executor: Executor | None,
+    metrics: IngestMetrics,
+) -> dict:
+    """
+    Ingest one transcript whose content hash is already known; see ingest_file.
+
+    `parse` is awaited for the merged segments only when neither the skip
+    check nor the artifact store makes parsing unnecessary.
+    """
+    episode_id = _episode_id(filename)
     logger.info(f"Starting ingestion for: {filename}")
 
-    if not force:
+    with metrics.stage("hash"):
         client = _get_typesense_client()
-        try:
-            client.collections["episodes"].documents[episode_id].retrieve()
-            logger.info(f"Skipping already-ingested episode: {episode_id}")
-            return {
-                "status": "skipped",
-                "episode_id": episode_id,
-                "chunks_created": 0,
-            }
-        except typesense.exceptions.ObjectNotFound:
-            pass
+        existing = await asyncio.to_thread(_retrieve_episode, client, episode_id)
+        skipped = None
+        if not force:
+            skipped = await asyncio.to_thread(_check_skip, client, episode_id, content_hash, existing)
+    if skipped is not None:
+        return {**skipped, "metrics": metrics.to_dict()}
+
+    store = get_artifact_store()
+
+    async def load_artifact(stage: str):
+        if store is None or not use_cache:
+            return None
+        return await asyncio.to_thread(store.load, content_hash, stage)
+
+    async def save_artifact(stage: str, data) -> None:
+        if store is not None:
+            await asyncio.to_thread(store.save, content_hash, stage, data, episode_id, filename)
 
     # Step 1: Parse VTT
-    segments = parse_vtt(file_path)
-    logger.info(f"Parsed {len(segments)} merged segments")
+    with metrics.stage("parse"):
+        stored = await load_artifact("cues")
+        if stored is not None:
+            segments = segments_from_json(stored)
+            metrics.count("parse", artifact_hits=1)
+            logger.info(f"Loaded {len(segments)} parsed segments from artifacts")
+        else:
+            segments = await parse()
+            await save_artifact("cues", segments_to_json(segments))
+        transcript = tokenize(segments)
+    logger.info(f"Parsed {len(segments)} merged segments ({transcript.word_count} words)")
 
-    # Step 2: Extract metadata (includes guest name from filename)
-    metadata = await extract_metadata(filename, segments)
-    logger.info(f"Extracted metadata: {metadata.title}")
+    # Steps 2 and 3: Extract metadata and detect speakers. Speaker detection
+    # needs the guest name, which the filename usually gives, so both LLM
+    # stages start together on that guess (see _same_guest)
+    async def extract() -> EpisodeMetadata:
+        with metrics.stage("metadata"):
+            stored = await load_artifact("metadata")
+            if stored is not None:
+                metrics.count("metadata", artifact_hits=1)
+                logger.info("Loaded metadata from artifacts")
+                return EpisodeMetadata(**stored)
+            extracted = await extract_metadata(
+                filename, segments, use_cache=use_cache, transcript=transcript, metrics=metrics,
+            )
+            await save_artifact("metadata", extracted.model_dump())
+            return extracted
 
-    # Step 3: Detect speakers
-    guest_name = metadata.guest_names[0] if metadata.guest_names else extract_from_filename(filename).get("guest_name", "")
-    labeled_segments = await detect_speakers(segments, guest_name)
-    logger.info(f"Labeled {len(labeled_segments)} segments with speakers")
+    async def label(guest_name: str) -> list:
+        with metrics.stage("speakers"):
+            return await detect_speakers(segments, guest_name, use_cache=use_cache, metrics=metrics)
 
-    # Step 4: Chunk
-    episode_id = filename.replace(".vtt", "").replace(" ", "_").lower()
-    chunks = chunk_segments(
-        segments=labeled_segments,
-        episode_id=episode_id,
-        metadata=metadata.model_dump(),
+    filename_guest = extract_from_filename(filename).get("guest_name", "")
+    stored_labels = await load_artifact("labeled")
+    if stored_labels is not None:
+        metadata = await extract()
+        labeled_segments = segments_from_json(stored_labels)
+        metrics.count("speakers", artifact_hits=1)
+        logger.info("Loaded speaker labels from artifacts")
+    elif filename_guest:
+        metadata, labeled_segments = await asyncio.gather(extract(), label(filename_guest))
+        if metadata.guest_names and not _same_guest(metadata.guest_names[0], filename_guest):
+            logger.info(
+                f"Extracted guest {metadata.guest_names[0]!r} differs from filename guest "
+                f"{filename_guest!r}; re-detecting speakers"
+            )
+            metrics.count("speakers", speculation_misses=1)
+            labeled_segments = await label(metadata.guest_names[0])
+    else:
+        metadata = await extract()
+        labeled_segments = await label(metadata.guest_names[0] if metadata.guest_names else "")
+    if stored_labels is None:
+        # Only now is the guest the labels were made for confirmed
+        with metrics.stage("speakers"):
+            await save_artifact("labeled", segments_to_json(labeled_segments))
+    logger.info(f"Extracted metadata: {metadata.title}")
+    speaker_metrics = metrics.stages["speakers"]
+    logger.info(
+        f"Labeled {len(labeled_segments)} segments with speakers "
+        f"({speaker_metrics.get('heuristic_labeled', 0)} by heuristics)"
     )
+
+    # Step 4: Chunk
+    with metrics.stage("chunk"):
+        chunks = await _run_cpu(
+            executor,
+            chunk_segments,
+            segments=labeled_segments,
+            episode_id=episode_id,
+            metadata=metadata.model_dump(),
+            chunk_size=Config.CHUNK_SIZE,
+            overlap=Config.CHUNK_OVERLAP,
+            # Cheaper to re-tokenize in a worker process than to pickle the words across
+            transcript=transcript if executor is None else None,
+            content_defined=Config.CHUNK_ID_MODE == "content",
+        )
     logger.info(f"Created {len(chunks)} chunks")
+    await _flag_boilerplate(episode_id, chunks, executor, metrics)
 
     # Step 5: Upsert to Typesense
-    client = _get_typesense_client()
+    with metrics.stage("write"):
+        episode_doc = {
+            "id": episode_id,
+            **metadata.model_dump(exclude={"source_file"}),
+            "source_file": filename,
+            "content_hash": "",
+        }
+        await asyncio.to_thread(client.collections["episodes"].documents.upsert, episode_doc)
+        logger.info(f"Upserted episode: {episode_id}")
 
-    episode_doc = {
-        "id": episode_id,
-        **metadata.model_dump(exclude={"source_file"}),
-        "source_file": filename,
+        write_result = await _write_chunks(client, episode_id, chunks, replace=existing is not None, metrics=metrics)
+
+        if not write_result["failed"]:
+            await asyncio.to_thread(
+                client.collections["episodes"].documents[episode_id].update,
+                {"content_hash": content_hash},
+            )
+
+    result = {
+        "status": "success" if not write_result["failed"] else "partial",
+        "episode_id": episode_id,
+        "chunks_created": write_result["written"],
+        "chunks_updated": write_result["updated"],
+        "chunks_unchanged": write_result["unchanged"],
+        "chunks_failed": len(write_result["failed"]),
+        "chunks_deleted": write_result["deleted"],
+        "llm_batches_skipped": speaker_metrics.get("llm_batches_skipped", 0),
+        "metrics": metrics.to_dict(),
     }
-    client.collections["episodes"].documents.upsert(episode_doc)
-    logger.info(f"Upserted episode: {episode_id}")
+    return result
+
 
-    for i, chunk in enumerate(chunks):
-        chunk_doc = {
-            "id": f"{episode_id}_chunk_{i}",
-            **chunk.model_dump(),
+async def _timed(
+    file_path: str,
+    run: Callable[[], Awaitable[dict]],
+    filename: str | None = None,
+    started: float | None = None,
+) -> dict:
+    """Await one file's ingest, capturing its duration and any error as a per-file result."""
+    filename = filename or os.path.basename(file_path)
+    started = time.perf_counter() if started is None else started
+    try:
+        result = await run()
+        error = None
+    except Exception as e:
+        logger.exception(f"Ingestion failed for {file_path}")
+        result = {
+            "status": "error",
+            "episode_id": _episode_id(filename),
+            "chunks_created": 0,
         }
-        client.collections["transcript_chunks"].documents.upsert(chunk_doc)
+        error = f"{type(e).__name__}: {e}"
+
+    return {
+        "file_path": file_path,
+        **result,
+        "duration_seconds": round(time.perf_counter() - started, 3),
+        "error": error,
+    }
+
+
+async def _ingest_file_timed(
+    file_path: str,
+    force: bool,
+    use_cache: bool,
+    semaphore: asyncio.Semaphore,
+    executor: Executor | None = None,
+) -> dict:
+    """Run ingest_file under the semaphore, capturing its duration and any error."""
+    async with semaphore:
+        return await _timed(
+            file_path, lambda: ingest_file(file_path, force=force, use_cache=use_cache, executor=executor),
+        )
+
+
+async def _ingest_member(
+    name: str,
+    segments: list,
+    content_hash: str,
+    parse_seconds: float,
+    force: bool,
+    use_cache: bool,
+    executor: Executor | None,
+) -> dict:
+    """Ingest an archive member that has already been read, parsed and hashed."""
+    metrics = IngestMetrics()
+    metrics.count("parse", seconds=parse_seconds)
+
+    async def parse() -> list:
+        return segments
+
+    result = await _ingest_content(
+        posixpath.basename(name), content_hash, parse, force, use_cache, executor, metrics,
+    )
+    logger.info(f"archive member ingested | name={name!r} | {result}")
+    return result
+
+
+def _read_archive(
+    archive_path: str,
+    pattern: str,
+    loop: asyncio.AbstractEventLoop,
+    queue: asyncio.Queue,
+    stop: threading.Event,
+) -> None:
+    """
+    Parse an archive's members one at a time and hand them to the event loop.
+
+    Runs in a worker thread. Each member is streamed through the VTT parser
+    and hashed in one pass, then put on `queue` as (name, segments, hash,
+    seconds, error); putting blocks while the queue is full, so the archive
+    is read no faster than members are ingested. A member that fails to
+    parse is passed on with its error. Ends with None, or with the
+    exception if the archive itself cannot be read.
+    """
+    def put(item) -> None:
+        asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+    try:
+        for name, stream in iter_members(archive_path, pattern):
+            if stop.is_set():
+                return
+            started = time.perf_counter()
+            try:
+                segments, content_hash = parse_member(stream)
+                error = None
+            except Exception as e:
+                segments, content_hash, error = None, None, e
+            put((name, segments, content_hash, time.perf_counter() - started, error))
+        put(None)
+    except Exception as e:
+        if not stop.is_set():
+            put(e)
+
+
+async def _archive_members(archive_path: str, pattern: str, failures: list[Exception]) -> AsyncIterator[tuple]:
+    """
+    Yield an archive's parsed members as _read_archive produces them.
+
+    An error reading the archive itself ends the iteration and is appended
+    to `failures`, so the members already read are still ingested.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+    stop = threading.Event()
+    reader = asyncio.create_task(asyncio.to_thread(
+        _read_archive, archive_path, pattern, asyncio.get_running_loop(), queue, stop,
+    ))
+    try:
+        while True:
+            item = await queue.get()
+            if isinstance(item, Exception):
+                failures.append(item)
+                return
+            if item is None:
+                return
+            yield item
+    finally:
+        stop.set()
+        while not queue.empty():
+            queue.get_nowait()
+        await reader
+
+
+async def _ingest_parsed(
+    items: AsyncIterator[tuple],
+    source: str | None,
+    semaphore: asyncio.Semaphore,
+    force: bool,
+    use_cache: bool,
+    executor: Executor | None,
+    on_result: Callable[[dict], Awaitable[dict]] | None = None,
+) -> list[dict]:
+    """
+    Ingest (name, segments, content_hash, seconds, error) items as they arrive.
+
+    The next item is only awaited once the semaphore has a free slot, so
+    the reader producing them (an archive, an upload) is held back while
+    `concurrency` members are in flight. Each is reported like a file,
+    with file_path "<source>!<name>", or just the name without a source.
+    """
+    async def ingest_one(item: tuple) -> dict:
+        name, segments, content_hash, parse_seconds, error = item
+
+        async def run() -> dict:
+            if error is not None:
+                raise error
+            return await _ingest_member(name, segments, content_hash, parse_seconds, force, use_cache, executor)
+
+        try:
+            file_result = await _timed(
+                f"{source}!{name}" if source else name, run, posixpath.basename(name),
+                time.perf_counter() - parse_seconds,
+            )
+        finally:
+            semaphore.release()
+        if on_result is not None:
+            await on_result(file_result)
+        return file_result
+
+    tasks: list[asyncio.Task] = []
+    try:
+        while True:
+            await semaphore.acquire()
+            try:
+                item = await anext(items)
+            except BaseException:
+                semaphore.release()
+                raise
+            tasks.append(asyncio.create_task(ingest_one(item)))
+    except StopAsyncIteration:
+        pass
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    return list(await asyncio.gather(*tasks))
+
+
+async def ingest_files(
+    file_paths: list[str],
+    force: bool = False,
+    concurrency: int | None = None,
+    use_cache: bool = True,
+    on_progress: Callable[[dict], Awaitable[None]] | None = None,
+    executor: Executor | None = None,
+    member_pattern: str = "*.vtt",
+) -> dict:
+    """
+    Ingest a list of VTT files and transcript archives.
 
-    logger.info(f"Upserted {len(chunks)} chunks for {episode_id}")
+    Up to `concurrency` episodes (default Config.INGEST_CONCURRENCY) are
+    ingested at once. A failing file is reported in its own result and
+    does not stop the rest of the batch.
+
+    Archives (.zip, .tar.gz, .tar.zst; see ingestion.archives) are not
+    extracted: members matching `member_pattern` are streamed through the
+    VTT parser in a worker thread, and each is reported like a file, with
+    file_path "<archive>!<member>". A member being read takes one of the
+    `concurrency` slots, so at most that many members are held in memory.
+    An archive that cannot be read at all gets one error result.
+
+    If given, `on_progress` is awaited with a {"type": "started",
+    "files_total"} event first, then with a {"type": "file", "files_total",
+    "result"} event as each file finishes. Members of tar archives are only
+    known once reached, so files_total grows as they are. `executor` is
+    passed through to ingest_file.
+    """
+    concurrency = max(1, concurrency or Config.INGEST_CONCURRENCY)
+    logger.info(f"ingest_files called | files={len(file_paths)}, concurrency={concurrency}")
+
+    member_counts: dict[str, int | None] = {}
+    for file_path in file_paths:
+        if is_archive(file_path):
+            try:
+                member_counts[file_path] = await asyncio.to_thread(count_members, file_path, member_pattern)
+            except Exception:
+                # Reported when the archive is read
+                member_counts[file_path] = None
+    files_total = len(file_paths) - len(member_counts) + sum(n or 0 for n in member_counts.values())
+
+    async def report(file_result: dict) -> dict:
+        if on_progress is not None:
+            await on_progress({"type": "file", "files_total": files_total, "result": file_result})
+        return file_result
+
+    async def ingest_one(file_path: str) -> list[dict]:
+        file_result = await _ingest_file_timed(file_path, force, use_cache, semaphore, executor)
+        return [await report(file_result)]
+
+    async def count(items: AsyncIterator[tuple]) -> AsyncIterator[tuple]:
+        nonlocal files_total
+        async for item in items:
+            files_total += 1
+            yield item
+
+    async def ingest_archive(archive_path: str) -> list[dict]:
+        nonlocal files_total
+        failures: list[Exception] = []
+        items = _archive_members(archive_path, member_pattern, failures)
+        if member_counts[archive_path] is None:
+            items = count(items)
+        results = await _ingest_parsed(items, archive_path, semaphore, force, use_cache, executor, report)
+        if failures:
+            files_total += 1
+
+            async def fail() -> dict:
+                raise failures[0]
+
+            results.append(await report(await _timed(archive_path, fail)))
+        return results
+
+    semaphore = asyncio.Semaphore(concurrency)
+    started = time.perf_counter()
+    if on_progress is not None:
+        await on_progress({"type": "started", "files_total": files_total})
+    batches = await asyncio.gather(*(
+        ingest_archive(file_path) if file_path in member_counts else ingest_one(file_path)
+        for file_path in file_paths
+    ))
+    results = [r for batch in batches for r in batch]
+    failed = sum(1 for r in results if r["status"] == "error")
+    batches_skipped = sum(r.get("llm_batches_skipped", 0) for r in results)
+    metrics = summarize(
+        [r["metrics"] for r in results if r.get("metrics")],
+        durations=[r["duration_seconds"] for r in results],
+    )
 
     result = {
-        "status": "success",
-        "episode_id": episode_id,
-        "chunks_created": len(chunks),
+        "status": "success" if not failed else "partial",
+        "episodes_processed": len(results),
+        "episodes_failed": failed,
+        "concurrency": concurrency,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "llm_batches_skipped": batches_skipped,
+        "metrics": metrics,
+        "results": results,
     }
-    logger.info(f"ingest_file returned | {result}")
+    logger.info(
+        f"ingest_files returned | episodes_processed={len(results)}, "
+        f"episodes_failed={failed}, elapsed_seconds={result['elapsed_seconds']} | totals={metrics['totals']}"
+    )
     return result
 
 
-async def ingest_directory(directory_path: str, force: bool = False) -> dict:
-    """Ingest all VTT files in a directory."""
-    logger.info(f"ingest_directory called | directory_path={directory_path!r}")
-    vtt_files = [
+async def ingest_uploads(
+    uploads: AsyncIterator[tuple],
+    force: bool = False,
+    concurrency: int | None = None,
+    use_cache: bool = True,
+) -> list[dict]:
+    """
+    Ingest uploaded transcripts as ingestion.uploads.iter_uploads parses them.
+
+    Each file is ingested as soon as it has been received, while the rest
+    of the upload is still arriving; up to `concurrency` (default
+    Config.INGEST_CONCURRENCY) at once. Returns a result per file, as in
+    ingest_files, with the uploaded filename as file_path.
+    """
+    concurrency = max(1, concurrency or Config.INGEST_CONCURRENCY)
+    logger.info(f"ingest_uploads called | concurrency={concurrency}")
+    results = await _ingest_parsed(uploads, None, asyncio.Semaphore(concurrency), force, use_cache, None)
+    logger.info(
+        f"ingest_uploads returned | files={len(results)}, "
+        f"failed={sum(1 for r in results if r['status'] == 'error')}"
+    )
+    return results
+
+
+def list_transcripts(directory_path: str) -> list[str]:
+    """The VTT files and transcript archives in a directory (not recursive), or just the path of an archive."""
+    if is_archive(directory_path) and os.path.isfile(directory_path):
+        return [directory_path]
+    return sorted(
         os.path.join(directory_path, f)
         for f in os.listdir(directory_path)
-        if f.endswith(".vtt")
-    ]
+        if f.endswith(".vtt") or is_archive(f)
+    )
+
+
+async def ingest_directory(
+    directory_path: str,
+    force: bool = False,
+    concurrency: int | None = None,
+    use_cache: bool = True,
+    on_progress: Callable[[dict], Awaitable[None]] | None = None,
+) -> dict:
+    """
+    Ingest all VTT files and transcript archives in a directory (not
+    recursive), or the members of a single archive. See ingest_files.
+    """
+    logger.info(f"ingest_directory called | directory_path={directory_path!r}, concurrency={concurrency}")
+    return await ingest_files(
+        list_transcripts(directory_path),
+        force=force,
+        concurrency=concurrency,
+        use_cache=use_cache,
+        on_progress=on_progress,
+    )
+
+
+def _delete_episode(client: typesense.Client, episode_id: str) -> dict:
+    chunks = client.collections["transcript_chunks"].documents.delete({
+        "filter_by": f"episode_id:={_filter_value(episode_id)}",
+    })
+    try:
+        client.collections["episodes"].documents[episode_id].delete()
+        found = True
+    except typesense.exceptions.ObjectNotFound:
+        found = False
+    return {"found": found, "chunks_deleted": chunks.get("num_deleted", 0)}
+
+
+async def remove_file(file_path: str) -> dict:
+    """Remove a deleted VTT file's episode and all of its chunks from the index."""
+    logger.info(f"remove_file called | file_path={file_path!r}")
+    episode_id = _episode_id(os.path.basename(file_path))
+    client = _get_typesense_client()
+    deleted = await asyncio.to_thread(_delete_episode, client, episode_id)
+    index = get_dedup_index()
+    if index is not None:
+        await asyncio.to_thread(index.remove, episode_id)
+        promoted = await asyncio.to_thread(index.release, episode_id)
+        if promoted:
+            await _write_promoted(promoted)
+    result = {
+        "status": "deleted" if deleted["found"] or deleted["chunks_deleted"] else "not_found",
+        "episode_id": episode_id,
+        "chunks_created": 0,
+        "chunks_deleted": deleted["chunks_deleted"],
+    }
+    logger.info(f"remove_file returned | {result}")
+    return result
+
+
+async def _rechunk_episode(
+    client: typesense.Client,
+    store: ArtifactStore,
+    episode_id: str,
+    file_hash: str | None,
+    chunk_size: int,
+    overlap: int,
+) -> dict | None:
+    """
+    Rebuild one episode's chunks from its stored artifacts.
+
+    `file_hash` must match the episode's indexed content_hash; None takes
+    whatever is indexed. Returns the _write_chunks result, or None when the
+    episode is not indexed or has no matching artifacts.
+    """
+    existing = await asyncio.to_thread(_retrieve_episode, client, episode_id)
+    if existing is None or not existing.get("content_hash"):
+        return None
+    if file_hash is None:
+        file_hash = existing["content_hash"]
+    elif existing["content_hash"] != file_hash:
+        return None
+
+    metadata = await asyncio.to_thread(store.load, file_hash, "metadata")
+    labeled = await asyncio.to_thread(store.load, file_hash, "labeled")
+    if metadata is None or labeled is None:
+        return None
+    chunks = chunk_segments(
+        segments=segments_from_json(labeled),
+        episode_id=episode_id,
+        metadata=metadata,
+        chunk_size=chunk_size,
+        overlap=overlap,
+        content_defined=Config.CHUNK_ID_MODE == "content",
+    )
+    await _flag_boilerplate(episode_id, chunks)
+    return await _write_chunks(client, episode_id, chunks, replace=True)
+
+
+async def _write_promoted(promoted: dict[str, list[int]]) -> None:
+    """
+    Unflag chunks that became canonical after the copy they duplicated went away.
+
+    With DEDUP_MODE=flag the indexed chunks get `boilerplate: false`. With
+    DEDUP_MODE=skip they were never written, so their episode is rebuilt
+    from stored artifacts; an episode without them is logged, to be
+    re-ingested with force.
+    """
+    client = _get_typesense_client()
+    for episode_id, chunk_indexes in promoted.items():
+        logger.info(f"{len(chunk_indexes)} chunks of {episode_id} are now the canonical copy")
+        if Config.DEDUP_MODE == "skip":
+            store = get_artifact_store()
+            rebuilt = None
+            if store is not None:
+                rebuilt = await _rechunk_episode(
+                    client, store, episode_id, None, Config.CHUNK_SIZE, Config.CHUNK_OVERLAP,
+                )
+            if rebuilt is None:
+                logger.warning(
+                    f"Chunks {chunk_indexes} of {episode_id} are no longer boilerplate but have no "
+                    f"artifacts to rebuild from; re-ingest the episode with force to write them"
+                )
+            continue
+
+        wanted = set(chunk_indexes)
+        indexed = await asyncio.to_thread(_export_chunks, client, episode_id)
+        updates = [
+            {"id": doc_id, "boilerplate": False}
+            for doc_id, doc in indexed.items()
+            if doc.get("chunk_index") in wanted
+        ]
+        if updates:
+            await asyncio.to_thread(_import_documents, client, "transcript_chunks", updates, "update")
 
-    results = []
-    for file_path in vtt_files:
-        result = await ingest_file(file_path, force=force)
-        results.append(result)
 
+async def rechunk_all(chunk_size: int | None = None, overlap: int | None = None) -> dict:
+    """
+    Rebuild every indexed episode's chunks from stored artifacts.
+
+    Uses the stored labeled segments and metadata, so no LLM calls are made.
+    Only artifacts whose hash matches the episode's indexed content_hash are
+    used; episodes with no matching artifacts are left as they are and
+    counted as skipped.
+    """
+    chunk_size = chunk_size or Config.CHUNK_SIZE
+    overlap = Config.CHUNK_OVERLAP if overlap is None else overlap
+    logger.info(f"rechunk_all called | chunk_size={chunk_size}, overlap={overlap}")
+    store = get_artifact_store()
+    if store is None:
+        raise RuntimeError("Rechunking needs the artifact store; set ARTIFACTS_ENABLED=true")
+
+    client = _get_typesense_client()
     result = {
         "status": "success",
-        "episodes_processed": len(results),
+        "episodes_rechunked": 0,
+        "episodes_skipped": 0,
+        "chunks_created": 0,
+        "chunks_updated": 0,
+        "chunks_failed": 0,
+        "chunks_deleted": 0,
+        "chunk_size": chunk_size,
+        "overlap": overlap,
     }
-    logger.info(f"ingest_directory returned | {result}")
+
+    manifests = await asyncio.to_thread(lambda: list(store.iter_manifests()))
+    for manifest in manifests:
+        if not {"metadata", "labeled"} <= set(manifest["stages"]):
+            continue
+        write_result = await _rechunk_episode(
+            client, store, manifest["episode_id"], manifest["file_hash"], chunk_size, overlap,
+        )
+        if write_result is None:
+            result["episodes_skipped"] += 1
+            continue
+
+        result["episodes_rechunked"] += 1
+        result["chunks_created"] += write_result["written"]
+        result["chunks_updated"] += write_result["updated"]
+        result["chunks_failed"] += len(write_result["failed"])
+        result["chunks_deleted"] += write_result["deleted"]
+
+    if result["chunks_failed"]:
+        result["status"] = "partial"
+    logger.info(f"rechunk_all returned | {result}")
     return result
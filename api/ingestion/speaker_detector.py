@@ -1,8 +1,15 @@
-import json
+import asyncio
 import logging
 from langchain_openai import ChatOpenAI
-from agents.utils.llm import get_llm
-from models.schemas import ParsedCue
+from agents.utils.llm import get_llm, json_response_format
+from agents.utils.llm_scheduler import BATCH
+from config import Config
+from ingestion import llm_cache
+from ingestion.json_repair import parse_lenient
+from ingestion.metrics import IngestMetrics
+from ingestion.speaker_heuristics import label_heuristically
+from ingestion.tokens import count_tokens
+from ingestion.vtt_parser import Cue
 
 logger = logging.getLogger(__name__)
 
@@ -19,71 +26,329 @@ Below are transcript segments. For each segment, assign the most likely speaker
 2. Conversation flow (question/answer patterns - hosts tend to ask questions)
 3. Content attribution (personal stories likely belong to the guest)
 
-Return a JSON array where each element has:
+Return a JSON object with a "labels" array where each element has:
 - "index": the segment index (0-based)
 - "speaker": the speaker name (use exact names: "Steven Sikash", "Mike Liske", or "{guest_name}")
 - "confidence": float 0-1
 
-Transcript segments:
+A segment may carry a guess such as "(likely Steven Sikash)" from simple rules; treat it as a hint, not an answer.
+Lines marked [context] are already labeled and shown for the conversation flow; do not include them in your answer.
+
+{context}Transcript segments:
 {segments}
 
-Return ONLY the JSON array, no other text."""
+Return ONLY the JSON object, no other text."""
 
+# Structured output schema for SPEAKER_DETECTION_PROMPT (strict mode: all fields required)
+SPEAKER_LABELS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "labels": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "index": {"type": "integer"},
+                    "speaker": {"type": "string"},
+                    "confidence": {"type": "number"},
+                },
+                "required": ["index", "speaker", "confidence"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["labels"],
+    "additionalProperties": False,
+}
 
-async def detect_speakers(
-    segments: list[ParsedCue],
-    guest_name: str,
-    batch_size: int = 20,
-) -> list[ParsedCue]:
+
+def _parse_speaker_response(content: str) -> tuple[list[dict], bool]:
     """
-    Use LLM to assign speaker labels to transcript segments.
+    Parse the LLM's labels, repairing damaged JSON where possible.
 
-    Processes in batches to manage token costs.
+    Accepts the {"labels": [...]} object or a bare array (as returned in
+    the plain text mode). Returns (labels, repaired); raises ValueError if
+    no list of labels can be recovered.
     """
-    logger.info(f"detect_speakers called | segments={len(segments)}, guest_name={guest_name!r}")
-    llm = get_llm(temperature=0.0)
-    labeled_segments: list[ParsedCue] = []
+    data, repaired = parse_lenient(content)
+    if isinstance(data, dict):
+        data = data.get("labels")
+    if not isinstance(data, list):
+        raise ValueError("speaker detection response has no list of labels")
+    return data, repaired
+
 
-    for batch_start in range(0, len(segments), batch_size):
-        batch = segments[batch_start:batch_start + batch_size]
+def _labels_by_index(speaker_data: list[dict], count: int) -> dict[int, str]:
+    """Map each in-range index in a parsed response that has a speaker to that speaker."""
+    labels = {}
+    for sd in speaker_data:
+        if not isinstance(sd, dict):
+            continue
+        index, speaker = sd.get("index"), sd.get("speaker")
+        if isinstance(index, int) and 0 <= index < count and isinstance(speaker, str):
+            labels[index] = speaker
+    return labels
 
-        segments_text = "\n".join(
-            f"[{i}] ({seg.start_time:.1f}s - {seg.end_time:.1f}s): {seg.text}"
-            for i, seg in enumerate(batch)
+
+async def _label_batch(
+    llm: ChatOpenAI,
+    batch: list[Cue],
+    batch_start: int,
+    guest_name: str,
+    semaphore: asyncio.Semaphore,
+    use_cache: bool,
+    metrics: IngestMetrics,
+    context: list[Cue] = (),
+    hints: dict[int, str] | None = None,
+    between: dict[int, list[Cue]] | None = None,
+) -> list[Cue]:
+    """
+    Label one batch of segments, retrying just what failed.
+
+    `context` segments are shown before the batch, with their speaker when
+    already known, but are not labeled; `between` maps a batch position to
+    already labeled segments shown the same way just before it. `hints`
+    maps batch positions to a speaker guessed by the heuristics. Damaged JSON is repaired where
+    possible (see json_repair); when a truncated response loses some
+    labels only those segments are asked for again, and an unparseable
+    response re-asks for the whole batch. After Config.LLM_MAX_RETRIES
+    retries the remaining segments are left unlabeled. An LLM error is
+    retried with backoff and re-raised once retries are exhausted.
+    """
+    context_text = ""
+    if context:
+        context_text = CONTEXT_SECTION.format(
+            lines="\n".join(_format_line("context", seg, show_speaker=True) for seg in context),
         )
 
+    hints = hints or {}
+    between = between or {}
+
+    def segment_lines(positions: list[int]) -> str:
+        lines = []
+        for n, i in enumerate(positions):
+            lines.extend(_format_line("context", seg, show_speaker=True) for seg in between.get(i, ()))
+            lines.append(_format_line(str(n), batch[i], hint=hints.get(i, "")))
+        return "\n".join(lines)
+
+    labels: dict[int, str] = {}
+    # Batch positions still to label; the prompt numbers them 0..n-1
+    remaining = list(range(len(batch)))
+    for attempt in range(Config.LLM_MAX_RETRIES + 1):
         prompt = SPEAKER_DETECTION_PROMPT.format(
             guest_name=guest_name,
-            segments=segments_text,
+            context=context_text,
+            segments=segment_lines(remaining),
         )
+        content = await llm_cache.lookup(prompt, use_cache)
+        from_cache = content is not None
+        if from_cache:
+            metrics.count("speakers", llm_cache_hits=1)
+        else:
+            try:
+                async with semaphore:
+                    response = await llm.ainvoke(prompt)
+            except Exception as e:
+                if attempt == Config.LLM_MAX_RETRIES:
+                    raise
+                logger.warning(f"Speaker detection call failed for batch starting at {batch_start} ({e}); retrying")
+                metrics.count("speakers", retries=1)
+                await asyncio.sleep(Config.LLM_RETRY_BACKOFF_SECONDS * 2 ** attempt)
+                continue
+            metrics.record_llm_response("speakers", response)
+            content = response.content
+
+        try:
+            speaker_data, repaired = _parse_speaker_response(content)
+        except ValueError:
+            logger.warning(
+                f"Failed to parse speaker detection response for batch starting at {batch_start} "
+                f"(attempt {attempt + 1}/{Config.LLM_MAX_RETRIES + 1})"
+            )
+            if attempt < Config.LLM_MAX_RETRIES:
+                metrics.count("speakers", retries=1, segments_retried=len(remaining))
+            continue
 
-        response = await llm.ainvoke(prompt)
-        content = response.content.strip()
+        answered = _labels_by_index(speaker_data, len(remaining))
+        for n, speaker in answered.items():
+            labels[remaining[n]] = speaker
+        if repaired:
+            metrics.count("speakers", repaired_responses=1)
+            # Labels missing from a repaired (usually truncated) response were lost, not withheld
+            remaining = [i for n, i in enumerate(remaining) if n not in answered]
+        else:
+            remaining = []
+        if not remaining:
+            if not from_cache:
+                await llm_cache.store(prompt, content)
+            break
+        logger.warning(
+            f"Speaker detection response for batch starting at {batch_start} was incomplete; "
+            f"{len(remaining)} segments still unlabeled (attempt {attempt + 1}/{Config.LLM_MAX_RETRIES + 1})"
+        )
+        if attempt < Config.LLM_MAX_RETRIES:
+            metrics.count("speakers", retries=1, segments_retried=len(remaining))
 
-        # Strip markdown code fences if present
-        if content.startswith("```"):
-            content = content.split("\n", 1)[1]
-            content = content.rsplit("```", 1)[0]
+    if remaining:
+        logger.error(
+            f"Leaving {len(remaining)} segments of batch starting at {batch_start} unlabeled "
+            f"after {Config.LLM_MAX_RETRIES + 1} attempts"
+        )
+        metrics.count("speakers", segments_unlabeled=len(remaining))
 
-        try:
-            speaker_data = json.loads(content)
-        except json.JSONDecodeError:
-            logger.warning(f"Failed to parse speaker detection response for batch starting at {batch_start}")
-            speaker_data = []
-
-        for i, seg in enumerate(batch):
-            speaker = ""
-            for sd in speaker_data:
-                if sd.get("index") == i:
-                    speaker = sd.get("speaker", "")
-                    break
-
-            labeled_segments.append(ParsedCue(
-                start_time=seg.start_time,
-                end_time=seg.end_time,
-                text=seg.text,
-                speaker=speaker,
-            ))
-
-    logger.info(f"detect_speakers returned | {len(labeled_segments)} labeled segments")
+    return _apply_labels(batch, labels)
+
+
+CONTEXT_SECTION = """Preceding context (already labeled elsewhere; do not include these in your answer):
+{lines}
+
+"""
+
+# Tokens for a segment line's "[i] (start - end): " prefix
+LINE_OVERHEAD_TOKENS = 12
+
+
+def _format_line(label: str, seg: Cue, show_speaker: bool = False, hint: str = "") -> str:
+    text = f"{seg.speaker}: {seg.text}" if show_speaker and seg.speaker else seg.text
+    guess = f" (likely {hint})" if hint else ""
+    return f"[{label}] ({seg.start_time:.1f}s - {seg.end_time:.1f}s){guess}: {text}"
+
+
+def _pack_batches(
+    pending: list[int],
+    segment_tokens: list[int],
+    token_budget: int,
+    max_segments: int,
+    context_segments: int,
+) -> list[list[int]]:
+    """
+    Greedily group pending segment indices into batches within a token budget.
+
+    A batch's cost is its segments' tokens plus those of the up to
+    `context_segments` segments shown before it as context and of any
+    segments between its own that are not pending (shown inline as
+    context). A batch closes
+    when the next segment would exceed `token_budget` or it holds
+    `max_segments` segments; a single oversized segment gets a batch alone.
+    """
+    batches: list[list[int]] = []
+    batch: list[int] = []
+    used = 0
+    for i in pending:
+        if batch:
+            cost = sum(segment_tokens[batch[-1] + 1:i + 1])
+            if used + cost > token_budget or len(batch) >= max_segments:
+                batches.append(batch)
+                batch = []
+        if not batch:
+            used = sum(segment_tokens[max(0, i - context_segments):i])
+            cost = segment_tokens[i]
+        batch.append(i)
+        used += cost
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _apply_labels(batch: list[Cue], speakers: dict[int, str]) -> list[Cue]:
+    """Copy a batch of segments with speakers by position in the batch."""
+    return [
+        Cue(seg.start_time, seg.end_time, seg.text, speakers.get(i, ""))
+        for i, seg in enumerate(batch)
+    ]
+
+
+async def detect_speakers(
+    segments: list[Cue],
+    guest_name: str,
+    batch_size: int | None = None,
+    max_concurrency: int | None = None,
+    use_cache: bool = True,
+    use_heuristics: bool | None = None,
+    metrics: IngestMetrics | None = None,
+) -> list[Cue]:
+    """
+    Use LLM to assign speaker labels to transcript segments.
+
+    A local heuristic pass labels obvious segments first (see
+    speaker_heuristics); only segments below Config.SPEAKER_HEURISTIC_THRESHOLD
+    go to the LLM, with any weaker heuristic guess passed along as a hint.
+    Those are packed into batches by token count, up to
+    Config.SPEAKER_BATCH_TOKENS and `batch_size` segments (default
+    Config.SPEAKER_BATCH_MAX_SEGMENTS). Each batch is preceded by the
+    Config.SPEAKER_CONTEXT_SEGMENTS segments before it as context, and
+    heuristically labeled segments falling between a batch's own are shown
+    in place, with their speakers, as context too.
+    Up to `max_concurrency` batches (default
+    Config.SPEAKER_DETECTION_CONCURRENCY) are in flight at once and results
+    keep the original segment order.
+    Batches already answered are served from the LLM cache unless
+    use_cache=False.
+
+    LLM calls, token usage and retries are counted under the "speakers"
+    stage of `metrics`, along with llm_batches, llm_batches_skipped,
+    heuristic_labeled, llm_cache_hits, repaired_responses, segments_retried
+    and segments_unlabeled.
+    """
+    max_concurrency = max(1, max_concurrency or Config.SPEAKER_DETECTION_CONCURRENCY)
+    batch_size = max(1, batch_size or Config.SPEAKER_BATCH_MAX_SEGMENTS)
+    context_segments = Config.SPEAKER_CONTEXT_SEGMENTS
+    metrics = metrics or IngestMetrics()
+    if use_heuristics is None:
+        use_heuristics = Config.SPEAKER_HEURISTICS_ENABLED
+    logger.info(
+        f"detect_speakers called | segments={len(segments)}, guest_name={guest_name!r}, "
+        f"batch_size={batch_size}, max_concurrency={max_concurrency}, use_heuristics={use_heuristics}"
+    )
+
+    labeled_segments = [Cue(seg.start_time, seg.end_time, seg.text) for seg in segments]
+    pending = list(range(len(segments)))
+    hints: dict[int, str] = {}
+    if use_heuristics:
+        pending = []
+        for i, (speaker, confidence) in enumerate(label_heuristically(segments, guest_name)):
+            if speaker and confidence >= Config.SPEAKER_HEURISTIC_THRESHOLD:
+                labeled_segments[i].speaker = speaker
+            else:
+                pending.append(i)
+                if speaker:
+                    hints[i] = speaker
+
+    segment_tokens = [n + LINE_OVERHEAD_TOKENS for n in count_tokens([seg.text for seg in segments])]
+
+    def pack(indices: list[int]) -> list[list[int]]:
+        return _pack_batches(indices, segment_tokens, Config.SPEAKER_BATCH_TOKENS, batch_size, context_segments)
+
+    batches = pack(pending)
+    if batches:
+        llm = get_llm(
+            temperature=0.0,
+            priority=BATCH,
+            response_format=json_response_format("speaker_labels", SPEAKER_LABELS_SCHEMA),
+        )
+        semaphore = asyncio.Semaphore(max_concurrency)
+        # Snapshot so every batch's context shows only heuristic labels, whatever finishes first
+        known = list(labeled_segments)
+        labeled_batches = await asyncio.gather(*(
+            _label_batch(
+                llm, [segments[i] for i in batch], batch[0], guest_name, semaphore, use_cache, metrics,
+                context=known[max(0, batch[0] - context_segments):batch[0]],
+                hints={n: hints[i] for n, i in enumerate(batch) if i in hints},
+                between={n: known[batch[n - 1] + 1:i] for n, i in enumerate(batch) if n and i > batch[n - 1] + 1},
+            )
+            for batch in batches
+        ))
+        for batch, labeled in zip(batches, labeled_batches):
+            for i, seg in zip(batch, labeled):
+                labeled_segments[i] = seg
+
+    batches_without_prepass = len(pack(list(range(len(segments)))))
+    batch_stats = {
+        "llm_batches": len(batches),
+        "llm_batches_skipped": batches_without_prepass - len(batches),
+        "heuristic_labeled": len(segments) - len(pending),
+    }
+    metrics.count("speakers", **batch_stats)
+
+    logger.info(f"detect_speakers returned | {len(labeled_segments)} labeled segments | {batch_stats}")
     return labeled_segments
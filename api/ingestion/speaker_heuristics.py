@@ -0,0 +1,78 @@
+import re
+from collections.abc import Sequence
+from ingestion.vtt_parser import Cue
+
+HOST_NAMES = ("Steven Sikash", "Mike Liske")
+
+# Spoken forms each host uses to introduce themselves
+_HOST_ALIASES = {
+    "Steven Sikash": ("steven", "steve"),
+    "Mike Liske": ("mike", "michael"),
+}
+# "This is Mike" only counts at the start of a segment; mid-sentence it is
+# as likely to be someone talking about him. Possessives ("it's Mike's") never count.
+_SELF_INTRO = r"(?:\b(?:i'm|i am|my name is)|^\W*(?:this is|it's))\s+{name}\b(?!['’]s\b)"
+_SHOW_INTRO = re.compile(
+    r"\bwelcome (?:back )?to (?:the )?(?:bliss business podcast|show|podcast)\b",
+    re.IGNORECASE,
+)
+_GUEST_THANKS = re.compile(
+    r"\b(?:thanks?(?: you)? (?:so much )?for having me|(?:happy|glad|great|excited) to be here)\b",
+    re.IGNORECASE,
+)
+
+# Confidence per rule. Long answers are usually but not always the guest, and
+# host intros and questions are clearly a host speaking but not which host,
+# so both stay below the default threshold and only serve the LLM as hints.
+SELF_INTRO_CONFIDENCE = 0.95
+GUEST_THANKS_CONFIDENCE = 0.9
+MONOLOGUE_CONFIDENCE = 0.7
+HOST_TURN_CONFIDENCE = 0.6
+
+
+def _self_intro_patterns(guest_name: str) -> list[tuple[str, re.Pattern]]:
+    names = list(_HOST_ALIASES.items())
+    guest_first = guest_name.split()[0].lower() if guest_name.strip() else ""
+    if guest_first and guest_first not in {a for _, aliases in names for a in aliases}:
+        names.append((guest_name, (guest_first,)))
+    return [
+        (speaker, re.compile(_SELF_INTRO.format(name="(?:" + "|".join(map(re.escape, aliases)) + ")"), re.IGNORECASE))
+        for speaker, aliases in names
+    ]
+
+
+def label_heuristically(
+    segments: Sequence[Cue],
+    guest_name: str,
+    monologue_words: int = 60,
+) -> list[tuple[str, float]]:
+    """
+    Guess a speaker and confidence for each segment from local rules.
+
+    Rules, strongest first: a speaker introducing themselves by name; the
+    guest thanking the hosts for having them; a long answer with no question
+    (the guest); a show intro or short question (a host, identity unknown).
+    Segments no rule matches get ("", 0.0).
+    """
+    intro_patterns = _self_intro_patterns(guest_name)
+    labels: list[tuple[str, float]] = []
+
+    for segment in segments:
+        text = segment.text
+        label = ("", 0.0)
+
+        for speaker, pattern in intro_patterns:
+            if pattern.search(text):
+                label = (speaker, SELF_INTRO_CONFIDENCE)
+                break
+        else:
+            if guest_name and _GUEST_THANKS.search(text):
+                label = (guest_name, GUEST_THANKS_CONFIDENCE)
+            elif _SHOW_INTRO.search(text) or text.rstrip().endswith("?"):
+                label = (HOST_NAMES[0], HOST_TURN_CONFIDENCE)
+            elif guest_name and "?" not in text and len(text.split()) >= monologue_words:
+                label = (guest_name, MONOLOGUE_CONFIDENCE)
+
+        labels.append(label)
+
+    return labels
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import os
+import socket
+from config import Config
+from db.crud import (
+    claim_ingestion_task,
+    finish_ingestion_task,
+    release_ingestion_task,
+    renew_ingestion_task_lease,
+)
+from db.models import IngestionTask
+from ingestion.pipeline import ingest_files
+
+logger = logging.getLogger(__name__)
+
+
+def _summarize(result: dict) -> dict:
+    """The parts of an ingest_files result worth keeping on the task row."""
+    return {
+        "episodes_processed": result["episodes_processed"],
+        "episodes_failed": result["episodes_failed"],
+        "elapsed_seconds": result["elapsed_seconds"],
+        "files": [
+            {
+                "file_path": r["file_path"],
+                "status": r["status"],
+                "episode_id": r.get("episode_id"),
+                "chunks_created": r.get("chunks_created", 0),
+                "error": r.get("error"),
+            }
+            for r in result["results"]
+        ],
+    }
+
+
+class IngestionTaskWorkers:
+    """
+    Workers that drain the shared ingestion_tasks table in MySQL.
+
+    Every API node runs its own pool, so a backfill queued through any node
+    is spread across all of them. A worker claims one task at a time under
+    a lease (see db.crud.claim_ingestion_task), renews the lease every
+    third of its length while the file is ingested, and records the
+    outcome. A worker that loses its lease stops; a node that dies leaves
+    its leases to expire, and the tasks are then claimed again elsewhere.
+    """
+
+    def __init__(self):
+        self._workers: list[asyncio.Task] = []
+        self.node = f"{socket.gethostname()}:{os.getpid()}"
+
+    async def start(self, workers: int | None = None) -> None:
+        workers = Config.INGEST_TASK_WORKERS if workers is None else workers
+        self._workers = [asyncio.create_task(self._worker(n)) for n in range(max(0, workers))]
+        logger.info(f"Ingestion task workers started | node={self.node}, workers={len(self._workers)}")
+        if self._workers and Config.DEDUP_MODE != "off" and Config.DEDUP_INDEX_BACKEND == "sqlite":
+            logger.warning(
+                "Task workers are using this node's SQLite dedup index; with several replicas set "
+                "DEDUP_INDEX_BACKEND=mysql or DEDUP_MODE=off, or only one node finds each duplicate"
+            )
+
+    async def stop(self) -> None:
+        """Cancel the workers. Tasks they hold are handed back as pending."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _worker(self, n: int) -> None:
+        owner = f"{self.node}:{n}"
+        while True:
+            try:
+                task = await claim_ingestion_task(
+                    owner, Config.INGEST_TASK_LEASE_SECONDS, Config.INGEST_TASK_MAX_ATTEMPTS,
+                )
+            except Exception:
+                logger.exception(f"Ingestion task worker {owner} could not claim a task")
+                task = None
+            if task is None:
+                await asyncio.sleep(Config.INGEST_TASK_POLL_SECONDS)
+                continue
+            try:
+                await self.run_task(task, owner)
+            except Exception:
+                logger.exception(f"Ingestion task worker {owner} failed on task {task.id}")
+
+    async def _heartbeat(self, task_id: str, owner: str, ingest: asyncio.Task) -> None:
+        """Renew the lease until cancelled; cancel `ingest` if the lease is lost."""
+        lease = Config.INGEST_TASK_LEASE_SECONDS
+        while True:
+            await asyncio.sleep(lease / 3)
+            try:
+                renewed = await renew_ingestion_task_lease(task_id, owner, lease)
+            except Exception:
+                # The next beat may still land before the lease runs out
+                logger.exception(f"Could not renew the lease on ingestion task {task_id}")
+                continue
+            if not renewed:
+                logger.warning(f"Lost the lease on ingestion task {task_id}; abandoning it")
+                ingest.cancel()
+                return
+
+    async def run_task(self, task: IngestionTask, owner: str) -> None:
+        """Ingest a claimed task's file and record the outcome, holding the lease meanwhile."""
+        logger.info(f"run_task called | task_id={task.id}, file_path={task.file_path!r}, attempt={task.attempts}")
+        ingest = asyncio.create_task(ingest_files([task.file_path], force=task.force, use_cache=task.use_cache))
+        heartbeat = asyncio.create_task(self._heartbeat(task.id, owner, ingest))
+        try:
+            result = await ingest
+        except asyncio.CancelledError:
+            if heartbeat.done():
+                # Lease lost; whoever holds it now records the outcome
+                return
+            ingest.cancel()
+            await release_ingestion_task(task.id, owner)
+            raise
+        except Exception as e:
+            logger.exception(f"Ingestion task {task.id} failed")
+            await finish_ingestion_task(task.id, owner, "failed", error=f"{type(e).__name__}: {e}")
+            return
+        finally:
+            heartbeat.cancel()
+
+        status = "completed" if not result["episodes_failed"] else "failed"
+        errors = [r["error"] for r in result["results"] if r.get("error")]
+        recorded = await finish_ingestion_task(
+            task.id, owner, status, result=_summarize(result), error="; ".join(errors) or None,
+        )
+        logger.info(f"run_task returned | task_id={task.id}, status={status}, recorded={recorded}")
+
+
+task_workers = IngestionTaskWorkers()
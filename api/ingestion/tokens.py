@@ -0,0 +1,37 @@
+import functools
+import logging
+from config import Config
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - tiktoken ships with langchain-openai
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Rough characters per token for English text when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+
+@functools.lru_cache(maxsize=1)
+def _encoding():
+    """Return the tiktoken encoding for OPENAI_MODEL, or None to fall back to estimates."""
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(Config.OPENAI_MODEL)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # The encoding files are downloaded on first use, which fails offline
+        logger.warning(f"Tokenizer unavailable ({e}); estimating tokens as characters / {CHARS_PER_TOKEN}")
+        return None
+
+
+def count_tokens(texts: list[str]) -> list[int]:
+    """Count the tokens in each text with a local tokenizer, or estimate them."""
+    encoding = _encoding()
+    if encoding is None:
+        return [-(-len(text) // CHARS_PER_TOKEN) for text in texts]
+    return [len(encoding.encode_ordinary(text)) for text in texts]
@@ -0,0 +1,40 @@
+from array import array
+from collections.abc import Sequence
+from dataclasses import dataclass
+from ingestion.vtt_parser import Cue
+
+
+@dataclass(slots=True)
+class TokenizedTranscript:
+    """
+    An episode's words, split once and shared by metadata extraction and chunking.
+
+    `words` is the flat word list of every segment in order. `offsets[i]` is
+    the index of segment i's first word (equivalently, the cumulative word
+    count before it), and `offsets[-1]` is the total word count.
+    """
+
+    words: list[str]
+    offsets: array
+
+    @property
+    def word_count(self) -> int:
+        return self.offsets[-1]
+
+    @property
+    def segment_count(self) -> int:
+        return len(self.offsets) - 1
+
+    def text(self, start: int, end: int) -> str:
+        """Join words[start:end] back into text."""
+        return " ".join(self.words[start:end])
+
+
+def tokenize(segments: Sequence[Cue]) -> TokenizedTranscript:
+    """Split every segment into words and record where each segment starts."""
+    words: list[str] = []
+    offsets = array("q", [0])
+    for segment in segments:
+        words.extend(segment.text.split())
+        offsets.append(len(words))
+    return TokenizedTranscript(words=words, offsets=offsets)
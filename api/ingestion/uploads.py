@@ -0,0 +1,172 @@
+import asyncio
+import fnmatch
+import io
+import re
+import time
+from collections.abc import AsyncIterator
+from ingestion.archives import parse_member
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # pragma: no cover - installed with the API's dependencies
+    MultipartParser = parse_options_header = None
+
+# Body chunks buffered for a file's parser thread; when they are not
+# consumed fast enough, reading the request body waits
+_QUEUED_CHUNKS = 4
+
+
+def _upload_name(filename: str) -> str:
+    """Strip any client-side directories from an uploaded filename."""
+    return re.split(r"[\\/]", filename)[-1]
+
+
+class _QueueReader(io.RawIOBase):
+    """Blocking reader, for a worker thread, over byte chunks the event loop puts on a queue; None ends it."""
+
+    def __init__(self, queue: asyncio.Queue, loop: asyncio.AbstractEventLoop):
+        self._queue = queue
+        self._loop = loop
+        self._pending = b""
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending and not self._eof:
+            chunk = asyncio.run_coroutine_threadsafe(self._queue.get(), self._loop).result()
+            if chunk is None:
+                self._eof = True
+            else:
+                self._pending = chunk
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+class _UploadedFile:
+    """One file of an upload, parsed and hashed in a worker thread while its bytes arrive."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=_QUEUED_CHUNKS)
+        reader = _QueueReader(self._queue, asyncio.get_running_loop())
+        self._parsing = asyncio.ensure_future(asyncio.to_thread(parse_member, reader))
+
+    async def feed(self, data: bytes | None) -> None:
+        """Pass body bytes (None at the end of the file) to the parser, waiting while its queue is full."""
+        if self._parsing.done():
+            # Parsing already failed; the rest of the file is dropped
+            return
+        put = asyncio.ensure_future(self._queue.put(data))
+        await asyncio.wait({put, self._parsing}, return_when=asyncio.FIRST_COMPLETED)
+        put.cancel()
+
+    async def result(self) -> tuple:
+        await self.feed(None)
+        try:
+            segments, content_hash = await self._parsing
+            error = None
+        except Exception as e:
+            segments, content_hash, error = None, None, e
+        return self.name, segments, content_hash, time.perf_counter() - self.started, error
+
+
+async def iter_uploads(
+    body: AsyncIterator[bytes],
+    content_type: str,
+    pattern: str = "*.vtt",
+) -> AsyncIterator[tuple]:
+    """
+    Parse the files of a multipart/form-data body while it is received.
+
+    Yields (name, segments, content_hash, seconds, error) as each file part
+    ends, in the form pipeline.ingest_uploads takes. Each file's bytes go
+    straight from `body` to the VTT parser running in a worker thread, and
+    reading `body` waits while the parser falls behind, so nothing is
+    buffered whole. A file whose name does not match `pattern`, or that
+    fails to parse, is yielded with its error. Form fields that are not
+    files are ignored. Raises ValueError if the body is not well-formed
+    multipart/form-data.
+    """
+    if MultipartParser is None:
+        raise RuntimeError("Uploads need the python-multipart package")
+    mime, params = parse_options_header(content_type)
+    if mime != b"multipart/form-data" or not params.get(b"boundary"):
+        raise ValueError("Expected a multipart/form-data body")
+
+    # The parser reports parts through synchronous callbacks; they are
+    # collected here and handled after each write, where we can await
+    events: list[tuple] = []
+    header: dict[str, bytes] = {"field": b"", "value": b""}
+    disposition = [b""]
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        header["field"] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        header["value"] += data[start:end]
+
+    def on_header_end() -> None:
+        if header["field"].lower() == b"content-disposition":
+            disposition[0] = header["value"]
+        header["field"] = header["value"] = b""
+
+    def on_headers_finished() -> None:
+        _, options = parse_options_header(disposition[0])
+        disposition[0] = b""
+        events.append(("begin", options.get(b"filename")))
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        events.append(("data", bytes(data[start:end])))
+
+    def on_part_end() -> None:
+        events.append(("end", None))
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    current: _UploadedFile | None = None
+    rejected: tuple | None = None
+    in_part = False
+    try:
+        async for chunk in body:
+            parser.write(chunk)
+            for kind, value in events:
+                if kind == "begin":
+                    in_part = True
+                    name = _upload_name(value.decode("utf-8", "replace")) if value else ""
+                    if not name:
+                        continue
+                    if fnmatch.fnmatch(name, pattern):
+                        current = _UploadedFile(name)
+                    else:
+                        rejected = (name, None, None, 0.0, ValueError(f"{name} does not match {pattern}"))
+                elif kind == "data":
+                    if current is not None:
+                        await current.feed(value)
+                else:
+                    in_part = False
+                    if current is not None:
+                        item, current = await current.result(), None
+                        yield item
+                    elif rejected is not None:
+                        item, rejected = rejected, None
+                        yield item
+            events.clear()
+        parser.finalize()
+        if in_part:
+            raise ValueError("Upload ended in the middle of a file")
+    finally:
+        if current is not None:
+            # Let the parser thread finish on what it has
+            await current.feed(None)
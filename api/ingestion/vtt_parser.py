@@ -1,41 +1,85 @@
 import logging
-import webvtt
-from models.schemas import ParsedCue
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+_TIMING_PATTERN = re.compile(
+    r"\s*((?:\d+:)?\d{2}:\d{2}\.\d{3})\s*-->\s*((?:\d+:)?\d{2}:\d{2}\.\d{3})"
+)
+_CUE_TAGS = re.compile(r"<.*?>")
+
+
+@dataclass(slots=True)
+class Cue:
+    """
+    A merged transcript segment.
+
+    Ingestion keeps segments in this compact form between stages; it has the
+    same fields as models.schemas.ParsedCue, so the stages accept either.
+    """
+
+    start_time: float
+    end_time: float
+    text: str
+    speaker: str = ""
+
 
 def _time_to_seconds(time_str: str) -> float:
-    """Convert VTT timestamp (HH:MM:SS.mmm) to seconds."""
+    """Convert VTT timestamp (HH:MM:SS.mmm or MM:SS.mmm) to seconds."""
     parts = time_str.split(":")
-    hours = int(parts[0])
-    minutes = int(parts[1])
-    seconds = float(parts[2])
+    seconds = float(parts[-1])
+    minutes = int(parts[-2])
+    hours = int(parts[-3]) if len(parts) > 2 else 0
     return hours * 3600 + minutes * 60 + seconds
 
 
-def parse_vtt(file_path: str) -> list[ParsedCue]:
+def iter_cues(lines: Iterable[str]) -> Iterator[tuple[float, float, str]]:
     """
-    Parse a VTT file and merge short cues into complete sentences.
+    Yield (start, end, text) for each cue in a stream of WebVTT lines.
 
-    Strategy: concatenate consecutive cues until we hit sentence-ending
-    punctuation or a >2s gap between cues.
+    Reads one line at a time, so the whole file is never held in memory.
+    Header, NOTE and STYLE blocks are skipped and cue tags are stripped.
     """
-    logger.info(f"parse_vtt called | file_path={file_path!r}")
-    captions = list(webvtt.read(file_path))
-    if not captions:
-        return []
+    start: float | None = None
+    end = 0.0
+    payload: list[str] = []
 
-    merged: list[ParsedCue] = []
-    current_text = ""
-    current_start = _time_to_seconds(captions[0].start)
-    current_end = _time_to_seconds(captions[0].end)
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            if start is not None and payload:
+                yield start, end, _CUE_TAGS.sub("", "\n".join(payload))
+            start = None
+            payload = []
+        elif start is None:
+            if "-->" in line:
+                match = _TIMING_PATTERN.match(line)
+                if match:
+                    start = _time_to_seconds(match.group(1))
+                    end = _time_to_seconds(match.group(2))
+        else:
+            payload.append(line)
+
+    if start is not None and payload:
+        yield start, end, _CUE_TAGS.sub("", "\n".join(payload))
 
-    for i, caption in enumerate(captions):
-        start = _time_to_seconds(caption.start)
-        end = _time_to_seconds(caption.end)
-        text = caption.text.strip()
 
+def iter_merged_cues(lines: Iterable[str]) -> Iterator[Cue]:
+    """
+    Merge short cues from a stream of WebVTT lines into complete sentences.
+
+    Strategy: concatenate consecutive cues until we hit sentence-ending
+    punctuation or a >2s gap between cues. Each merged segment is yielded as
+    soon as the next cue shows it is complete.
+    """
+    current_text = ""
+    current_start = 0.0
+    current_end = 0.0
+
+    for start, end, text in iter_cues(lines):
+        text = text.strip()
         if not text:
             continue
 
@@ -49,11 +93,7 @@ def parse_vtt(file_path: str) -> list[ParsedCue]:
         ends_sentence = current_text.rstrip().endswith((".", "!", "?"))
 
         if ends_sentence or gap > 2.0:
-            merged.append(ParsedCue(
-                start_time=current_start,
-                end_time=current_end,
-                text=current_text.strip(),
-            ))
+            yield Cue(current_start, current_end, current_text.strip())
             current_text = text
             current_start = start
             current_end = end
@@ -62,11 +102,22 @@ def parse_vtt(file_path: str) -> list[ParsedCue]:
             current_end = end
 
     if current_text.strip():
-        merged.append(ParsedCue(
-            start_time=current_start,
-            end_time=current_end,
-            text=current_text.strip(),
-        ))
+        yield Cue(current_start, current_end, current_text.strip())
+
+
+def iter_vtt(file_path: str) -> Iterator[Cue]:
+    """Stream merged segments from a VTT file on disk."""
+    with open(file_path, encoding="utf-8-sig") as f:
+        yield from iter_merged_cues(f)
 
+
+def parse_vtt(file_path: str) -> list[Cue]:
+    """
+    Parse a VTT file and merge short cues into complete sentences.
+
+    See iter_merged_cues for the merging strategy.
+    """
+    logger.info(f"parse_vtt called | file_path={file_path!r}")
+    merged = list(iter_vtt(file_path))
     logger.info(f"parse_vtt returned | {len(merged)} segments")
     return merged
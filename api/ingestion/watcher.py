@@ -0,0 +1,164 @@
+import asyncio
+import fnmatch
+import logging
+import os
+from collections.abc import AsyncIterator, Awaitable, Callable
+from config import Config
+from ingestion.pipeline import ingest_file, remove_file
+
+try:
+    import watchfiles
+except ImportError:  # pragma: no cover - watchfiles ships with uvicorn[standard]
+    watchfiles = None
+
+logger = logging.getLogger(__name__)
+
+# A file's (size, mtime_ns), or None once it no longer exists
+Signature = tuple[int, int] | None
+
+
+def _signature(path: str) -> Signature:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class TranscriptWatcher:
+    """
+    Keep the index in step with a transcripts directory as files change.
+
+    Changes come from watchfiles (inotify on Linux) or, when it is missing
+    or `force_polling` is set, from periodic os.scandir snapshots. A changed
+    file is only handled once its size and mtime have been stable for
+    `debounce_seconds`, so files still being copied in are not ingested
+    half-written. New or modified files go through ingest_file (whose hash
+    check drops no-op changes); deleted files are removed from the index.
+    Work done is proportional to the files that changed, not the archive.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        pattern: str = "*.vtt",
+        debounce_seconds: float | None = None,
+        force_polling: bool | None = None,
+        poll_interval: float | None = None,
+        concurrency: int | None = None,
+        on_result: Callable[[str, dict], Awaitable[None]] | None = None,
+    ):
+        self.directory = directory
+        self.pattern = pattern
+        self.debounce_seconds = Config.WATCH_DEBOUNCE_SECONDS if debounce_seconds is None else debounce_seconds
+        self.force_polling = Config.WATCH_FORCE_POLLING if force_polling is None else force_polling
+        self.poll_interval = poll_interval or Config.WATCH_POLL_INTERVAL_SECONDS
+        self.on_result = on_result
+        self._semaphore = asyncio.Semaphore(max(1, concurrency or Config.INGEST_CONCURRENCY))
+        # path -> (signature when last seen changing, loop time it was seen)
+        self._pending: dict[str, tuple[Signature, float]] = {}
+        self._running: dict[str, asyncio.Task] = {}
+
+    def _matches(self, path: str) -> bool:
+        return fnmatch.fnmatch(os.path.basename(path), self.pattern)
+
+    def notice(self, paths: set[str]) -> None:
+        """Record that these paths changed; they are handled once they settle."""
+        now = asyncio.get_running_loop().time()
+        for path in paths:
+            if self._matches(path):
+                self._pending[path] = (_signature(path), now)
+
+    async def run(self, stop_event: asyncio.Event | None = None) -> None:
+        """Watch until `stop_event` is set, then finish any in-flight files."""
+        stop_event = stop_event or asyncio.Event()
+        mode = "polling" if self.force_polling or watchfiles is None else "native"
+        logger.info(f"Watching {self.directory!r} for {self.pattern} ({mode}, debounce {self.debounce_seconds}s)")
+        settle = asyncio.create_task(self._settle_loop(stop_event))
+        try:
+            async for paths in self._changes(stop_event):
+                self.notice(paths)
+        finally:
+            settle.cancel()
+            await asyncio.gather(settle, *self._running.values(), return_exceptions=True)
+
+    async def _changes(self, stop_event: asyncio.Event) -> AsyncIterator[set[str]]:
+        if self.force_polling or watchfiles is None:
+            async for paths in self._poll_changes(stop_event):
+                yield paths
+            return
+        async for changes in watchfiles.awatch(
+            self.directory,
+            stop_event=stop_event,
+            recursive=True,
+            debounce=int(self.debounce_seconds * 1000) or 1,
+        ):
+            yield {path for _, path in changes}
+
+    def _snapshot(self) -> dict[str, Signature]:
+        snapshot: dict[str, Signature] = {}
+        stack = [self.directory]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except FileNotFoundError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif self._matches(entry.path):
+                        try:
+                            stat = entry.stat()
+                        except FileNotFoundError:
+                            continue
+                        snapshot[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    async def _poll_changes(self, stop_event: asyncio.Event) -> AsyncIterator[set[str]]:
+        previous = await asyncio.to_thread(self._snapshot)
+        while not stop_event.is_set():
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            current = await asyncio.to_thread(self._snapshot)
+            changed = {p for p in previous.keys() | current.keys() if previous.get(p) != current.get(p)}
+            previous = current
+            if changed:
+                yield changed
+
+    async def _settle_loop(self, stop_event: asyncio.Event) -> None:
+        tick = min(0.5, max(self.debounce_seconds / 4, 0.05))
+        while not stop_event.is_set():
+            await asyncio.sleep(tick)
+            self.dispatch_settled()
+
+    def dispatch_settled(self) -> None:
+        """Start handling every pending path that has stopped changing."""
+        now = asyncio.get_running_loop().time()
+        for path, (signature, seen) in list(self._pending.items()):
+            if now - seen < self.debounce_seconds or path in self._running:
+                continue
+            current = _signature(path)
+            if current != signature:
+                # Still being written; wait for another quiet period
+                self._pending[path] = (current, now)
+                continue
+            del self._pending[path]
+            self._running[path] = asyncio.create_task(self._process(path))
+
+    async def _process(self, path: str) -> None:
+        try:
+            async with self._semaphore:
+                if os.path.exists(path):
+                    result = await ingest_file(path)
+                else:
+                    result = await remove_file(path)
+            logger.info(f"Watcher handled {path} | status={result['status']}")
+            if self.on_result is not None:
+                await self.on_result(path, result)
+        except Exception:
+            logger.exception(f"Watcher failed to handle {path}")
+        finally:
+            self._running.pop(path, None)
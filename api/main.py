@@ -8,6 +8,9 @@ from routers import auth, chat, conversations, ingest
 from db.crud import get_user_by_username, create_user, update_user_password
 from db.models import Base
 from db.session import engine
+from ingestion.jobs import job_queue
+from ingestion.tasks import task_workers
+from agents.utils.llm_scheduler import llm_scheduler
 
 logging.basicConfig(
     level=getattr(logging, Config.LOG_LEVEL, logging.INFO),
@@ -51,9 +54,13 @@ async def lifespan(app: FastAPI):
             logger.info(f"Updated admin password from env for: {Config.ADMIN_USERNAME}")
     else:
         logger.warning("ADMIN_USERNAME or ADMIN_PASSWORD not set — skipping admin sync")
+    await job_queue.start(Config.INGEST_JOB_WORKERS)
+    await task_workers.start(Config.INGEST_TASK_WORKERS)
     logger.info("API startup complete")
     yield
     logger.info("API shutting down")
+    await task_workers.stop()
+    await job_queue.stop()
     await engine.dispose()
 
 
@@ -83,3 +90,9 @@ app.include_router(ingest.router)
 async def health():
     """Service health check."""
     return {"status": "ok"}
+
+
+@app.get("/health/llm")
+async def health_llm():
+    """LLM scheduler budgets, queue depth per priority and recent wait times."""
+    return llm_scheduler.stats()
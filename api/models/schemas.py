@@ -1,5 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 # --- Request Models ---
@@ -24,11 +24,26 @@ class LoginResponse(BaseModel):
 class IngestFileRequest(BaseModel):
     file_path: str
     force: bool = False
+    use_cache: bool = True
 
 
 class IngestDirectoryRequest(BaseModel):
     directory_path: str
     force: bool = False
+    concurrency: int | None = None
+    use_cache: bool = True
+
+
+class IngestTaskBatchRequest(BaseModel):
+    file_paths: list[str] = []
+    directory_path: str | None = None
+    force: bool = False
+    use_cache: bool = True
+
+
+class RechunkRequest(BaseModel):
+    chunk_size: int | None = None
+    overlap: int | None = None
 
 
 # --- Response Models ---
@@ -46,15 +61,100 @@ class ChatResponse(BaseModel):
     conversation_id: str
 
 
+class StageMetrics(BaseModel):
+    # Stages may add their own counters (e.g. heuristic_labeled, llm_cache_hits)
+    model_config = ConfigDict(extra="allow")
+
+    seconds: float = 0.0
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    retries: int = 0
+    repaired_responses: int = 0
+    documents_written: int = 0
+
+
+class StageSummary(StageMetrics):
+    episodes: int = 0
+    p50_seconds: float = 0.0
+    p95_seconds: float = 0.0
+
+
+class IngestMetricsSummary(BaseModel):
+    stages: dict[str, StageSummary] = {}
+    totals: StageMetrics = StageMetrics()
+
+
 class IngestResponse(BaseModel):
     status: str
     episode_id: str
     chunks_created: int
+    chunks_updated: int = 0
+    chunks_unchanged: int = 0
+    chunks_failed: int = 0
+    chunks_deleted: int = 0
+    llm_batches_skipped: int = 0
+    duplicate_of: str | None = None
+    metrics: dict[str, StageMetrics] = {}
+
+
+class IngestFileResult(IngestResponse):
+    file_path: str
+    chunks_created: int = 0
+    duration_seconds: float = 0.0
+    error: str | None = None
 
 
 class IngestDirectoryResponse(BaseModel):
     status: str
     episodes_processed: int
+    episodes_failed: int = 0
+    concurrency: int = 1
+    elapsed_seconds: float = 0.0
+    llm_batches_skipped: int = 0
+    metrics: IngestMetricsSummary = IngestMetricsSummary()
+    results: list[IngestFileResult] = []
+
+
+class RechunkResponse(BaseModel):
+    status: str
+    episodes_rechunked: int
+    episodes_skipped: int = 0
+    chunks_created: int = 0
+    chunks_updated: int = 0
+    chunks_failed: int = 0
+    chunks_deleted: int = 0
+    chunk_size: int
+    overlap: int
+
+
+class IngestJobError(BaseModel):
+    file_path: str | None = None
+    error: str
+
+
+class IngestJobResponse(BaseModel):
+    id: str
+    status: str
+    directory_path: str
+    files_total: int = 0
+    files_done: int = 0
+    files_failed: int = 0
+    chunks_written: int = 0
+    errors: list[IngestJobError] = []
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+class IngestTaskBatchResponse(BaseModel):
+    batch_id: str | None = None
+    tasks_total: int = 0
+    pending: int = 0
+    running: int = 0
+    completed: int = 0
+    failed: int = 0
+    errors: list[IngestJobError] = []
 
 
 class MessageResponse(BaseModel):
@@ -107,6 +207,7 @@ class TranscriptChunk(BaseModel):
     guest_names: list[str] = []
     industry: str = ""
     topic_tags: list[str] = []
+    boilerplate: bool = False
 
 
 class ParsedCue(BaseModel):
@@ -1,7 +1,32 @@
+import asyncio
+import json
 import logging
-from fastapi import APIRouter
-from models.schemas import IngestFileRequest, IngestDirectoryRequest, IngestResponse, IngestDirectoryResponse
-from ingestion.pipeline import ingest_file, ingest_directory
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from models.schemas import (
+    IngestFileRequest,
+    IngestDirectoryRequest,
+    IngestResponse,
+    IngestDirectoryResponse,
+    IngestFileResult,
+    IngestJobResponse,
+    IngestTaskBatchRequest,
+    IngestTaskBatchResponse,
+    RechunkRequest,
+    RechunkResponse,
+)
+from config import Config
+from db.crud import (
+    create_ingestion_job,
+    create_ingestion_tasks,
+    get_failed_ingestion_tasks,
+    get_ingestion_job,
+    get_ingestion_task_counts,
+)
+from db.models import IngestionJob
+from ingestion.jobs import FINISHED_STATUSES, job_queue
+from ingestion.pipeline import ingest_file, ingest_directory, ingest_uploads, list_transcripts, rechunk_all
+from ingestion.uploads import iter_uploads
 
 logger = logging.getLogger(__name__)
 
@@ -12,15 +37,242 @@ router = APIRouter()
 async def ingest(request: IngestFileRequest):
     """Trigger ingestion pipeline for a single VTT file."""
     logger.info(f"POST /ingest | file_path={request.file_path!r}")
-    result = await ingest_file(request.file_path, force=request.force)
+    result = await ingest_file(request.file_path, force=request.force, use_cache=request.use_cache)
     logger.info(f"POST /ingest response | status={result['status']}, episode_id={result.get('episode_id')}")
     return IngestResponse(**result)
 
 
+@router.post("/ingest/upload", response_model=list[IngestFileResult])
+async def ingest_upload(
+    request: Request,
+    force: bool = False,
+    concurrency: int | None = None,
+    use_cache: bool = True,
+):
+    """
+    Ingest VTT files uploaded as multipart/form-data.
+
+    The body is read as it arrives and each file is parsed on the way in;
+    nothing is written to disk. Bodies over INGEST_UPLOAD_MAX_BYTES are
+    refused with 413, up front when Content-Length says so.
+    """
+    content_length = request.headers.get("content-length", "")
+    logger.info(f"POST /ingest/upload | content_length={content_length or None}, concurrency={concurrency}")
+    max_bytes = Config.INGEST_UPLOAD_MAX_BYTES
+    too_large = HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+    if content_length.isdigit() and int(content_length) > max_bytes:
+        raise too_large
+
+    async def body():
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_bytes:
+                raise too_large
+            yield chunk
+
+    try:
+        results = await ingest_uploads(
+            iter_uploads(body(), request.headers.get("content-type", "")),
+            force=force,
+            concurrency=concurrency,
+            use_cache=use_cache,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not results:
+        raise HTTPException(status_code=400, detail="No files in the upload")
+    logger.info(
+        f"POST /ingest/upload response | files={len(results)}, "
+        f"failed={sum(1 for r in results if r['status'] == 'error')}"
+    )
+    return [IngestFileResult(**r) for r in results]
+
+
 @router.post("/ingest/directory", response_model=IngestDirectoryResponse)
 async def ingest_dir(request: IngestDirectoryRequest):
-    """Batch ingest all VTT files in a directory."""
-    logger.info(f"POST /ingest/directory | directory_path={request.directory_path!r}")
-    result = await ingest_directory(request.directory_path, force=request.force)
-    logger.info(f"POST /ingest/directory response | episodes_processed={result.get('episodes_processed')}")
+    """Batch ingest all VTT files and transcript archives in a directory, or the members of one archive."""
+    logger.info(f"POST /ingest/directory | directory_path={request.directory_path!r}, concurrency={request.concurrency}")
+    result = await ingest_directory(
+        request.directory_path,
+        force=request.force,
+        concurrency=request.concurrency,
+        use_cache=request.use_cache,
+    )
+    logger.info(
+        f"POST /ingest/directory response | episodes_processed={result.get('episodes_processed')}, "
+        f"episodes_failed={result.get('episodes_failed')}, elapsed_seconds={result.get('elapsed_seconds')}"
+    )
     return IngestDirectoryResponse(**result)
+
+
+@router.post("/ingest/rechunk", response_model=RechunkResponse)
+async def rechunk(request: RechunkRequest):
+    """Rebuild all chunks from stored artifacts, without LLM calls."""
+    logger.info(f"POST /ingest/rechunk | chunk_size={request.chunk_size}, overlap={request.overlap}")
+    try:
+        result = await rechunk_all(chunk_size=request.chunk_size, overlap=request.overlap)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    logger.info(
+        f"POST /ingest/rechunk response | episodes_rechunked={result['episodes_rechunked']}, "
+        f"chunks_created={result['chunks_created']}"
+    )
+    return RechunkResponse(**result)
+
+
+def _job_response(job: IngestionJob) -> IngestJobResponse:
+    return IngestJobResponse(
+        id=job.id,
+        status=job.status,
+        directory_path=job.directory_path,
+        files_total=job.files_total or 0,
+        files_done=job.files_done or 0,
+        files_failed=job.files_failed or 0,
+        chunks_written=job.chunks_written or 0,
+        errors=job.errors or [],
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+# Seconds an event stream waits for progress before re-reading the job row
+_EVENT_POLL_SECONDS = 15
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.post("/ingest/jobs", response_model=IngestJobResponse, status_code=202)
+async def submit_ingest_job(request: IngestDirectoryRequest):
+    """Queue a directory ingestion job and return immediately with its ID."""
+    logger.info(f"POST /ingest/jobs | directory_path={request.directory_path!r}, concurrency={request.concurrency}")
+    job = await create_ingestion_job(
+        request.directory_path,
+        force=request.force,
+        concurrency=request.concurrency,
+        use_cache=request.use_cache,
+    )
+    job_queue.submit(job.id)
+    logger.info(f"POST /ingest/jobs response | job_id={job.id}")
+    return _job_response(job)
+
+
+@router.get("/ingest/jobs/{job_id}", response_model=IngestJobResponse)
+async def get_ingest_job(job_id: str):
+    """Progress of an ingestion job: files done, chunks written and errors."""
+    logger.info(f"GET /ingest/jobs/{job_id}")
+    job = await get_ingestion_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job)
+
+
+@router.get("/ingest/jobs/{job_id}/events")
+async def stream_ingest_job_events(job_id: str):
+    """
+    Server-sent events for an ingestion job.
+
+    Sends the current job state as a "status" event, then a "started",
+    "file" or "finished" event for each progress update. The stream closes
+    after "finished", or straight away if the job had already finished.
+
+    Per-file events only come from the node running the job. Every
+    _EVENT_POLL_SECONDS without one, the job row is read again and sent as a "status"
+    event if it moved on, or as "finished" once the job is done, so a
+    stream opened on another node still follows the job to the end.
+    """
+    logger.info(f"GET /ingest/jobs/{job_id}/events")
+    # Subscribe before reading the row so no update falls between the two
+    queue = job_queue.subscribe(job_id)
+    job = await get_ingestion_job(job_id)
+    if job is None:
+        job_queue.unsubscribe(job_id, queue)
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        try:
+            last = _job_response(job).model_dump(mode="json")
+            yield _sse("status", last)
+            if job.status in FINISHED_STATUSES:
+                return
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=_EVENT_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    current = await get_ingestion_job(job_id)
+                    state = _job_response(current).model_dump(mode="json") if current else last
+                    if state["status"] in FINISHED_STATUSES:
+                        yield _sse("finished", {"type": "finished", "job_id": job_id, **state})
+                        return
+                    if state != last:
+                        last = state
+                        yield _sse("status", state)
+                    else:
+                        yield ": keepalive\n\n"
+                    continue
+                yield _sse(event["type"], event)
+                if event["type"] == "finished":
+                    return
+        finally:
+            job_queue.unsubscribe(job_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _task_batch_response(batch_id: str | None) -> IngestTaskBatchResponse:
+    counts = await get_ingestion_task_counts(batch_id)
+    failed = await get_failed_ingestion_tasks(batch_id)
+    return IngestTaskBatchResponse(
+        batch_id=batch_id,
+        tasks_total=sum(counts.values()),
+        **{status: counts.get(status, 0) for status in ("pending", "running", "completed", "failed")},
+        errors=[{"file_path": task.file_path, "error": task.error or "failed"} for task in failed],
+    )
+
+
+@router.post("/ingest/tasks", response_model=IngestTaskBatchResponse, status_code=202)
+async def submit_ingest_tasks(request: IngestTaskBatchRequest):
+    """
+    Queue files for ingestion by the task workers on every API node.
+
+    Takes `file_paths`, a `directory_path` (listed as for /ingest/directory),
+    or both. Paths must be readable at the same location on every node.
+    """
+    logger.info(
+        f"POST /ingest/tasks | files={len(request.file_paths)}, directory_path={request.directory_path!r}"
+    )
+    file_paths = list(request.file_paths)
+    if request.directory_path:
+        try:
+            file_paths += list_transcripts(request.directory_path)
+        except OSError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    if not file_paths:
+        raise HTTPException(status_code=400, detail="No files to ingest")
+    batch_id = await create_ingestion_tasks(file_paths, force=request.force, use_cache=request.use_cache)
+    logger.info(f"POST /ingest/tasks response | batch_id={batch_id}, tasks={len(file_paths)}")
+    return IngestTaskBatchResponse(batch_id=batch_id, tasks_total=len(file_paths), pending=len(file_paths))
+
+
+@router.get("/ingest/tasks", response_model=IngestTaskBatchResponse)
+async def get_ingest_tasks():
+    """Task counts by status across every batch, with the latest failures."""
+    logger.info("GET /ingest/tasks")
+    return await _task_batch_response(None)
+
+
+@router.get("/ingest/tasks/{batch_id}", response_model=IngestTaskBatchResponse)
+async def get_ingest_task_batch(batch_id: str):
+    """Progress of one batch of tasks: counts by status and failed files."""
+    logger.info(f"GET /ingest/tasks/{batch_id}")
+    response = await _task_batch_response(batch_id)
+    if response.tasks_total == 0:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return response
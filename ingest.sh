@@ -1,5 +1,10 @@
 #!/bin/bash
 
-curl -X POST http://localhost:8000/ingest/directory \
+# Queue the transcripts directory as an ingestion job, then follow its progress
+JOB_ID=$(curl -s -X POST http://localhost:8000/ingest/jobs \
     -H "Content-Type: application/json" \
-    -d '{"directory_path": "/app/transcripts"}'
\ No newline at end of file
+    -d '{"directory_path": "/app/transcripts"}' \
+    | python3 -c 'import json, sys; print(json.load(sys.stdin)["id"])')
+
+echo "Ingestion job: $JOB_ID"
+curl -N http://localhost:8000/ingest/jobs/$JOB_ID/events
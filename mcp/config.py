@@ -16,6 +16,8 @@ class Config:
     TS_DATA_DIR: str = os.getenv("TS_DATA_DIR", "./db/typesense-data")
     TS_API_KEY: str = os.getenv("TS_API_KEY", "")
     TS_HOST: str = os.getenv("TS_HOST", "localhost")
+    SEARCH_MODE: str = os.getenv("SEARCH_MODE", "flat")  # "flat" or "hierarchical"
+    SEARCH_TOP_EPISODES: int = int(os.getenv("SEARCH_TOP_EPISODES", "5"))
 
     # OpenAI
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
@@ -6,7 +6,7 @@ from logging_utils import truncate
 from utils.scrape_utils import scrape_website, web_search
 from utils.slack_utils import send_to_slack_channel
 from utils.typesense_client import get_typesense_client, ensure_collections
-from tools.search import search_transcripts
+from tools.search import compare_search_modes, search_transcripts
 from tools.filter import filter_by_industry, filter_by_speaker
 from tools.metadata import get_episode_metadata, list_speakers, list_industries
 
@@ -80,6 +80,8 @@ def search_transcripts_tool(
     limit: int = 10,
     industry: str | None = None,
     speaker: str | None = None,
+    include_boilerplate: bool = False,
+    mode: str | None = None,
 ) -> list[dict]:
     """
     Hybrid search (semantic + keyword) across podcast transcript chunks.
@@ -90,13 +92,40 @@ def search_transcripts_tool(
         limit : Maximum number of results to return.
         industry : Optional industry filter to narrow results.
         speaker : Optional speaker name filter to narrow results.
+        include_boilerplate : Also return sponsor reads, intros and outros repeated across episodes.
+        mode : "flat" searches every chunk; "hierarchical" finds the best-matching episodes first
+            and searches only their chunks. Defaults to the server's SEARCH_MODE.
     """
-    logger.info(f"search_transcripts_tool called | query={query!r}, limit={limit}, industry={industry!r}, speaker={speaker!r}")
-    result = search_transcripts(query=query, limit=limit, industry=industry, speaker=speaker)
+    logger.info(
+        f"search_transcripts_tool called | query={query!r}, limit={limit}, industry={industry!r}, "
+        f"speaker={speaker!r}, include_boilerplate={include_boilerplate}, mode={mode!r}"
+    )
+    result = search_transcripts(
+        query=query, limit=limit, industry=industry, speaker=speaker,
+        include_boilerplate=include_boilerplate, mode=mode,
+    )
     logger.info(f"search_transcripts_tool returned | {len(result)} results | {truncate(result)}")
     return result
 
 
+@mcp.tool()
+def compare_search_modes_tool(query: str, limit: int = 10, top_episodes: int | None = None) -> dict:
+    """
+    Run a transcript search in flat and hierarchical mode and compare them.
+    Returns each mode's candidate-set size and latency, and the recall of
+    hierarchical search against flat search.
+
+    Args:
+        query : The search query.
+        limit : Results per mode.
+        top_episodes : Episodes searched by hierarchical mode (defaults to SEARCH_TOP_EPISODES).
+    """
+    logger.info(f"compare_search_modes_tool called | query={query!r}, limit={limit}, top_episodes={top_episodes}")
+    result = compare_search_modes(query=query, limit=limit, top_episodes=top_episodes)
+    logger.info(f"compare_search_modes_tool returned | {truncate(result)}")
+    return result
+
+
 @mcp.tool()
 def filter_by_industry_tool(industry: str, limit: int = 10) -> list[dict]:
     """
@@ -1,50 +1,85 @@
 import logging
+import time
+from config import Config
 from logging_utils import truncate
 from utils.typesense_client import get_typesense_client
 
 logger = logging.getLogger(__name__)
 
+SEARCH_MODES = ("flat", "hierarchical")
 
-def search_transcripts(
-    query: str,
-    limit: int = 10,
-    industry: str | None = None,
-    speaker: str | None = None,
-) -> list[dict]:
-    """
-    Hybrid search (semantic + keyword) on transcript_chunks collection.
+_CHUNK_FIELDS = "text,speaker,episode_id,start_time,end_time,chunk_index,guest_names,industry,topic_tags"
 
-    Returns chunk text, speaker, episode title, timestamps, and relevance score.
-    """
-    logger.info(f"search_transcripts called | query={query!r}, limit={limit}, industry={industry!r}, speaker={speaker!r}")
 
-    # Require a non-empty query to avoid returning too many results
-    if not query or not query.strip():
-        raise ValueError("query is required and cannot be empty")
+def _quote(value: str) -> str:
+    escaped = value.replace("`", "\\`")
+    return f"`{escaped}`"
 
-    client = get_typesense_client()
 
+def _rank_episodes(client, query: str, top_episodes: int, industry: str | None) -> tuple[list[str], dict]:
+    """Return the ids of the `top_episodes` episodes best matching the query, and the raw response."""
     search_params = {
-        "q": query.strip(),
-        "query_by": "text,embedding",
+        "q": query,
+        "query_by": "title,summary,topic_tags,embedding",
         "prefix": False,
-        "per_page": limit,
-        "include_fields": "text,speaker,episode_id,start_time,end_time,chunk_index,guest_names,industry,topic_tags",
+        "per_page": top_episodes,
+        "include_fields": "id",
     }
+    if industry and industry.strip():
+        search_params["filter_by"] = f"industry:={_quote(industry)}"
+    results = client.collections["episodes"].documents.search(search_params)
+    return [hit["document"]["id"] for hit in results.get("hits", [])], results
+
+
+def _search_chunks(
+    query: str,
+    limit: int,
+    industry: str | None,
+    speaker: str | None,
+    include_boilerplate: bool,
+    mode: str,
+    top_episodes: int,
+) -> tuple[list[dict], dict]:
+    """Run one search and return its results with candidate counts and timings."""
+    client = get_typesense_client()
+    started = time.perf_counter()
+    stats = {"mode": mode, "search_time_ms": 0}
 
     filter_parts = []
+    if mode == "hierarchical":
+        episode_ids, episodes = _rank_episodes(client, query, top_episodes, industry)
+        stats["episodes"] = episode_ids
+        stats["search_time_ms"] += episodes.get("search_time_ms", 0)
+        if not episode_ids:
+            stats.update(candidates=0, corpus=0, latency_ms=round((time.perf_counter() - started) * 1000, 1))
+            return [], stats
+        filter_parts.append(f"episode_id:[{','.join(_quote(i) for i in episode_ids)}]")
+
     if industry and industry.strip():
-        escaped = industry.replace("`", "\\`")
-        filter_parts.append(f"industry:=`{escaped}`")
+        filter_parts.append(f"industry:={_quote(industry)}")
     if speaker and speaker.strip():
-        escaped = speaker.replace("`", "\\`")
-        filter_parts.append(f"speaker:=`{escaped}`")
+        filter_parts.append(f"speaker:={_quote(speaker)}")
+    if not include_boilerplate:
+        # != also matches chunks indexed before the field existed
+        filter_parts.append("boilerplate:!=true")
+
+    search_params = {
+        "q": query,
+        "query_by": "text,embedding",
+        "prefix": False,
+        "per_page": limit,
+        "include_fields": _CHUNK_FIELDS,
+    }
     if filter_parts:
         search_params["filter_by"] = " && ".join(filter_parts)
 
     results = client.collections["transcript_chunks"].documents.search(search_params)
+    stats["search_time_ms"] += results.get("search_time_ms", 0)
+    stats["candidates"] = results.get("found", 0)
+    stats["corpus"] = results.get("out_of", 0)
+    stats["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
 
-    result = [
+    hits = [
         {
             "text": hit["document"]["text"],
             "speaker": hit["document"].get("speaker", ""),
@@ -58,5 +93,86 @@ def search_transcripts(
         }
         for hit in results.get("hits", [])
     ]
-    logger.info(f"search_transcripts returned | {len(result)} results | {truncate(result)}")
+    return hits, stats
+
+
+def _validate(query: str, mode: str | None, top_episodes: int | None) -> tuple[str, str, int]:
+    # Require a non-empty query to avoid returning too many results
+    if not query or not query.strip():
+        raise ValueError("query is required and cannot be empty")
+    mode = mode or Config.SEARCH_MODE
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"mode must be one of {', '.join(SEARCH_MODES)}")
+    return query.strip(), mode, max(1, top_episodes or Config.SEARCH_TOP_EPISODES)
+
+
+def search_transcripts(
+    query: str,
+    limit: int = 10,
+    industry: str | None = None,
+    speaker: str | None = None,
+    include_boilerplate: bool = False,
+    mode: str | None = None,
+    top_episodes: int | None = None,
+) -> list[dict]:
+    """
+    Hybrid search (semantic + keyword) on transcript_chunks collection.
+
+    Returns chunk text, speaker, episode title, timestamps, and relevance score.
+    Chunks flagged as boilerplate at ingestion (sponsor reads, intros and
+    outros repeated across episodes) are excluded unless include_boilerplate.
+
+    mode="flat" searches every chunk. mode="hierarchical" first ranks
+    episodes by title, summary, tags and embedding, then searches only the
+    chunks of the `top_episodes` best (default Config.SEARCH_TOP_EPISODES).
+    The default mode is Config.SEARCH_MODE.
+    """
+    logger.info(
+        f"search_transcripts called | query={query!r}, limit={limit}, industry={industry!r}, "
+        f"speaker={speaker!r}, include_boilerplate={include_boilerplate}, mode={mode!r}, top_episodes={top_episodes}"
+    )
+    query, mode, top_episodes = _validate(query, mode, top_episodes)
+
+    result, stats = _search_chunks(query, limit, industry, speaker, include_boilerplate, mode, top_episodes)
+    logger.info(f"search_transcripts returned | {len(result)} results | {stats} | {truncate(result)}")
+    return result
+
+
+def compare_search_modes(
+    query: str,
+    limit: int = 10,
+    industry: str | None = None,
+    speaker: str | None = None,
+    include_boilerplate: bool = False,
+    top_episodes: int | None = None,
+) -> dict:
+    """
+    Run a query in flat and hierarchical mode and compare them.
+
+    Reports each mode's candidate-set size (chunks matched), latency and
+    Typesense search time, the episodes hierarchical mode searched, and its
+    recall against flat search: the share of flat results it also
+    returned. episode_recall is the share of flat results whose episode
+    made the top `top_episodes`, i.e. the recall the episode stage allows.
+    """
+    logger.info(f"compare_search_modes called | query={query!r}, limit={limit}, top_episodes={top_episodes}")
+    query, _, top_episodes = _validate(query, "flat", top_episodes)
+
+    flat, flat_stats = _search_chunks(query, limit, industry, speaker, include_boilerplate, "flat", top_episodes)
+    hierarchical, hier_stats = _search_chunks(
+        query, limit, industry, speaker, include_boilerplate, "hierarchical", top_episodes,
+    )
+
+    flat_keys = {(r["episode_id"], r["chunk_index"]) for r in flat}
+    hier_keys = {(r["episode_id"], r["chunk_index"]) for r in hierarchical}
+    searched = set(hier_stats["episodes"])
+    result = {
+        "query": query,
+        "top_episodes": top_episodes,
+        "flat": {**flat_stats, "results": len(flat)},
+        "hierarchical": {**hier_stats, "results": len(hierarchical)},
+        "recall": round(len(flat_keys & hier_keys) / len(flat_keys), 3) if flat_keys else None,
+        "episode_recall": round(sum(1 for r in flat if r["episode_id"] in searched) / len(flat), 3) if flat else None,
+    }
+    logger.info(f"compare_search_modes returned | {truncate(result)}")
     return result
@@ -29,6 +29,20 @@ def ensure_collections(client: typesense.Client) -> None:
             {"name": "summary", "type": "string"},
             {"name": "duration_seconds", "type": "int32"},
             {"name": "source_file", "type": "string"},
+            {"name": "content_hash", "type": "string", "optional": True},
+            # Ranks episodes for hierarchical search (see tools.search)
+            {
+                "name": "embedding",
+                "type": "float[]",
+                "num_dim": 3072,
+                "embed": {
+                    "from": ["title", "summary", "topic_tags"],
+                    "model_config": {
+                        "model_name": "openai/text-embedding-3-large",
+                        "api_key": Config.OPENAI_API_KEY,
+                    },
+                },
+            },
         ],
     }
 
@@ -44,6 +58,11 @@ def ensure_collections(client: typesense.Client) -> None:
             {"name": "guest_names", "type": "string[]"},
             {"name": "industry", "type": "string", "facet": True},
             {"name": "topic_tags", "type": "string[]", "facet": True},
+            # Near-duplicate of a chunk in another episode (sponsor reads, intros)
+            {"name": "boilerplate", "type": "bool", "optional": True},
+            # Typesense embeds queries with this model. Ingestion may also
+            # send precomputed vectors (EMBEDDING_MODE=client), which must
+            # come from the same model.
             {
                 "name": "embedding",
                 "type": "float[]",
@@ -59,10 +78,18 @@ def ensure_collections(client: typesense.Client) -> None:
         ],
     }
 
-    existing = {c["name"] for c in client.collections.retrieve()}
+    existing = {c["name"]: c for c in client.collections.retrieve()}
+
+    for schema in (episodes_schema, chunks_schema):
+        if schema["name"] not in existing:
+            client.collections.create(schema)
+        else:
+            _add_missing_fields(client, schema, existing[schema["name"]])
 
-    if "episodes" not in existing:
-        client.collections.create(episodes_schema)
 
-    if "transcript_chunks" not in existing:
-        client.collections.create(chunks_schema)
+def _add_missing_fields(client: typesense.Client, schema: dict, current: dict) -> None:
+    """Add fields declared in `schema` that an existing collection lacks."""
+    current_fields = {f["name"] for f in current.get("fields", [])}
+    missing = [f for f in schema["fields"] if f["name"] not in current_fields]
+    if missing:
+        client.collections[schema["name"]].update({"fields": missing})
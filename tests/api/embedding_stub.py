@@ -0,0 +1,39 @@
+"""
+Stub of the OpenAI embeddings API for tests and local runs.
+
+Returns small deterministic vectors derived from each input's hash and
+records every request in `requests`. Run standalone with
+`uvicorn embedding_stub:app --port 8100` and set
+EMBEDDING_BASE_URL=http://localhost:8100.
+"""
+import hashlib
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+DIMENSIONS = 8
+
+app = FastAPI()
+requests: list[list[str]] = []
+
+
+class EmbeddingRequest(BaseModel):
+    model: str
+    input: list[str]
+
+
+def stub_vector(text: str) -> list[float]:
+    digest = hashlib.sha256(text.encode()).digest()
+    return [b / 255 for b in digest[:DIMENSIONS]]
+
+
+@app.post("/embeddings")
+async def embeddings(request: EmbeddingRequest):
+    requests.append(request.input)
+    return {
+        "object": "list",
+        "model": request.model,
+        "data": [
+            {"object": "embedding", "index": i, "embedding": stub_vector(text)}
+            for i, text in enumerate(request.input)
+        ],
+    }
@@ -0,0 +1,196 @@
+import asyncio
+import io
+import tarfile
+import zipfile
+from unittest.mock import patch
+import pytest
+import zstandard
+
+from ingestion.archives import count_members, is_archive, iter_members, parse_member
+from ingestion.pipeline import _file_hash
+from ingestion.vtt_parser import parse_vtt
+
+VTT = "WEBVTT\n\n00:00:00.000 --> 00:00:02.000\nHello there.\n\n00:00:02.500 --> 00:00:04.000\nWelcome back.\n"
+
+
+def _transcripts(n: int = 2) -> dict[str, bytes]:
+    return {f"show/Episode {i} with Guest {i}.vtt": VTT.replace("Hello", f"Hello {i}").encode() for i in range(n)}
+
+
+def _write_zip(path, members: dict[str, bytes]) -> str:
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return str(path)
+
+
+def _tar_bytes(members: dict[str, bytes]) -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as tf:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def _write_tar_gz(path, members: dict[str, bytes]) -> str:
+    import gzip
+    path.write_bytes(gzip.compress(_tar_bytes(members)))
+    return str(path)
+
+
+def _write_tar_zst(path, members: dict[str, bytes]) -> str:
+    path.write_bytes(zstandard.ZstdCompressor().compress(_tar_bytes(members)))
+    return str(path)
+
+
+WRITERS = {"archive.zip": _write_zip, "archive.tar.gz": _write_tar_gz, "archive.tar.zst": _write_tar_zst}
+
+
+class TestIsArchive:
+    def test_suffixes(self):
+        assert is_archive("a.zip")
+        assert is_archive("/x/A.TAR.GZ")
+        assert is_archive("a.tgz")
+        assert is_archive("a.tar.zst")
+        assert not is_archive("a.vtt")
+        assert not is_archive("a.gz")
+
+
+class TestIterMembers:
+    @pytest.mark.parametrize("archive_name", WRITERS)
+    def test_yields_matching_members(self, tmp_path, archive_name):
+        members = {**_transcripts(), "show/notes.txt": b"skip", "__MACOSX/show/._Episode 0.vtt": b"fork"}
+        path = WRITERS[archive_name](tmp_path / archive_name, members)
+
+        found = {name: stream.read() for name, stream in iter_members(path)}
+        assert found == _transcripts()
+
+    def test_pattern(self, tmp_path):
+        path = _write_zip(tmp_path / "a.zip", {"a.vtt": b"x", "b.srt": b"y"})
+        assert [name for name, _ in iter_members(path, "*.srt")] == ["b.srt"]
+
+    def test_count_members(self, tmp_path):
+        zip_path = _write_zip(tmp_path / "a.zip", {**_transcripts(3), "notes.txt": b""})
+        assert count_members(zip_path) == 3
+        assert count_members(_write_tar_gz(tmp_path / "a.tar.gz", _transcripts())) is None
+
+
+class TestParseMember:
+    def test_matches_parsing_the_file(self, tmp_path):
+        data = ("\ufeff" + VTT).encode()
+        on_disk = tmp_path / "ep.vtt"
+        on_disk.write_bytes(data)
+
+        segments, content_hash = parse_member(io.BytesIO(data))
+        assert segments == parse_vtt(str(on_disk))
+        assert content_hash == _file_hash(str(on_disk))
+
+
+def _fake_ingest_content(calls: list):
+    async def fake(filename, content_hash, parse, force, use_cache, executor, metrics):
+        segments = await parse()
+        calls.append((filename, content_hash, len(segments)))
+        return {"status": "success", "episode_id": filename[:-4], "chunks_created": len(segments),
+                "metrics": metrics.to_dict()}
+    return fake
+
+
+class TestIngestArchives:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("archive_name", WRITERS)
+    async def test_members_reported_like_files(self, tmp_path, archive_name):
+        from ingestion.pipeline import ingest_directory
+
+        path = WRITERS[archive_name](tmp_path / archive_name, _transcripts())
+        calls = []
+        events = []
+
+        async def on_progress(event):
+            events.append(event)
+
+        with patch("ingestion.pipeline._ingest_content", side_effect=_fake_ingest_content(calls)):
+            result = await ingest_directory(str(tmp_path), on_progress=on_progress)
+
+        assert result["episodes_processed"] == 2
+        assert sorted(r["file_path"] for r in result["results"]) == [
+            f"{path}!show/Episode 0 with Guest 0.vtt",
+            f"{path}!show/Episode 1 with Guest 1.vtt",
+        ]
+        assert all(r["chunks_created"] == 2 and r["error"] is None for r in result["results"])
+        assert all("parse" in r["metrics"] for r in result["results"])
+        assert sorted(c[0] for c in calls) == ["Episode 0 with Guest 0.vtt", "Episode 1 with Guest 1.vtt"]
+        assert events[-1]["files_total"] == 2
+        assert [e["type"] for e in events[1:]] == ["file", "file"]
+
+    @pytest.mark.asyncio
+    async def test_archive_path_given_directly(self, tmp_path):
+        from ingestion.pipeline import ingest_directory
+
+        path = _write_tar_gz(tmp_path / "a.tar.gz", _transcripts(3))
+        calls = []
+        with patch("ingestion.pipeline._ingest_content", side_effect=_fake_ingest_content(calls)):
+            result = await ingest_directory(path)
+        assert result["episodes_processed"] == 3
+
+    @pytest.mark.asyncio
+    async def test_members_in_flight_are_bounded(self, tmp_path):
+        from ingestion.pipeline import ingest_files
+
+        path = _write_tar_zst(tmp_path / "a.tar.zst", _transcripts(6))
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fake(filename, content_hash, parse, force, use_cache, executor, metrics):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"status": "success", "episode_id": "ep", "chunks_created": 1}
+
+        with patch("ingestion.pipeline._ingest_content", side_effect=fake):
+            result = await ingest_files([path], concurrency=2)
+        assert result["episodes_processed"] == 6
+        assert 1 <= max_in_flight <= 2
+
+    @pytest.mark.asyncio
+    async def test_bad_member_fails_alone(self, tmp_path):
+        from ingestion.pipeline import ingest_files
+
+        path = _write_zip(tmp_path / "a.zip", {"good.vtt": VTT.encode(), "bad.vtt": b"\xff\xfe\xfa not utf-8"})
+        calls = []
+        with patch("ingestion.pipeline._ingest_content", side_effect=_fake_ingest_content(calls)):
+            result = await ingest_files([path])
+
+        by_file = {r["file_path"]: r for r in result["results"]}
+        assert result["status"] == "partial"
+        assert by_file[f"{path}!bad.vtt"]["status"] == "error"
+        assert by_file[f"{path}!bad.vtt"]["episode_id"] == "bad"
+        assert "UnicodeDecodeError" in by_file[f"{path}!bad.vtt"]["error"]
+        assert by_file[f"{path}!good.vtt"]["status"] == "success"
+
+    @pytest.mark.asyncio
+    async def test_unreadable_archive_reported(self, tmp_path):
+        from ingestion.pipeline import ingest_files
+
+        corrupt = tmp_path / "broken.tar.gz"
+        corrupt.write_bytes(b"not a gzip stream")
+        plain = tmp_path / "ep.vtt"
+        plain.write_text(VTT)
+        events = []
+
+        async def on_progress(event):
+            events.append(event)
+
+        with patch("ingestion.pipeline.ingest_file", return_value={
+            "status": "success", "episode_id": "ep", "chunks_created": 1,
+        }):
+            result = await ingest_files([str(plain), str(corrupt)], on_progress=on_progress)
+
+        assert result["episodes_processed"] == 2
+        assert result["results"][1]["file_path"] == str(corrupt)
+        assert result["results"][1]["status"] == "error"
+        assert events[0]["files_total"] == 1
+        assert events[-1]["files_total"] == 2
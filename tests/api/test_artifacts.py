@@ -0,0 +1,63 @@
+import os
+
+from ingestion.vtt_parser import Cue
+
+
+class TestArtifactStore:
+    def test_save_and_load(self, tmp_path):
+        from ingestion.artifacts import ArtifactStore
+
+        store = ArtifactStore(str(tmp_path))
+        store.save("abcd1234", "metadata", {"title": "Ep"}, "ep", "Ep.vtt")
+
+        assert store.load("abcd1234", "metadata") == {"title": "Ep"}
+        manifest = store.manifest("abcd1234")
+        assert manifest["stages"] == ["metadata"]
+        assert manifest["episode_id"] == "ep"
+        assert manifest["source_file"] == "Ep.vtt"
+
+    def test_missing_stage(self, tmp_path):
+        from ingestion.artifacts import ArtifactStore
+
+        store = ArtifactStore(str(tmp_path))
+        assert store.load("abcd1234", "cues") is None
+        store.save("abcd1234", "cues", [], "ep", "Ep.vtt")
+        assert store.load("abcd1234", "labeled") is None
+
+    def test_stage_file_without_manifest_entry_ignored(self, tmp_path):
+        from ingestion.artifacts import ArtifactStore
+
+        store = ArtifactStore(str(tmp_path))
+        store.save("abcd1234", "cues", [], "ep", "Ep.vtt")
+        # A stage file written before a crash, never recorded in the manifest
+        with open(os.path.join(store._dir("abcd1234"), "labeled.json"), "w") as f:
+            f.write("[]")
+        assert store.load("abcd1234", "labeled") is None
+
+    def test_no_temp_files_left(self, tmp_path):
+        from ingestion.artifacts import ArtifactStore
+
+        store = ArtifactStore(str(tmp_path))
+        store.save("abcd1234", "cues", [[0.0, 1.0, "Hi.", ""]], "ep", "Ep.vtt")
+        assert sorted(os.listdir(store._dir("abcd1234"))) == ["cues.json", "manifest.json"]
+
+    def test_iter_manifests(self, tmp_path):
+        from ingestion.artifacts import ArtifactStore
+
+        store = ArtifactStore(str(tmp_path))
+        store.save("aa11", "cues", [], "ep_a", "a.vtt")
+        store.save("bb22", "cues", [], "ep_b", "b.vtt")
+        assert [m["episode_id"] for m in store.iter_manifests()] == ["ep_a", "ep_b"]
+
+    def test_iter_manifests_empty_root(self, tmp_path):
+        from ingestion.artifacts import ArtifactStore
+
+        assert list(ArtifactStore(str(tmp_path / "missing")).iter_manifests()) == []
+
+
+class TestSegmentEncoding:
+    def test_round_trip(self):
+        from ingestion.artifacts import segments_from_json, segments_to_json
+
+        segments = [Cue(0.0, 1.5, "Hello.", "Host"), Cue(1.5, 3.0, "Hi.")]
+        assert segments_from_json(segments_to_json(segments)) == segments
@@ -72,3 +72,60 @@ class TestChunkSegments:
         assert result[0].guest_names == []
         assert result[0].industry == ""
         assert result[0].topic_tags == []
+
+    def test_reuses_shared_transcript(self):
+        from ingestion.transcript import tokenize
+
+        segments = [_make_segment("alpha beta"), _make_segment("gamma")]
+        transcript = tokenize(segments)
+        result = chunk_segments(segments, "ep-1", METADATA, transcript=transcript)
+        assert result[0].text == "alpha beta gamma"
+
+    def test_segments_without_words_are_skipped(self):
+        segments = [
+            _make_segment("", speaker="Host", start=0.0, end=1.0),
+            _make_segment("Hello", speaker="", start=1.0, end=2.0),
+            _make_segment("", speaker="", start=2.0, end=3.0),
+        ]
+        result = chunk_segments(segments, "ep-1", METADATA)
+        assert len(result) == 1
+        assert result[0].start_time == 1.0
+        assert result[0].end_time == 3.0
+        assert result[0].speaker == "Host"
+
+    def test_zero_overlap_carries_no_words(self):
+        seg1 = _make_segment(" ".join(["alpha"] * 300), start=0.0, end=30.0)
+        seg2 = _make_segment(" ".join(["beta"] * 300), start=30.0, end=60.0)
+        result = chunk_segments([seg1, seg2], "ep-1", METADATA, chunk_size=500, overlap=0)
+        assert result[1].text.split() == ["beta"] * 300
+
+
+class TestContentDefinedChunks:
+    @staticmethod
+    def _segments(count: int, seed: int = 0) -> list[ParsedCue]:
+        import random
+
+        rng = random.Random(seed)
+        return [
+            _make_segment(" ".join(f"w{rng.randrange(500)}" for _ in range(rng.randint(5, 40))) + ".", start=i, end=i + 1)
+            for i in range(count)
+        ]
+
+    def test_chunks_within_size(self):
+        segments = self._segments(300)
+        chunks = chunk_segments(segments, "ep-1", METADATA, chunk_size=200, overlap=20, content_defined=True)
+        assert all(len(c.text.split()) <= 200 + 40 for c in chunks)
+        assert [c.chunk_index for c in chunks] == list(range(len(chunks)))
+
+    def test_covers_all_words(self):
+        segments = self._segments(300)
+        chunks = chunk_segments(segments, "ep-1", METADATA, chunk_size=200, overlap=0, content_defined=True)
+        assert " ".join(c.text for c in chunks) == " ".join(s.text for s in segments)
+
+    def test_early_insertion_changes_few_chunks(self):
+        segments = self._segments(600, seed=3)
+        edited = segments[:5] + [_make_segment("A sentence added near the start.")] + segments[5:]
+
+        before = {c.text for c in chunk_segments(segments, "ep-1", METADATA, content_defined=True)}
+        after = {c.text for c in chunk_segments(edited, "ep-1", METADATA, content_defined=True)}
+        assert len(after - before) <= 3
@@ -1,3 +1,4 @@
+from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 
@@ -98,3 +99,197 @@ class TestSaveMessage:
         await save_message("conv-1", "assistant", "Reply", sources=sources)
         saved = patch_session.add.call_args[0][0]
         assert saved.sources == sources
+
+
+class TestIngestionJobs:
+    @pytest.mark.asyncio
+    async def test_create_job(self, patch_session):
+        from db.crud import create_ingestion_job
+
+        job = await create_ingestion_job("/data/episodes", concurrency=4)
+        assert job.status == "queued"
+        assert job.concurrency == 4
+        patch_session.add.assert_called_once()
+        patch_session.commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_update_job(self, patch_session):
+        from db.crud import update_ingestion_job
+        from db.models import IngestionJob
+
+        job = IngestionJob(id="job-1", directory_path="/data", status="queued")
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = job
+        patch_session.execute.return_value = mock_result
+
+        assert await update_ingestion_job("job-1", status="running", files_total=3) is True
+        assert job.status == "running"
+        assert job.files_total == 3
+        patch_session.commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_update_missing_job(self, patch_session):
+        from db.crud import update_ingestion_job
+
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = None
+        patch_session.execute.return_value = mock_result
+
+        assert await update_ingestion_job("nope", status="running") is False
+        patch_session.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_claim_job_takes_lease(self, patch_session):
+        from db.crud import claim_ingestion_job
+        from db.models import IngestionJob
+
+        job = IngestionJob(id="job-1", directory_path="/data", status="queued")
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = job
+        patch_session.execute.side_effect = [_db_now(), mock_result]
+
+        assert await claim_ingestion_job("job-1", "node", 60) is job
+
+        sql = _mysql_sql(patch_session.execute.call_args[0][0])
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "ingestion_jobs.lease_expires_at IS NULL" in sql
+        assert job.status == "running"
+        assert job.lease_owner == "node"
+        assert job.lease_expires_at == datetime(2026, 1, 1, 12, 1)
+
+    @pytest.mark.asyncio
+    async def test_claim_job_held_elsewhere(self, patch_session):
+        from db.crud import claim_ingestion_job
+
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = None
+        patch_session.execute.side_effect = [_db_now(), mock_result]
+
+        assert await claim_ingestion_job("job-1", "node", 60) is None
+
+    @pytest.mark.asyncio
+    async def test_finish_job_requires_lease(self, patch_session):
+        from db.crud import finish_ingestion_job
+
+        patch_session.execute.side_effect = [_db_now(), MagicMock(rowcount=0)]
+        assert await finish_ingestion_job("job-1", "node", status="completed") is None
+        assert "lease_owner = " in _mysql_sql(patch_session.execute.call_args[0][0])
+
+        patch_session.execute.side_effect = [_db_now(), MagicMock(rowcount=1)]
+        assert await finish_ingestion_job("job-1", "node", status="completed") == datetime(2026, 1, 1, 12, 0)
+
+
+def _mysql_sql(statement) -> str:
+    from sqlalchemy.dialects import mysql
+
+    return str(statement.compile(dialect=mysql.dialect()))
+
+
+def _db_now(now=datetime(2026, 1, 1, 12, 0)):
+    result = MagicMock()
+    result.scalar_one.return_value = now
+    return result
+
+
+class TestIngestionTasks:
+    @pytest.mark.asyncio
+    async def test_create_tasks(self, patch_session):
+        from db.crud import create_ingestion_tasks
+
+        batch_id = await create_ingestion_tasks(["/data/a.vtt", "/data/b.zip"], force=True)
+        tasks = patch_session.add_all.call_args[0][0]
+        assert [t.file_path for t in tasks] == ["/data/a.vtt", "/data/b.zip"]
+        assert all(t.batch_id == batch_id and t.status == "pending" and t.force for t in tasks)
+        patch_session.commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_claim_skips_locked_rows(self, patch_session):
+        from db.crud import claim_ingestion_task
+        from db.models import IngestionTask
+
+        task = IngestionTask(id="task-1", status="pending", attempts=0)
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = task
+        patch_session.execute.side_effect = [_db_now(), mock_result]
+
+        claimed = await claim_ingestion_task("node:0", 60, 3)
+
+        assert "utc_timestamp()" in _mysql_sql(patch_session.execute.call_args_list[0][0][0])
+        sql = _mysql_sql(patch_session.execute.call_args[0][0])
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "lease_expires_at <" in sql
+        assert claimed is task
+        assert task.status == "running"
+        assert task.attempts == 1
+        assert task.lease_owner == "node:0"
+        # Lease times come from the database clock, not this node's
+        assert task.heartbeat_at == datetime(2026, 1, 1, 12, 0)
+        assert (task.lease_expires_at - task.heartbeat_at).total_seconds() == 60
+        patch_session.commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_claim_fails_task_out_of_attempts(self, patch_session):
+        from db.crud import claim_ingestion_task
+        from db.models import IngestionTask
+
+        expired = IngestionTask(id="task-1", status="running", attempts=3, lease_owner="dead:0")
+        fresh = IngestionTask(id="task-2", status="pending", attempts=0)
+        results = []
+        for task in (expired, fresh):
+            result = MagicMock()
+            result.scalar_one_or_none.return_value = task
+            results += [_db_now(), result]
+        patch_session.execute.side_effect = results
+
+        claimed = await claim_ingestion_task("node:0", 60, 3)
+
+        assert claimed is fresh
+        assert expired.status == "failed"
+        assert expired.lease_owner is None
+        assert "dead:0" in expired.error
+
+    @pytest.mark.asyncio
+    async def test_claim_nothing_pending(self, patch_session):
+        from db.crud import claim_ingestion_task
+
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = None
+        patch_session.execute.side_effect = [_db_now(), mock_result]
+
+        assert await claim_ingestion_task("node:0", 60, 3) is None
+
+    @pytest.mark.asyncio
+    async def test_renew_requires_owner(self, patch_session):
+        from db.crud import renew_ingestion_task_lease
+
+        patch_session.execute.side_effect = [_db_now(), MagicMock(rowcount=0)]
+        assert await renew_ingestion_task_lease("task-1", "node:0", 60) is False
+
+        sql = _mysql_sql(patch_session.execute.call_args[0][0])
+        assert "lease_owner = " in sql
+        assert "status = " in sql
+        assert patch_session.execute.call_args[0][0].compile().params["lease_expires_at"] == datetime(2026, 1, 1, 12, 1)
+
+        patch_session.execute.side_effect = [_db_now(), MagicMock(rowcount=1)]
+        assert await renew_ingestion_task_lease("task-1", "node:0", 60) is True
+
+    @pytest.mark.asyncio
+    async def test_finish_and_release(self, patch_session):
+        from db.crud import finish_ingestion_task, release_ingestion_task
+
+        patch_session.execute.side_effect = [_db_now(), MagicMock(rowcount=1), MagicMock(rowcount=1)]
+        assert await finish_ingestion_task("task-1", "node:0", "completed", result={"episodes_processed": 1})
+        assert patch_session.execute.call_args[0][0].compile().params["finished_at"] == datetime(2026, 1, 1, 12, 0)
+        assert await release_ingestion_task("task-1", "node:0")
+        sql = _mysql_sql(patch_session.execute.call_args[0][0])
+        assert "attempts=(ingestion_tasks.attempts - " in sql
+
+    @pytest.mark.asyncio
+    async def test_counts(self, patch_session):
+        from db.crud import get_ingestion_task_counts
+
+        mock_result = MagicMock()
+        mock_result.all.return_value = [("pending", 2), ("completed", 5)]
+        patch_session.execute.return_value = mock_result
+
+        assert await get_ingestion_task_counts("batch-1") == {"pending": 2, "completed": 5}
@@ -0,0 +1,148 @@
+from unittest.mock import patch
+import pytest
+
+from ingestion.dedup import NUM_PERM, MySQLSignatureIndex, SignatureIndex, get_dedup_index, minhash, similarity
+
+SPONSOR = (
+    "This episode is brought to you by Acme Payroll. Acme Payroll makes running payroll for your small "
+    "business simple, with automatic tax filings, direct deposit and a dashboard your whole team can use. "
+    "Go to acme payroll dot com slash bliss to get three months free."
+)
+
+
+def _words(seed: int, count: int = 60) -> str:
+    return " ".join(f"word{(seed * 7919 + i * 104729) % 100000}" for i in range(count))
+
+
+class TestMinHash:
+    def test_signature_length_and_stability(self):
+        signature = minhash(SPONSOR)
+        assert len(signature) == NUM_PERM
+        assert minhash(SPONSOR) == signature
+
+    def test_near_duplicates_are_similar(self):
+        edited = SPONSOR.replace("three months free", "three months for free")
+        assert similarity(minhash(SPONSOR), minhash(edited)) >= 0.7
+        assert similarity(minhash(SPONSOR), minhash(SPONSOR.upper())) == 1.0
+
+    def test_unrelated_texts_are_not(self):
+        assert similarity(minhash(_words(1)), minhash(_words(2))) < 0.1
+
+    def test_short_text(self):
+        assert len(minhash("Thanks!")) == NUM_PERM
+        assert len(minhash("")) == NUM_PERM
+
+
+class TestSignatureIndex:
+    def _index(self, tmp_path):
+        return SignatureIndex(str(tmp_path / "nested" / "dedup.sqlite3"), threshold=0.8)
+
+    def test_first_copy_is_canonical(self, tmp_path):
+        index = self._index(tmp_path)
+        assert index.assign("ep1", [minhash(SPONSOR), minhash(_words(1))]) == [None, None]
+        assert index.assign("ep2", [minhash(_words(2)), minhash(SPONSOR)]) == [None, "ep1"]
+        assert index.assign("ep3", [minhash(SPONSOR)]) == ["ep1"]
+
+    def test_same_episode_not_a_duplicate(self, tmp_path):
+        index = self._index(tmp_path)
+        assert index.assign("ep1", [minhash(SPONSOR), minhash(SPONSOR)]) == [None, None]
+
+    def test_reingest_keeps_canonical_copy(self, tmp_path):
+        index = self._index(tmp_path)
+        index.assign("ep1", [minhash(SPONSOR)])
+        index.assign("ep2", [minhash(SPONSOR)])
+        # ep2's flagged copy is not in the buckets, so ep1 stays canonical
+        assert index.assign("ep1", [minhash(SPONSOR)]) == [None]
+        assert index.assign("ep2", [minhash(SPONSOR)]) == ["ep1"]
+
+    def test_remove(self, tmp_path):
+        index = self._index(tmp_path)
+        index.assign("ep1", [minhash(SPONSOR)])
+        index.remove("ep1")
+        assert index.assign("ep2", [minhash(SPONSOR)]) == [None]
+
+    def test_remove_promotes_remaining_copy(self, tmp_path):
+        index = self._index(tmp_path)
+        index.assign("ep1", [minhash(SPONSOR)])
+        index.assign("ep2", [minhash(_words(2)), minhash(SPONSOR)])
+        index.assign("ep3", [minhash(SPONSOR)])
+        index.remove("ep1")
+
+        assert index.release("ep1") == {"ep2": [1]}
+        # ep3 now duplicates ep2's copy, and a new copy does too
+        assert index.release("ep2") == {}
+        assert index.assign("ep3", [minhash(SPONSOR)]) == ["ep2"]
+        assert index.assign("ep4", [minhash(SPONSOR)]) == ["ep2"]
+
+    def test_reingest_without_passage_promotes_copy(self, tmp_path):
+        index = self._index(tmp_path)
+        index.assign("ep1", [minhash(SPONSOR)])
+        index.assign("ep2", [minhash(SPONSOR)])
+
+        index.assign("ep1", [minhash(_words(1))])
+        assert index.release("ep1") == {"ep2": [0]}
+        assert index.assign("ep3", [minhash(SPONSOR)]) == ["ep2"]
+
+    def test_reingest_unchanged_promotes_nothing(self, tmp_path):
+        index = self._index(tmp_path)
+        index.assign("ep1", [minhash(SPONSOR)])
+        index.assign("ep2", [minhash(SPONSOR)])
+
+        index.assign("ep1", [minhash(SPONSOR)])
+        assert index.release("ep1") == {}
+        assert index.assign("ep2", [minhash(SPONSOR)]) == ["ep1"]
+
+    def test_persists_across_instances(self, tmp_path):
+        self._index(tmp_path).assign("ep1", [minhash(SPONSOR)])
+        assert self._index(tmp_path).assign("ep2", [minhash(SPONSOR)]) == ["ep1"]
+
+
+class TestMySQLSignatureIndex:
+    @pytest.fixture
+    def mysql(self):
+        with patch("ingestion.dedup.pymysql.connect") as connect:
+            cursor = connect.return_value.cursor.return_value
+            cursor.fetchone.return_value = (1,)
+            cursor.fetchall.return_value = []
+            yield connect, cursor
+
+    def _queries(self, cursor) -> list[str]:
+        return [c.args[0] for c in cursor.execute.call_args_list]
+
+    def test_writes_hold_the_named_lock(self, mysql):
+        connect, cursor = mysql
+        index = MySQLSignatureIndex(threshold=0.8)
+        cursor.execute.reset_mock()
+
+        index.remove("ep1")
+
+        assert self._queries(cursor) == [
+            "SELECT GET_LOCK(%s, %s)",
+            "START TRANSACTION",
+            "DELETE FROM dedup_signatures WHERE episode_id = %s",
+            "DELETE FROM dedup_buckets WHERE episode_id = %s",
+            "COMMIT",
+        ]
+        assert cursor.execute.call_args_list[0].args[1] == ("dedup_signature_index", 30)
+        connect.return_value.close.assert_called()
+
+    def test_lock_timeout(self, mysql):
+        _, cursor = mysql
+        index = MySQLSignatureIndex(threshold=0.8)
+        cursor.fetchone.return_value = (0,)
+        cursor.execute.reset_mock()
+
+        with pytest.raises(TimeoutError):
+            index.assign("ep1", [minhash(SPONSOR)])
+        assert "START TRANSACTION" not in self._queries(cursor)
+
+    def test_backend_chosen_by_config(self, mysql, tmp_path):
+        with patch("ingestion.dedup._index", None), \
+             patch("ingestion.dedup.Config.DEDUP_MODE", "flag"), \
+             patch("ingestion.dedup.Config.DEDUP_INDEX_BACKEND", "mysql"):
+            assert isinstance(get_dedup_index(), MySQLSignatureIndex)
+        with patch("ingestion.dedup._index", None), \
+             patch("ingestion.dedup.Config.DEDUP_MODE", "flag"), \
+             patch("ingestion.dedup.Config.DEDUP_INDEX_BACKEND", "sqlite"), \
+             patch("ingestion.dedup.Config.DEDUP_INDEX_PATH", str(tmp_path / "dedup.sqlite3")):
+            assert type(get_dedup_index()) is SignatureIndex
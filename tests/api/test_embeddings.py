@@ -0,0 +1,111 @@
+from unittest.mock import patch
+import httpx
+import pytest
+
+from api import embedding_stub
+
+
+@pytest.fixture
+def stub_server(tmp_path):
+    """Route embedding requests to the in-process stub server with a fresh cache."""
+    from ingestion.embeddings import EmbeddingCache
+
+    embedding_stub.requests.clear()
+
+    def client():
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=embedding_stub.app), base_url="http://stub")
+
+    cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite3"), max_bytes=1024 * 1024)
+    with patch("ingestion.embeddings._http_client", client), \
+         patch("ingestion.embeddings.get_embedding_cache", return_value=cache):
+        yield embedding_stub.requests
+
+
+class TestEmbedTexts:
+    @pytest.mark.asyncio
+    async def test_returns_vectors_in_order(self, stub_server):
+        from ingestion.embeddings import embed_texts
+
+        vectors = await embed_texts(["alpha", "beta"])
+        assert len(vectors) == 2
+        assert vectors[0] == pytest.approx(embedding_stub.stub_vector("alpha"))
+        assert vectors[1] == pytest.approx(embedding_stub.stub_vector("beta"))
+
+    @pytest.mark.asyncio
+    async def test_duplicates_embedded_once(self, stub_server):
+        from ingestion.embeddings import embed_texts
+
+        vectors = await embed_texts(["same", "other", "same"])
+        assert stub_server == [["same", "other"]]
+        assert vectors[0] == vectors[2]
+
+    @pytest.mark.asyncio
+    async def test_cached_texts_not_resent(self, stub_server):
+        from ingestion.embeddings import embed_texts
+
+        await embed_texts(["alpha", "beta"])
+        stats = {}
+        await embed_texts(["beta", "gamma"], stats=stats)
+        assert stub_server == [["alpha", "beta"], ["gamma"]]
+        assert stats == {"embedded": 1, "cached": 1}
+
+        await embed_texts(["alpha", "beta", "gamma"])
+        assert len(stub_server) == 2
+
+    @pytest.mark.asyncio
+    async def test_batches_requests(self, stub_server):
+        from config import Config
+        from ingestion.embeddings import embed_texts
+
+        with patch.object(Config, "EMBEDDING_BATCH_SIZE", 2):
+            await embed_texts(["a", "b", "c", "d", "e"])
+        assert [len(batch) for batch in stub_server] == [2, 2, 1]
+
+
+class TestEmbeddingCache:
+    def test_evicts_least_recently_used(self, tmp_path):
+        from ingestion.embeddings import EmbeddingCache
+
+        # Room for two 8-float vectors
+        cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), max_bytes=64)
+        cache.put_many({"a": [0.0] * 8})
+        cache.put_many({"b": [1.0] * 8})
+        cache.get_many(["a"])
+        cache.put_many({"c": [2.0] * 8})
+        assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+
+
+class TestClientSideEmbeddingIngest:
+    @pytest.mark.asyncio
+    @patch("ingestion.pipeline._import_documents")
+    async def test_chunk_docs_carry_vectors(self, mock_import, stub_server):
+        from unittest.mock import MagicMock
+        from config import Config
+        from ingestion.pipeline import _write_chunks
+        from models.schemas import TranscriptChunk
+
+        mock_import.return_value = {"written": 1, "failed": []}
+        chunk = TranscriptChunk(episode_id="ep", text="Hello world.", speaker="Host", start_time=0.0, end_time=1.0, chunk_index=0)
+
+        with patch.object(Config, "EMBEDDING_MODE", "client"):
+            await _write_chunks(MagicMock(), "ep", [chunk], replace=False)
+            await _write_chunks(MagicMock(), "ep", [chunk], replace=False)
+
+        docs = mock_import.call_args[0][2]
+        assert docs[0]["embedding"] == pytest.approx(embedding_stub.stub_vector("Hello world."))
+        # The re-ingest reused the cached vector
+        assert stub_server == [["Hello world."]]
+
+    @pytest.mark.asyncio
+    @patch("ingestion.pipeline._import_documents")
+    async def test_typesense_mode_sends_no_vectors(self, mock_import, stub_server):
+        from unittest.mock import MagicMock
+        from ingestion.pipeline import _write_chunks
+        from models.schemas import TranscriptChunk
+
+        mock_import.return_value = {"written": 1, "failed": []}
+        chunk = TranscriptChunk(episode_id="ep", text="Hello world.", speaker="Host", start_time=0.0, end_time=1.0, chunk_index=0)
+
+        await _write_chunks(MagicMock(), "ep", [chunk], replace=False)
+        assert "embedding" not in mock_import.call_args[0][2][0]
+        assert stub_server == []
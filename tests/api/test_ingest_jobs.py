@@ -0,0 +1,207 @@
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+import pytest
+
+from db.models import IngestionJob
+
+
+def _job(status="running"):
+    return IngestionJob(
+        id="job-1",
+        directory_path="/data/episodes",
+        force=False,
+        concurrency=2,
+        use_cache=True,
+        status=status,
+        created_at=datetime(2026, 1, 1),
+    )
+
+
+@pytest.fixture
+def crud():
+    with patch("ingestion.jobs.claim_ingestion_job", new_callable=AsyncMock) as claim_job, \
+         patch("ingestion.jobs.update_ingestion_job", new_callable=AsyncMock) as update_job, \
+         patch("ingestion.jobs.finish_ingestion_job", new_callable=AsyncMock) as finish_job, \
+         patch("ingestion.jobs.renew_ingestion_job_lease", new_callable=AsyncMock) as renew, \
+         patch("ingestion.jobs.release_ingestion_job", new_callable=AsyncMock) as release:
+        claim_job.return_value = _job()
+        finish_job.return_value = datetime(2026, 1, 1, 1)
+        renew.return_value = True
+        yield claim_job, update_job, finish_job, renew, release
+
+
+class TestRunJob:
+    @pytest.mark.asyncio
+    @patch("ingestion.jobs.ingest_directory", new_callable=AsyncMock)
+    async def test_records_progress(self, mock_ingest_dir, crud):
+        from ingestion.jobs import IngestionJobQueue
+
+        claim_job, update_job, finish_job, _, _ = crud
+
+        async def fake_ingest_dir(directory_path, force, concurrency, use_cache, on_progress):
+            await on_progress({"type": "started", "files_total": 2})
+            await on_progress({"type": "file", "files_total": 2, "result": {
+                "file_path": "/data/episodes/a.vtt", "status": "success", "chunks_created": 4, "error": None,
+            }})
+            await on_progress({"type": "file", "files_total": 2, "result": {
+                "file_path": "/data/episodes/b.vtt", "status": "error", "chunks_created": 0, "error": "RuntimeError: boom",
+            }})
+            return {"status": "partial"}
+
+        mock_ingest_dir.side_effect = fake_ingest_dir
+        queue = IngestionJobQueue()
+        events = queue.subscribe("job-1")
+
+        await queue.run_job("job-1")
+
+        assert claim_job.call_args.args[:2] == ("job-1", queue.node)
+        assert mock_ingest_dir.call_args.kwargs["concurrency"] == 2
+        assert update_job.call_args.kwargs["files_done"] == 2
+        assert finish_job.call_args.args == ("job-1", queue.node)
+        final = finish_job.call_args.kwargs
+        assert final["status"] == "completed"
+        assert final["files_done"] == 2
+        assert final["files_failed"] == 1
+        assert final["chunks_written"] == 4
+        assert final["errors"] == [{"file_path": "/data/episodes/b.vtt", "error": "RuntimeError: boom"}]
+
+        types = [events.get_nowait()["type"] for _ in range(events.qsize())]
+        assert types == ["started", "file", "file", "finished"]
+
+    @pytest.mark.asyncio
+    @patch("ingestion.jobs.ingest_directory", new_callable=AsyncMock)
+    async def test_failure_marks_job_failed(self, mock_ingest_dir, crud):
+        from ingestion.jobs import IngestionJobQueue
+
+        _, _, finish_job, _, _ = crud
+        mock_ingest_dir.side_effect = FileNotFoundError("/data/episodes")
+
+        await IngestionJobQueue().run_job("job-1")
+
+        final = finish_job.call_args.kwargs
+        assert final["status"] == "failed"
+        assert final["errors"][0]["error"].startswith("FileNotFoundError")
+
+    @pytest.mark.asyncio
+    @patch("ingestion.jobs.ingest_directory", new_callable=AsyncMock)
+    async def test_unclaimable_job_not_run(self, mock_ingest_dir, crud):
+        from ingestion.jobs import IngestionJobQueue
+
+        claim_job, _, finish_job, _, _ = crud
+        # Finished, or leased by another node
+        claim_job.return_value = None
+
+        await IngestionJobQueue().run_job("job-1")
+        mock_ingest_dir.assert_not_called()
+        finish_job.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("ingestion.jobs.ingest_directory", new_callable=AsyncMock)
+    async def test_heartbeat_renews_lease(self, mock_ingest_dir, crud):
+        from ingestion.jobs import IngestionJobQueue
+
+        _, _, _, renew, _ = crud
+
+        async def slow_ingest(*args, **kwargs):
+            await asyncio.sleep(0.05)
+
+        mock_ingest_dir.side_effect = slow_ingest
+        queue = IngestionJobQueue()
+        with patch("ingestion.jobs.Config.INGEST_JOB_LEASE_SECONDS", 0.03):
+            await queue.run_job("job-1")
+
+        assert renew.call_count >= 2
+        renew.assert_called_with("job-1", queue.node, 0.03)
+
+    @pytest.mark.asyncio
+    @patch("ingestion.jobs.ingest_directory", new_callable=AsyncMock)
+    async def test_lost_lease_abandons_job(self, mock_ingest_dir, crud):
+        from ingestion.jobs import IngestionJobQueue
+
+        _, _, finish_job, renew, release = crud
+        renew.return_value = False
+        cancelled = asyncio.Event()
+
+        async def slow_ingest(*args, **kwargs):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        mock_ingest_dir.side_effect = slow_ingest
+        with patch("ingestion.jobs.Config.INGEST_JOB_LEASE_SECONDS", 0.03):
+            await asyncio.wait_for(IngestionJobQueue().run_job("job-1"), timeout=1)
+
+        assert cancelled.is_set()
+        finish_job.assert_not_called()
+        release.assert_not_called()
+
+
+class TestWorkers:
+    @pytest.mark.asyncio
+    @patch("ingestion.jobs.get_claimable_ingestion_job_ids", new_callable=AsyncMock)
+    async def test_start_requeues_and_drains(self, mock_unfinished):
+        from ingestion.jobs import IngestionJobQueue
+
+        mock_unfinished.return_value = ["job-old"]
+        queue = IngestionJobQueue()
+        ran = []
+
+        async def fake_run(job_id):
+            ran.append(job_id)
+
+        with patch.object(queue, "run_job", side_effect=fake_run):
+            await queue.start(workers=2)
+            queue.submit("job-new")
+            await asyncio.wait_for(queue._queue.join(), timeout=1)
+            await queue.stop()
+
+        assert ran == ["job-old", "job-new"]
+
+    @pytest.mark.asyncio
+    @patch("ingestion.jobs.get_claimable_ingestion_job_ids", new_callable=AsyncMock)
+    async def test_poll_picks_up_orphaned_jobs_once(self, mock_claimable):
+        from ingestion.jobs import IngestionJobQueue
+
+        mock_claimable.side_effect = [[], ["job-orphan"], ["job-orphan"], ["job-orphan"]]
+        queue = IngestionJobQueue()
+        started = asyncio.Event()
+        ran = []
+
+        async def fake_run(job_id):
+            ran.append(job_id)
+            started.set()
+            await asyncio.sleep(10)
+
+        with patch.object(queue, "run_job", side_effect=fake_run), \
+             patch("ingestion.jobs.Config.INGEST_JOB_POLL_SECONDS", 0.01):
+            await queue.start(workers=2)
+            await asyncio.wait_for(started.wait(), timeout=1)
+            await asyncio.sleep(0.05)
+            await queue.stop()
+
+        # Later polls still list the job until it is claimed, but it only runs once here
+        assert ran == ["job-orphan"]
+
+    @pytest.mark.asyncio
+    @patch("ingestion.jobs.ingest_directory", new_callable=AsyncMock)
+    @patch("ingestion.jobs.get_claimable_ingestion_job_ids", new_callable=AsyncMock)
+    async def test_stop_releases_held_job(self, mock_claimable, mock_ingest_dir, crud):
+        from ingestion.jobs import IngestionJobQueue
+
+        _, _, finish_job, _, release = crud
+        mock_claimable.return_value = ["job-1"]
+
+        async def slow_ingest(*args, **kwargs):
+            await asyncio.sleep(10)
+
+        mock_ingest_dir.side_effect = slow_ingest
+        queue = IngestionJobQueue()
+        await queue.start(workers=1)
+        await asyncio.sleep(0.01)
+        await queue.stop()
+
+        release.assert_called_once_with("job-1", queue.node)
+        finish_job.assert_not_called()
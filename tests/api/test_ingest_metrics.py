@@ -0,0 +1,105 @@
+import time
+from unittest.mock import MagicMock
+
+from ingestion.metrics import IngestMetrics, summarize
+from models.schemas import IngestDirectoryResponse, IngestResponse
+
+
+class TestIngestMetrics:
+    def test_stage_timing_and_counters(self):
+        metrics = IngestMetrics()
+        with metrics.stage("parse"):
+            time.sleep(0.01)
+        metrics.count("parse", artifact_hits=1)
+
+        parse = metrics.to_dict()["parse"]
+        assert parse["seconds"] >= 0.01
+        assert parse["artifact_hits"] == 1
+        assert parse["llm_calls"] == 0
+
+    def test_nested_stage_excluded_from_outer(self):
+        metrics = IngestMetrics()
+        with metrics.stage("write"):
+            time.sleep(0.01)
+            with metrics.stage("embed"):
+                time.sleep(0.05)
+        stages = metrics.to_dict()
+        assert stages["embed"]["seconds"] >= 0.05
+        assert stages["write"]["seconds"] < 0.05
+
+    def test_concurrent_stages_timed_independently(self):
+        import asyncio
+
+        metrics = IngestMetrics()
+
+        async def timed(name):
+            with metrics.stage(name):
+                await asyncio.sleep(0.05)
+
+        async def run():
+            with metrics.stage("parse"):
+                pass
+            await asyncio.gather(timed("metadata"), timed("speakers"))
+
+        asyncio.run(run())
+        stages = metrics.to_dict()
+        assert stages["metadata"]["seconds"] >= 0.05
+        assert stages["speakers"]["seconds"] >= 0.05
+        assert stages["parse"]["seconds"] < 0.05
+
+    def test_records_llm_usage(self):
+        metrics = IngestMetrics()
+        response = MagicMock(usage_metadata={"input_tokens": 120, "output_tokens": 30, "total_tokens": 150})
+        metrics.record_llm_response("metadata", response)
+        metrics.record_llm_response("metadata", MagicMock(usage_metadata=None))
+
+        metadata = metrics.to_dict()["metadata"]
+        assert metadata["llm_calls"] == 2
+        assert metadata["prompt_tokens"] == 120
+        assert metadata["completion_tokens"] == 30
+
+    def test_stages_in_pipeline_order(self):
+        metrics = IngestMetrics()
+        for name in ("write", "hash", "speakers"):
+            metrics.count(name, retries=0)
+        assert list(metrics.to_dict()) == ["hash", "speakers", "write"]
+
+
+class TestSummarize:
+    def test_percentiles_and_totals(self):
+        per_file = [{"speakers": {"seconds": float(s), "llm_calls": 1}} for s in range(1, 21)]
+        per_file[0]["write"] = {"seconds": 0.5, "documents_written": 10}
+
+        summary = summarize(per_file, durations=[8.0] * 20)
+        speakers = summary["stages"]["speakers"]
+        assert speakers["episodes"] == 20
+        assert speakers["p50_seconds"] == 10.0
+        assert speakers["p95_seconds"] == 19.0
+        assert speakers["seconds"] == 210.0
+        assert summary["stages"]["write"]["episodes"] == 1
+        assert summary["totals"]["llm_calls"] == 20
+        assert summary["totals"]["documents_written"] == 10
+        assert summary["totals"]["seconds"] == 160.0
+
+    def test_total_seconds_not_inflated_by_overlapping_stages(self):
+        # Metadata and speakers ran side by side within a 3 second file
+        per_file = [{"metadata": {"seconds": 2.0}, "speakers": {"seconds": 2.5}, "write": {"seconds": 0.5}}]
+        assert summarize(per_file, durations=[3.0])["totals"]["seconds"] == 3.0
+
+    def test_empty(self):
+        assert summarize([]) == {
+            "stages": {},
+            "totals": {"seconds": 0, "llm_calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                       "retries": 0, "repaired_responses": 0, "documents_written": 0},
+        }
+
+    def test_fits_response_models(self):
+        metrics = IngestMetrics()
+        with metrics.stage("speakers"):
+            metrics.count("speakers", heuristic_labeled=3)
+        per_file = metrics.to_dict()
+
+        response = IngestResponse(status="success", episode_id="ep", chunks_created=1, metrics=per_file)
+        assert response.metrics["speakers"].model_dump()["heuristic_labeled"] == 3
+        directory = IngestDirectoryResponse(status="success", episodes_processed=1, metrics=summarize([per_file]))
+        assert directory.metrics.stages["speakers"].episodes == 1
@@ -3,6 +3,7 @@ import pytest
 
 from models.schemas import IngestFileRequest, IngestDirectoryRequest
 import routers.ingest as ingest_module
+from api.test_uploads import CONTENT_TYPE, VTT, multipart_body
 
 
 class TestIngestEndpoint:
@@ -18,7 +19,7 @@ class TestIngestEndpoint:
             request = IngestFileRequest(file_path="/data/episode.vtt")
             response = await ingest_module.ingest(request)
 
-            mock_ingest.assert_called_once_with("/data/episode.vtt", force=False)
+            mock_ingest.assert_called_once_with("/data/episode.vtt", force=False, use_cache=True)
             assert response.status == "ok"
             assert response.episode_id == "ep-1"
             assert response.chunks_created == 25
@@ -34,6 +35,261 @@ class TestIngestEndpoint:
             request = IngestDirectoryRequest(directory_path="/data/episodes/")
             response = await ingest_module.ingest_dir(request)
 
-            mock_ingest_dir.assert_called_once_with("/data/episodes/", force=False)
+            mock_ingest_dir.assert_called_once_with("/data/episodes/", force=False, concurrency=None, use_cache=True)
             assert response.status == "ok"
             assert response.episodes_processed == 5
+
+    @pytest.mark.asyncio
+    async def test_ingest_directory_passes_concurrency(self):
+        with patch.object(ingest_module, "ingest_directory", new_callable=AsyncMock) as mock_ingest_dir:
+            mock_ingest_dir.return_value = {
+                "status": "partial",
+                "episodes_processed": 2,
+                "episodes_failed": 1,
+                "concurrency": 8,
+                "elapsed_seconds": 1.5,
+                "results": [
+                    {"file_path": "/data/a.vtt", "status": "success", "episode_id": "a", "chunks_created": 3, "duration_seconds": 1.2},
+                    {"file_path": "/data/b.vtt", "status": "error", "episode_id": "b", "error": "RuntimeError: boom"},
+                ],
+            }
+
+            request = IngestDirectoryRequest(directory_path="/data/episodes/", concurrency=8)
+            response = await ingest_module.ingest_dir(request)
+
+            mock_ingest_dir.assert_called_once_with("/data/episodes/", force=False, concurrency=8, use_cache=True)
+            assert response.episodes_failed == 1
+            assert response.results[1].error == "RuntimeError: boom"
+
+
+def _job(status="queued"):
+    from datetime import datetime
+    from db.models import IngestionJob
+
+    return IngestionJob(
+        id="job-1",
+        directory_path="/data/episodes/",
+        status=status,
+        files_total=3,
+        files_done=3 if status == "completed" else 0,
+        files_failed=0,
+        chunks_written=0,
+        errors=[],
+        created_at=datetime(2026, 1, 1),
+    )
+
+
+class TestIngestJobEndpoints:
+    @pytest.mark.asyncio
+    async def test_submit_queues_job(self):
+        with patch.object(ingest_module, "create_ingestion_job", new_callable=AsyncMock) as mock_create, \
+             patch.object(ingest_module.job_queue, "submit") as mock_submit:
+            mock_create.return_value = _job()
+
+            request = IngestDirectoryRequest(directory_path="/data/episodes/", concurrency=2)
+            response = await ingest_module.submit_ingest_job(request)
+
+            mock_create.assert_called_once_with("/data/episodes/", force=False, concurrency=2, use_cache=True)
+            mock_submit.assert_called_once_with("job-1")
+            assert response.id == "job-1"
+            assert response.status == "queued"
+
+    @pytest.mark.asyncio
+    async def test_get_missing_job(self):
+        from fastapi import HTTPException
+
+        with patch.object(ingest_module, "get_ingestion_job", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = None
+            with pytest.raises(HTTPException) as exc:
+                await ingest_module.get_ingest_job("nope")
+            assert exc.value.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_events_stream_until_finished(self):
+        with patch.object(ingest_module, "get_ingestion_job", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = _job(status="running")
+            response = await ingest_module.stream_ingest_job_events("job-1")
+
+            ingest_module.job_queue._publish("job-1", {"type": "file", "job_id": "job-1", "files_done": 1})
+            ingest_module.job_queue._publish("job-1", {"type": "finished", "job_id": "job-1", "status": "completed"})
+            body = [chunk async for chunk in response.body_iterator]
+
+        assert body[0].startswith("event: status\n")
+        assert body[1].startswith("event: file\n")
+        assert body[2].startswith("event: finished\n")
+        assert "job-1" not in ingest_module.job_queue._subscribers
+
+    @pytest.mark.asyncio
+    async def test_events_follow_job_running_on_another_node(self):
+        running, progressed, finished = _job(status="running"), _job(status="running"), _job(status="completed")
+        running.files_done, progressed.files_done = 0, 2
+        with patch.object(ingest_module, "get_ingestion_job", new_callable=AsyncMock) as mock_get, \
+             patch.object(ingest_module, "_EVENT_POLL_SECONDS", 0.01):
+            mock_get.side_effect = [running, running, progressed, finished]
+            response = await ingest_module.stream_ingest_job_events("job-1")
+            body = [chunk async for chunk in response.body_iterator]
+
+        assert [chunk.split("\n")[0] for chunk in body] == [
+            "event: status", ": keepalive", "event: status", "event: finished",
+        ]
+        assert '"files_done": 2' in body[2]
+        assert '"status": "completed"' in body[3]
+
+    @pytest.mark.asyncio
+    async def test_events_for_finished_job_close_immediately(self):
+        with patch.object(ingest_module, "get_ingestion_job", new_callable=AsyncMock) as mock_get:
+            mock_get.return_value = _job(status="completed")
+            response = await ingest_module.stream_ingest_job_events("job-1")
+            body = [chunk async for chunk in response.body_iterator]
+
+        assert len(body) == 1
+        assert '"files_done": 3' in body[0]
+
+
+class TestRechunkEndpoint:
+    @pytest.mark.asyncio
+    async def test_rechunk(self):
+        from models.schemas import RechunkRequest
+
+        with patch.object(ingest_module, "rechunk_all", new_callable=AsyncMock) as mock_rechunk:
+            mock_rechunk.return_value = {
+                "status": "success",
+                "episodes_rechunked": 2,
+                "chunks_created": 40,
+                "chunk_size": 300,
+                "overlap": 30,
+            }
+            response = await ingest_module.rechunk(RechunkRequest(chunk_size=300, overlap=30))
+
+            mock_rechunk.assert_called_once_with(chunk_size=300, overlap=30)
+            assert response.episodes_rechunked == 2
+
+    @pytest.mark.asyncio
+    async def test_rechunk_without_store(self):
+        from fastapi import HTTPException
+        from models.schemas import RechunkRequest
+
+        with patch.object(ingest_module, "rechunk_all", new_callable=AsyncMock) as mock_rechunk:
+            mock_rechunk.side_effect = RuntimeError("Rechunking needs the artifact store")
+            with pytest.raises(HTTPException) as exc:
+                await ingest_module.rechunk(RechunkRequest())
+            assert exc.value.status_code == 409
+
+
+def _upload_request(body: bytes, content_type: str, content_length: bool = True):
+    from starlette.requests import Request
+
+    chunks = [body[i:i + 16] for i in range(0, len(body), 16)] or [b""]
+
+    async def receive():
+        chunk = chunks.pop(0)
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    headers = [(b"content-type", content_type.encode())]
+    if content_length:
+        headers.append((b"content-length", str(len(body)).encode()))
+    return Request({"type": "http", "method": "POST", "path": "/ingest/upload", "headers": headers}, receive)
+
+
+class TestUploadEndpoint:
+    @pytest.mark.asyncio
+    async def test_upload(self):
+
+        async def fake(filename, content_hash, parse, force, use_cache, executor, metrics):
+            return {"status": "success", "episode_id": "ep", "chunks_created": len(await parse())}
+
+        request = _upload_request(multipart_body({"ep.vtt": VTT}), CONTENT_TYPE)
+        with patch("ingestion.pipeline._ingest_content", side_effect=fake):
+            response = await ingest_module.ingest_upload(request, force=True)
+
+        assert [r.file_path for r in response] == ["ep.vtt"]
+        assert response[0].status == "success"
+        assert response[0].chunks_created == 2
+
+    @pytest.mark.asyncio
+    async def test_content_length_over_limit(self):
+        from fastapi import HTTPException
+
+        request = _upload_request(b"x" * 100, "multipart/form-data; boundary=b")
+        with patch.object(ingest_module.Config, "INGEST_UPLOAD_MAX_BYTES", 10):
+            with pytest.raises(HTTPException) as exc:
+                await ingest_module.ingest_upload(request)
+        assert exc.value.status_code == 413
+
+    @pytest.mark.asyncio
+    async def test_streamed_body_over_limit(self):
+        from fastapi import HTTPException
+
+        request = _upload_request(multipart_body({"ep.vtt": VTT * 4}), CONTENT_TYPE, content_length=False)
+        with patch.object(ingest_module.Config, "INGEST_UPLOAD_MAX_BYTES", 100):
+            with pytest.raises(HTTPException) as exc:
+                await ingest_module.ingest_upload(request)
+        assert exc.value.status_code == 413
+
+    @pytest.mark.asyncio
+    async def test_not_multipart(self):
+        from fastapi import HTTPException
+
+        request = _upload_request(b"WEBVTT\n", "text/vtt")
+        with pytest.raises(HTTPException) as exc:
+            await ingest_module.ingest_upload(request)
+        assert exc.value.status_code == 400
+
+
+class TestIngestTaskEndpoints:
+    @pytest.mark.asyncio
+    async def test_submit_expands_directory(self):
+        from models.schemas import IngestTaskBatchRequest
+
+        with patch.object(ingest_module, "create_ingestion_tasks", new_callable=AsyncMock) as mock_create, \
+             patch.object(ingest_module, "list_transcripts", return_value=["/data/b.vtt", "/data/c.zip"]):
+            mock_create.return_value = "batch-1"
+
+            request = IngestTaskBatchRequest(file_paths=["/data/a.vtt"], directory_path="/data", force=True)
+            response = await ingest_module.submit_ingest_tasks(request)
+
+            mock_create.assert_called_once_with(
+                ["/data/a.vtt", "/data/b.vtt", "/data/c.zip"], force=True, use_cache=True,
+            )
+            assert response.batch_id == "batch-1"
+            assert response.tasks_total == 3
+            assert response.pending == 3
+
+    @pytest.mark.asyncio
+    async def test_submit_nothing(self):
+        from fastapi import HTTPException
+        from models.schemas import IngestTaskBatchRequest
+
+        with pytest.raises(HTTPException) as exc:
+            await ingest_module.submit_ingest_tasks(IngestTaskBatchRequest())
+        assert exc.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_batch_status(self):
+        from db.models import IngestionTask
+
+        failed = IngestionTask(file_path="/data/b.vtt", status="failed", error="RuntimeError: boom")
+        with patch.object(ingest_module, "get_ingestion_task_counts", new_callable=AsyncMock) as mock_counts, \
+             patch.object(ingest_module, "get_failed_ingestion_tasks", new_callable=AsyncMock) as mock_failed:
+            mock_counts.return_value = {"completed": 4, "running": 1, "failed": 1}
+            mock_failed.return_value = [failed]
+
+            response = await ingest_module.get_ingest_task_batch("batch-1")
+
+            mock_counts.assert_called_once_with("batch-1")
+            assert response.tasks_total == 6
+            assert response.completed == 4
+            assert response.pending == 0
+            assert response.errors[0].file_path == "/data/b.vtt"
+
+    @pytest.mark.asyncio
+    async def test_missing_batch(self):
+        from fastapi import HTTPException
+
+        with patch.object(ingest_module, "get_ingestion_task_counts", new_callable=AsyncMock) as mock_counts, \
+             patch.object(ingest_module, "get_failed_ingestion_tasks", new_callable=AsyncMock) as mock_failed:
+            mock_counts.return_value = {}
+            mock_failed.return_value = []
+            with pytest.raises(HTTPException) as exc:
+                await ingest_module.get_ingest_task_batch("nope")
+        assert exc.value.status_code == 404
@@ -0,0 +1,171 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+import pytest
+
+from db.models import IngestionTask
+
+
+def _task():
+    return IngestionTask(
+        id="task-1", batch_id="batch-1", file_path="/data/episodes/a.vtt",
+        force=False, use_cache=True, status="running", attempts=1,
+    )
+
+
+def _ingest_result(error=None):
+    return {
+        "status": "partial" if error else "success",
+        "episodes_processed": 1,
+        "episodes_failed": 1 if error else 0,
+        "elapsed_seconds": 0.5,
+        "results": [{
+            "file_path": "/data/episodes/a.vtt", "status": "error" if error else "success",
+            "episode_id": "a", "chunks_created": 0 if error else 4, "error": error,
+        }],
+    }
+
+
+@pytest.fixture
+def crud():
+    with patch("ingestion.tasks.finish_ingestion_task", new_callable=AsyncMock) as finish, \
+         patch("ingestion.tasks.renew_ingestion_task_lease", new_callable=AsyncMock) as renew, \
+         patch("ingestion.tasks.release_ingestion_task", new_callable=AsyncMock) as release:
+        finish.return_value = True
+        renew.return_value = True
+        yield finish, renew, release
+
+
+class TestRunTask:
+    @pytest.mark.asyncio
+    @patch("ingestion.tasks.ingest_files", new_callable=AsyncMock)
+    async def test_records_completion(self, mock_ingest, crud):
+        from ingestion.tasks import IngestionTaskWorkers
+
+        finish, _, _ = crud
+        mock_ingest.return_value = _ingest_result()
+
+        await IngestionTaskWorkers().run_task(_task(), "node:0")
+
+        mock_ingest.assert_called_once_with(["/data/episodes/a.vtt"], force=False, use_cache=True)
+        args, kwargs = finish.call_args
+        assert args == ("task-1", "node:0", "completed")
+        assert kwargs["error"] is None
+        assert kwargs["result"]["files"][0]["chunks_created"] == 4
+
+    @pytest.mark.asyncio
+    @patch("ingestion.tasks.ingest_files", new_callable=AsyncMock)
+    async def test_records_failure(self, mock_ingest, crud):
+        from ingestion.tasks import IngestionTaskWorkers
+
+        finish, _, _ = crud
+        mock_ingest.return_value = _ingest_result(error="RuntimeError: boom")
+
+        await IngestionTaskWorkers().run_task(_task(), "node:0")
+
+        assert finish.call_args.args[2] == "failed"
+        assert finish.call_args.kwargs["error"] == "RuntimeError: boom"
+
+    @pytest.mark.asyncio
+    @patch("ingestion.tasks.ingest_files", new_callable=AsyncMock)
+    async def test_heartbeat_renews_lease(self, mock_ingest, crud):
+        from ingestion.tasks import IngestionTaskWorkers
+
+        _, renew, _ = crud
+
+        async def slow_ingest(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return _ingest_result()
+
+        mock_ingest.side_effect = slow_ingest
+        with patch("ingestion.tasks.Config.INGEST_TASK_LEASE_SECONDS", 0.03):
+            await IngestionTaskWorkers().run_task(_task(), "node:0")
+
+        assert renew.call_count >= 2
+        renew.assert_called_with("task-1", "node:0", 0.03)
+
+    @pytest.mark.asyncio
+    @patch("ingestion.tasks.ingest_files", new_callable=AsyncMock)
+    async def test_lost_lease_abandons_task(self, mock_ingest, crud):
+        from ingestion.tasks import IngestionTaskWorkers
+
+        finish, renew, release = crud
+        renew.return_value = False
+        cancelled = asyncio.Event()
+
+        async def slow_ingest(*args, **kwargs):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        mock_ingest.side_effect = slow_ingest
+        with patch("ingestion.tasks.Config.INGEST_TASK_LEASE_SECONDS", 0.03):
+            await asyncio.wait_for(IngestionTaskWorkers().run_task(_task(), "node:0"), timeout=1)
+
+        assert cancelled.is_set()
+        finish.assert_not_called()
+        release.assert_not_called()
+
+
+class TestWorkers:
+    @pytest.mark.asyncio
+    @patch("ingestion.tasks.ingest_files", new_callable=AsyncMock)
+    @patch("ingestion.tasks.claim_ingestion_task", new_callable=AsyncMock)
+    async def test_claims_until_empty(self, mock_claim, mock_ingest, crud):
+        from ingestion.tasks import IngestionTaskWorkers
+
+        finish, _, _ = crud
+        mock_claim.side_effect = [_task(), None, None, None]
+        mock_ingest.return_value = _ingest_result()
+        workers = IngestionTaskWorkers()
+
+        with patch("ingestion.tasks.Config.INGEST_TASK_POLL_SECONDS", 0.01):
+            await workers.start(1)
+            await asyncio.sleep(0.03)
+            await workers.stop()
+
+        assert mock_claim.call_args_list[0].args[0] == f"{workers.node}:0"
+        finish.assert_called_once()
+
+    @pytest.mark.asyncio
+    @patch("ingestion.tasks.ingest_files", new_callable=AsyncMock)
+    @patch("ingestion.tasks.claim_ingestion_task", new_callable=AsyncMock)
+    async def test_stop_releases_held_task(self, mock_claim, mock_ingest, crud):
+        from ingestion.tasks import IngestionTaskWorkers
+
+        finish, _, release = crud
+        mock_claim.side_effect = [_task()]
+
+        async def slow_ingest(*args, **kwargs):
+            await asyncio.sleep(10)
+
+        mock_ingest.side_effect = slow_ingest
+        workers = IngestionTaskWorkers()
+        await workers.start(1)
+        await asyncio.sleep(0.01)
+        await workers.stop()
+
+        release.assert_called_once_with("task-1", f"{workers.node}:0")
+        finish.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_warns_about_a_local_dedup_index(self, caplog):
+        from ingestion.tasks import IngestionTaskWorkers
+
+        workers = IngestionTaskWorkers()
+        with patch("ingestion.tasks.claim_ingestion_task", new_callable=AsyncMock, return_value=None), \
+             patch("ingestion.tasks.Config.DEDUP_MODE", "flag"), \
+             patch("ingestion.tasks.Config.DEDUP_INDEX_BACKEND", "sqlite"):
+            await workers.start(1)
+            await workers.stop()
+        assert "DEDUP_INDEX_BACKEND=mysql" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_zero_workers(self):
+        from ingestion.tasks import IngestionTaskWorkers
+
+        workers = IngestionTaskWorkers()
+        await workers.start(0)
+        assert workers._workers == []
+        await workers.stop()
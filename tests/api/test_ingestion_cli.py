@@ -0,0 +1,116 @@
+import os
+from unittest.mock import AsyncMock, patch
+import pytest
+
+from ingestion.metrics import summarize
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "season1").mkdir()
+    (tmp_path / "season1" / "deep").mkdir()
+    (tmp_path / "a.vtt").write_text("WEBVTT\n")
+    (tmp_path / "season1" / "b.vtt").write_text("WEBVTT\n")
+    (tmp_path / "season1" / "deep" / "c.vtt").write_text("WEBVTT\n")
+    (tmp_path / "season1" / "notes.txt").write_text("notes")
+    return tmp_path
+
+
+class TestScanFiles:
+    def test_recursive(self, tree):
+        from ingestion.cli import scan_files
+
+        found = scan_files([str(tree)])
+        assert [os.path.relpath(f, tree) for f in found] == ["a.vtt", "season1/b.vtt", "season1/deep/c.vtt"]
+
+    def test_glob(self, tree):
+        from ingestion.cli import scan_files
+
+        assert [os.path.basename(f) for f in scan_files([str(tree)], "*.txt")] == ["notes.txt"]
+
+    def test_file_arguments(self, tree):
+        from ingestion.cli import scan_files
+
+        assert scan_files([str(tree / "a.vtt"), str(tree / "season1" / "notes.txt")]) == [str(tree / "a.vtt")]
+
+    def test_symlinked_directories_not_followed(self, tree, tmp_path_factory):
+        from ingestion.cli import scan_files
+
+        other = tmp_path_factory.mktemp("other")
+        (other / "x.vtt").write_text("WEBVTT\n")
+        os.symlink(other, tree / "link")
+        assert all("x.vtt" not in f for f in scan_files([str(tree)]))
+
+    def test_archives_included(self, tree):
+        from ingestion.cli import scan_files
+
+        (tree / "season1" / "batch.tar.zst").write_bytes(b"")
+        (tree / "batch.zip").write_bytes(b"")
+        found = [os.path.relpath(f, tree) for f in scan_files([str(tree)])]
+        assert found == ["a.vtt", "batch.zip", "season1/b.vtt", "season1/batch.tar.zst", "season1/deep/c.vtt"]
+
+
+class TestIngestCommand:
+    @patch("ingestion.cli.ingest_files", new_callable=AsyncMock)
+    def test_ingest_uses_process_pool(self, mock_ingest, tree, capsys):
+        from concurrent.futures import ProcessPoolExecutor
+        from ingestion.cli import main
+
+        mock_ingest.return_value = {
+            "status": "success", "episodes_processed": 3, "episodes_failed": 0,
+            "concurrency": 2, "elapsed_seconds": 1.0, "metrics": summarize([]), "results": [],
+        }
+        assert main(["ingest", str(tree), "--concurrency", "2", "--workers", "1"]) == 0
+
+        args, kwargs = mock_ingest.call_args
+        assert len(args[0]) == 3
+        assert kwargs["concurrency"] == 2
+        assert isinstance(kwargs["executor"], ProcessPoolExecutor)
+        out = capsys.readouterr().out
+        assert "3 files, 0 failed" in out
+        assert "0 LLM calls" in out
+
+    @patch("ingestion.cli.ingest_files", new_callable=AsyncMock)
+    def test_failures_set_exit_code(self, mock_ingest, tree):
+        from ingestion.cli import main
+
+        mock_ingest.return_value = {
+            "status": "partial", "episodes_processed": 3, "episodes_failed": 1,
+            "concurrency": 4, "elapsed_seconds": 1.0, "metrics": summarize([]), "results": [],
+        }
+        assert main(["ingest", str(tree), "--workers", "1"]) == 1
+
+    @patch("ingestion.cli.ingest_files", new_callable=AsyncMock)
+    @patch("ingestion.cli.plan_file", new_callable=AsyncMock)
+    def test_dry_run_ingests_nothing(self, mock_plan, mock_ingest, tree, capsys):
+        from ingestion.cli import main
+
+        mock_plan.side_effect = lambda file_path, force=False: {
+            "file_path": file_path,
+            "episode_id": "x",
+            "action": "skipped" if file_path.endswith("a.vtt") else "ingest",
+        }
+        assert main(["ingest", str(tree), "--dry-run"]) == 0
+        mock_ingest.assert_not_called()
+        assert "3 files, 2 to ingest" in capsys.readouterr().out
+
+    @patch("ingestion.cli.ingest_files", new_callable=AsyncMock)
+    def test_archives_passed_with_member_pattern(self, mock_ingest, tree):
+        from ingestion.cli import main
+
+        (tree / "batch.tar.gz").write_bytes(b"")
+        mock_ingest.return_value = {
+            "status": "success", "episodes_processed": 3, "episodes_failed": 0,
+            "concurrency": 2, "elapsed_seconds": 1.0, "metrics": summarize([]), "results": [],
+        }
+        assert main(["ingest", str(tree), "--workers", "1", "--glob", "*.vtt"]) == 0
+
+        args, kwargs = mock_ingest.call_args
+        assert args[0][-1] == str(tree / "batch.tar.gz")
+        assert len(args[0]) == 4
+        assert kwargs["member_pattern"] == "*.vtt"
+
+    def test_no_matching_files(self, tmp_path, capsys):
+        from ingestion.cli import main
+
+        assert main(["ingest", str(tmp_path)]) == 1
@@ -0,0 +1,47 @@
+import json
+import pytest
+
+from ingestion.json_repair import parse_lenient
+
+
+class TestParseLenient:
+    def test_valid_json_not_repaired(self):
+        assert parse_lenient('{"a": 1}') == ({"a": 1}, False)
+
+    def test_markdown_fences_not_repaired(self):
+        assert parse_lenient('```json\n[1, 2]\n```') == ([1, 2], False)
+
+    def test_surrounding_text(self):
+        assert parse_lenient('Here you go:\n{"a": [1, 2]}\nHope that helps!') == ({"a": [1, 2]}, True)
+
+    def test_trailing_commas(self):
+        assert parse_lenient('{"a": [1, 2,], "b": 3,}') == ({"a": [1, 2], "b": 3}, True)
+
+    def test_truncated_array_keeps_complete_elements(self):
+        content = '{"labels": [{"index": 0, "speaker": "A"}, {"index": 1, "speaker": "B"}, {"index": 2, "spe'
+        data, repaired = parse_lenient(content)
+        assert repaired
+        assert data["labels"][:2] == [{"index": 0, "speaker": "A"}, {"index": 1, "speaker": "B"}]
+        assert all("speaker" not in label for label in data["labels"][2:])
+
+    def test_truncated_inside_string(self):
+        data, repaired = parse_lenient('{"title": "Episode", "summary": "An unfinished sent')
+        assert data == {"title": "Episode"}
+        assert repaired
+
+    def test_dangling_key(self):
+        assert parse_lenient('{"title": "Episode", "summary":') == ({"title": "Episode"}, True)
+
+    def test_brackets_inside_strings(self):
+        content = '[{"text": "a ] and a } inside", "n": 1}, {"text": "[cut'
+        data, _ = parse_lenient(content)
+        assert data[0] == {"text": "a ] and a } inside", "n": 1}
+
+    def test_truncated_before_first_element(self):
+        assert parse_lenient('[{"index": 0, "speak') == ([{"index": 0}], True)
+        assert parse_lenient('{"') == ({}, True)
+
+    @pytest.mark.parametrize("content", ["not valid json", "", "null, maybe"])
+    def test_unrecoverable(self, content):
+        with pytest.raises(json.JSONDecodeError):
+            parse_lenient(content)
@@ -0,0 +1,84 @@
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+import pytest
+
+from ingestion.llm_cache import LLMCache
+from models.schemas import ParsedCue
+
+
+class TestLLMCache:
+    def test_miss_then_hit(self, tmp_path):
+        cache = LLMCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024)
+        assert cache.get("gpt", "prompt") is None
+        cache.put("gpt", "prompt", "response")
+        assert cache.get("gpt", "prompt") == "response"
+
+    def test_keyed_by_model(self, tmp_path):
+        cache = LLMCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024)
+        cache.put("model-a", "prompt", "from a")
+        assert cache.get("model-b", "prompt") is None
+
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "nested" / "cache.sqlite3")
+        LLMCache(path, max_bytes=1024).put("gpt", "prompt", "response")
+        assert LLMCache(path, max_bytes=1024).get("gpt", "prompt") == "response"
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = LLMCache(str(tmp_path / "cache.sqlite3"), max_bytes=20)
+        cache.put("gpt", "first", "a" * 10)
+        cache.put("gpt", "second", "b" * 10)
+        cache.get("gpt", "first")  # touch so "second" becomes least recent
+        cache.put("gpt", "third", "c" * 10)
+
+        assert cache.get("gpt", "first") == "a" * 10
+        assert cache.get("gpt", "second") is None
+        assert cache.get("gpt", "third") == "c" * 10
+
+
+@pytest.fixture
+def enabled_cache(tmp_path):
+    cache = LLMCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024 * 1024)
+    with patch("ingestion.llm_cache.get_llm_cache", return_value=cache):
+        yield cache
+
+
+class TestCachedIngestionPrompts:
+    @pytest.mark.asyncio
+    @patch("ingestion.speaker_detector.get_llm")
+    async def test_speaker_batches_served_from_cache(self, mock_get_llm, enabled_cache):
+        from ingestion.speaker_detector import detect_speakers
+
+        segments = [ParsedCue(start_time=0.0, end_time=1.0, text="Thanks for having me.")]
+        response = MagicMock()
+        response.content = json.dumps([{"index": 0, "speaker": "Jane Doe"}])
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.return_value = response
+        mock_get_llm.return_value = mock_llm
+
+        first = await detect_speakers(segments, "Jane Doe")
+        second = await detect_speakers(segments, "Jane Doe")
+        assert first[0].speaker == second[0].speaker == "Jane Doe"
+        assert mock_llm.ainvoke.call_count == 1
+
+        await detect_speakers(segments, "Jane Doe", use_cache=False)
+        assert mock_llm.ainvoke.call_count == 2
+
+    @pytest.mark.asyncio
+    @patch("ingestion.metadata_extractor.get_llm")
+    async def test_unparseable_metadata_not_cached(self, mock_get_llm, enabled_cache):
+        from ingestion.metadata_extractor import extract_metadata
+
+        segments = [ParsedCue(start_time=0.0, end_time=1.0, text="Hello there.")]
+        bad = MagicMock()
+        bad.content = "not json"
+        good = MagicMock()
+        good.content = json.dumps({"title": "Cached Title"})
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.side_effect = [bad, good]
+        mock_get_llm.return_value = mock_llm
+
+        await extract_metadata("Episode.vtt", segments)
+        result = await extract_metadata("Episode.vtt", segments)
+        cached = await extract_metadata("Episode.vtt", segments)
+        assert result.title == cached.title == "Cached Title"
+        assert mock_llm.ainvoke.call_count == 2
@@ -0,0 +1,185 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+import httpx
+import openai
+import pytest
+
+from agents.utils.llm_scheduler import BATCH, INTERACTIVE, LLMScheduler
+
+
+def _rate_limit_error(retry_after: str | None = None) -> openai.RateLimitError:
+    headers = {"retry-after": retry_after} if retry_after else {}
+    response = httpx.Response(429, headers=headers, request=httpx.Request("POST", "https://api.openai.com/v1/chat"))
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestBudgets:
+    @pytest.mark.asyncio
+    async def test_admits_within_budget(self):
+        scheduler = LLMScheduler(rpm=60, tpm=10_000)
+        for _ in range(5):
+            await asyncio.wait_for(scheduler.acquire(INTERACTIVE, 100), 1)
+        stats = scheduler.stats()
+        assert stats["requests"] == 5
+        assert stats["tokens"] == 500
+        assert stats["queue_depth"] == {INTERACTIVE: 0, BATCH: 0}
+
+    def test_delay_until_refill(self):
+        clock = FakeClock()
+        scheduler = LLMScheduler(rpm=0, tpm=6000, clock=clock)
+        scheduler._tokens.take(6000)
+        # 6000 tokens/minute refill at 100/s
+        assert scheduler._tokens.delay(500, clock(), 1.0) == pytest.approx(5.0)
+        clock.now += 5
+        assert scheduler._tokens.delay(500, clock(), 1.0) == 0
+
+    def test_batch_leaves_interactive_reserve(self):
+        clock = FakeClock()
+        scheduler = LLMScheduler(rpm=0, tpm=1000, interactive_reserve=0.2, clock=clock)
+        scheduler._tokens.take(750)
+        assert scheduler._tokens.delay(100, clock(), 1.0) == 0
+        assert scheduler._tokens.delay(100, clock(), 1.0, reserve=0.2) > 0
+
+    def test_oversized_request_waits_for_full_bucket(self):
+        clock = FakeClock()
+        scheduler = LLMScheduler(rpm=0, tpm=1000, clock=clock)
+        assert scheduler._tokens.delay(5000, clock(), 1.0) == 0
+
+    def test_usage_reconciled(self):
+        scheduler = LLMScheduler(rpm=0, tpm=1000, clock=FakeClock())
+        scheduler._tokens.take(100)
+        scheduler.record_usage(estimated=100, actual=400)
+        assert scheduler._tokens.level == pytest.approx(600)
+
+
+class TestPriority:
+    @pytest.mark.asyncio
+    async def test_interactive_jumps_batch_queue(self):
+        # 600 requests/minute refill one request every 0.1s
+        scheduler = LLMScheduler(rpm=600, tpm=0)
+        scheduler._requests.take(600)
+        order = []
+
+        async def call(name, priority):
+            await scheduler.acquire(priority, 1)
+            order.append(name)
+
+        batch = [asyncio.create_task(call(f"batch{i}", BATCH)) for i in range(2)]
+        await asyncio.sleep(0.01)
+        assert scheduler.stats()["queue_depth"] == {INTERACTIVE: 0, BATCH: 2}
+        chat = asyncio.create_task(call("chat", INTERACTIVE))
+        await asyncio.wait_for(asyncio.gather(chat, *batch), 2)
+
+        assert order == ["chat", "batch0", "batch1"]
+        assert scheduler.stats()["wait"][BATCH]["samples"] == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        scheduler = LLMScheduler(rpm=600, tpm=0)
+        scheduler._requests.take(600)
+        waiting = asyncio.create_task(scheduler.acquire(BATCH, 1))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert scheduler.stats()["queue_depth"][BATCH] == 0
+        await asyncio.wait_for(scheduler.acquire(INTERACTIVE, 1), 1)
+
+
+class TestRateLimits:
+    @pytest.mark.asyncio
+    async def test_429_backs_off_and_retries(self):
+        scheduler = LLMScheduler(rpm=0, tpm=0)
+        call = AsyncMock(side_effect=[_rate_limit_error("0.05"), "ok"])
+
+        result = await asyncio.wait_for(scheduler.run(BATCH, 10, call), 2)
+
+        assert result == "ok"
+        assert call.await_count == 2
+        stats = scheduler.stats()
+        assert stats["rate_limited"] == 1
+        assert stats["retried"] == 1
+        # Halved by the 429, then partly restored by the success
+        assert stats["rate_factor"] == pytest.approx(0.55)
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self):
+        scheduler = LLMScheduler(rpm=0, tpm=0, max_retries=1)
+        call = AsyncMock(side_effect=_rate_limit_error("0"))
+        with pytest.raises(openai.RateLimitError):
+            await scheduler.run(BATCH, 10, call)
+        assert call.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_other_errors_not_retried(self):
+        scheduler = LLMScheduler(rpm=0, tpm=0)
+        call = AsyncMock(side_effect=ValueError("bad"))
+        with pytest.raises(ValueError):
+            await scheduler.run(INTERACTIVE, 10, call)
+        assert call.await_count == 1
+        assert scheduler.stats()["in_flight"] == 0
+
+    def test_pause_uses_retry_after(self):
+        clock = FakeClock()
+        scheduler = LLMScheduler(rpm=0, tpm=0, clock=clock)
+        scheduler.record_rate_limited(retry_after=3)
+        assert scheduler.stats()["paused_seconds"] == 3
+        clock.now += 3
+        assert scheduler.stats()["paused_seconds"] == 0
+
+
+@patch("agents.utils.llm.Config.OPENAI_API_KEY", "sk-test")
+class TestGetLLM:
+    def test_priority(self):
+        from agents.utils.llm import ScheduledChatOpenAI, get_llm
+
+        llm = get_llm(priority=BATCH)
+        assert isinstance(llm, ScheduledChatOpenAI)
+        assert llm.priority == BATCH
+        assert llm.max_retries == 0
+        assert get_llm().priority == INTERACTIVE
+
+    def test_response_format(self):
+        from agents.utils.llm import get_llm, json_response_format
+
+        schema = {"type": "object", "properties": {}, "required": [], "additionalProperties": False}
+        with patch("agents.utils.llm.Config.LLM_RESPONSE_FORMAT", "json_schema"):
+            response_format = json_response_format("labels", schema)
+        assert response_format == {"type": "json_schema", "json_schema": {"name": "labels", "schema": schema, "strict": True}}
+        assert get_llm(response_format=response_format).model_kwargs == {"response_format": response_format}
+        assert get_llm().model_kwargs == {}
+
+        with patch("agents.utils.llm.Config.LLM_RESPONSE_FORMAT", "json_object"):
+            assert json_response_format("labels", schema) == {"type": "json_object"}
+        with patch("agents.utils.llm.Config.LLM_RESPONSE_FORMAT", "none"):
+            assert json_response_format("labels", schema) is None
+
+    @pytest.mark.asyncio
+    async def test_calls_are_scheduled(self):
+        from langchain_core.outputs import ChatGeneration, ChatResult
+        from langchain_core.messages import AIMessage
+        from langchain_openai import ChatOpenAI
+        from agents.utils.llm import get_llm
+
+        scheduler = LLMScheduler(rpm=0, tpm=0)
+        result = ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content="hi"))],
+            llm_output={"token_usage": {"total_tokens": 42}},
+        )
+        with patch("agents.utils.llm.llm_scheduler", scheduler), \
+                patch.object(ChatOpenAI, "_agenerate", new_callable=AsyncMock, return_value=result):
+            response = await get_llm(priority=BATCH).ainvoke("hello")
+
+        assert response.content == "hi"
+        stats = scheduler.stats()
+        assert stats["requests"] == 1
+        assert stats["tokens"] == 42
+        assert stats["wait"][BATCH]["samples"] == 1
@@ -2,6 +2,7 @@ import json
 from unittest.mock import AsyncMock, patch, MagicMock
 import pytest
 
+from ingestion.metrics import IngestMetrics
 from models.schemas import ParsedCue
 
 
@@ -47,10 +48,93 @@ class TestExtractMetadata:
         mock_llm.ainvoke.return_value = mock_response
         mock_get_llm.return_value = mock_llm
 
-        result = await extract_metadata("My Episode with Guest.vtt", sample_segments)
+        metrics = IngestMetrics()
+        result = await extract_metadata("My Episode with Guest.vtt", sample_segments, metrics=metrics)
         # Should fall back to filename-parsed values
         assert result.title == "My Episode"
         assert result.source_file == "My Episode with Guest.vtt"
+        assert mock_llm.ainvoke.call_count == 3
+        assert metrics.stages["metadata"]["retries"] == 2
+        assert metrics.stages["metadata"]["failed_responses"] == 1
+
+    @pytest.mark.asyncio
+    @patch("ingestion.metadata_extractor.get_llm")
+    async def test_unparseable_response_is_retried(self, mock_get_llm, sample_segments):
+        from ingestion.metadata_extractor import extract_metadata
+
+        bad = MagicMock(content="Sorry, I can't help with that.")
+        good = MagicMock(content=json.dumps({"title": "Second Try", "industry": "Tech"}))
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.side_effect = [bad, good]
+        mock_get_llm.return_value = mock_llm
+
+        result = await extract_metadata("My Episode with Guest.vtt", sample_segments)
+        assert result.title == "Second Try"
+        assert result.guest_names == ["Guest"]
+        assert mock_llm.ainvoke.call_count == 2
+
+    @pytest.mark.asyncio
+    @patch("ingestion.metadata_extractor.get_llm")
+    async def test_truncated_response_retried_then_partially_used(self, mock_get_llm, sample_segments):
+        from config import Config
+        from ingestion.metadata_extractor import extract_metadata
+
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.return_value = MagicMock(
+            content='{"title": "Cut Off", "topic_tags": ["AI", "Sales"], "industry": 7, "summary": "This episode cov'
+        )
+        mock_get_llm.return_value = mock_llm
+
+        metrics = IngestMetrics()
+        result = await extract_metadata("Test.vtt", sample_segments, metrics=metrics)
+        assert result.title == "Cut Off"
+        assert result.topic_tags == ["AI", "Sales"]
+        # Fields with the wrong type fall back to defaults
+        assert result.industry == ""
+        assert result.summary == ""
+        assert mock_llm.ainvoke.call_count == Config.LLM_MAX_RETRIES + 1
+        assert metrics.stages["metadata"]["repaired_responses"] == Config.LLM_MAX_RETRIES + 1
+        assert metrics.stages["metadata"]["failed_responses"] == 1
+
+    @pytest.mark.asyncio
+    @patch("ingestion.metadata_extractor.llm_cache.store", new_callable=AsyncMock)
+    @patch("ingestion.metadata_extractor.get_llm")
+    async def test_repaired_responses_not_cached(self, mock_get_llm, mock_store, sample_segments):
+        from ingestion.metadata_extractor import extract_metadata
+
+        complete = {
+            "title": "Whole", "guest_names": ["Guest"], "host_names": [], "industry": "Tech",
+            "summary": "Done.", "topic_tags": ["AI"],
+        }
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.side_effect = [
+            MagicMock(content='{"title": "Cut Off", "summary": "This episode cov'),
+            # Only the closing brace is lost, so the repair recovers every field
+            MagicMock(content=json.dumps(complete)[:-1]),
+        ]
+        mock_get_llm.return_value = mock_llm
+
+        result = await extract_metadata("Test.vtt", sample_segments)
+        assert result.title == "Whole"
+        assert result.summary == "Done."
+        assert mock_llm.ainvoke.call_count == 2
+        mock_store.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("ingestion.metadata_extractor.Config.LLM_RESPONSE_FORMAT", "json_schema")
+    @patch("ingestion.metadata_extractor.get_llm")
+    async def test_requests_json_schema(self, mock_get_llm, sample_segments):
+        from ingestion.metadata_extractor import METADATA_SCHEMA, extract_metadata
+
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.return_value = MagicMock(content="{}")
+        mock_get_llm.return_value = mock_llm
+
+        await extract_metadata("Test.vtt", sample_segments)
+        response_format = mock_get_llm.call_args.kwargs["response_format"]
+        assert response_format["type"] == "json_schema"
+        assert response_format["json_schema"]["schema"] is METADATA_SCHEMA
+        assert response_format["json_schema"]["strict"] is True
 
     @pytest.mark.asyncio
     @patch("ingestion.metadata_extractor.get_llm")
@@ -1,4 +1,5 @@
-from unittest.mock import AsyncMock, MagicMock, patch
+import json
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 import pytest
 import typesense.exceptions
 
@@ -53,6 +54,11 @@ def sample_chunks():
 
 
 class TestIngestFile:
+    @pytest.fixture(autouse=True)
+    def _content_hash(self):
+        with patch("ingestion.pipeline._file_hash", return_value="hash-new"):
+            yield
+
     @pytest.mark.asyncio
     @patch("ingestion.pipeline._get_typesense_client")
     @patch("ingestion.pipeline.chunk_segments")
@@ -76,6 +82,7 @@ class TestIngestFile:
             typesense.exceptions.ObjectNotFound("Not found")
         )
         chunks_col = MagicMock()
+        chunks_col.documents.import_.return_value = [{"success": True}]
         mock_client = MagicMock()
         mock_client.collections.__getitem__ = lambda self, key: {"episodes": episodes_col, "transcript_chunks": chunks_col}[key]
         mock_ts.return_value = mock_client
@@ -88,13 +95,22 @@ class TestIngestFile:
 
         # Verify pipeline steps called in order
         mock_parse.assert_called_once_with("/data/Test Episode with Jane Doe.vtt")
-        mock_extract.assert_called_once_with("Test Episode with Jane Doe.vtt", sample_segments)
-        mock_detect.assert_called_once_with(sample_segments, "Jane Doe")
+        mock_extract.assert_called_once_with("Test Episode with Jane Doe.vtt", sample_segments, use_cache=True, transcript=ANY, metrics=ANY)
+        mock_detect.assert_called_once_with(sample_segments, "Jane Doe", use_cache=True, metrics=ANY)
         mock_chunk.assert_called_once()
 
-        # Verify Typesense upserts
+        # Verify Typesense writes: episode upsert, chunks via bulk import
         episodes_col.documents.upsert.assert_called_once()
-        chunks_col.documents.upsert.assert_called_once()
+        chunks_col.documents.import_.assert_called_once()
+        imported_docs, import_params = chunks_col.documents.import_.call_args[0]
+        assert [d["id"] for d in imported_docs] == ["test_episode_with_jane_doe_chunk_0"]
+        assert import_params["action"] == "upsert"
+        chunks_col.documents.upsert.assert_not_called()
+
+        metrics = result["metrics"]
+        assert list(metrics) == ["hash", "parse", "metadata", "speakers", "chunk", "write"]
+        assert metrics["write"]["documents_written"] == 1
+        assert all(stage["seconds"] >= 0 for stage in metrics.values())
 
     @pytest.mark.asyncio
     @patch("ingestion.pipeline._get_typesense_client")
@@ -149,7 +165,7 @@ class TestIngestFile:
         mock_ts.return_value = mock_client
 
         await ingest_file("/data/Episode with John Smith.vtt")
-        mock_detect.assert_called_once_with(sample_segments, "John Smith")
+        mock_detect.assert_called_once_with(sample_segments, "John Smith", use_cache=True, metrics=ANY)
 
     @pytest.mark.asyncio
     @patch("ingestion.pipeline._get_typesense_client")
@@ -175,6 +191,178 @@ class TestIngestFile:
         assert result["chunks_created"] == 0
 
 
+def _episode_client(existing_doc=None, duplicate_ids=()):
+    """Typesense client mock with separate episode/chunk collections."""
+    episodes_col = MagicMock()
+    doc_handle = episodes_col.documents.__getitem__.return_value
+    if existing_doc is None:
+        doc_handle.retrieve.side_effect = typesense.exceptions.ObjectNotFound("Not found")
+    else:
+        doc_handle.retrieve.return_value = existing_doc
+    episodes_col.documents.search.return_value = {
+        "hits": [{"document": {"id": doc_id}} for doc_id in duplicate_ids],
+    }
+    chunks_col = MagicMock()
+    chunks_col.documents.import_.return_value = [{"success": True}]
+    chunks_col.documents.delete.return_value = {"num_deleted": 3}
+    client = MagicMock()
+    client.collections.__getitem__ = lambda self, key: {"episodes": episodes_col, "transcript_chunks": chunks_col}[key]
+    return client, episodes_col, chunks_col
+
+
+@patch("ingestion.pipeline._file_hash", return_value="hash-new")
+@patch("ingestion.pipeline._get_typesense_client")
+@patch("ingestion.pipeline.chunk_segments")
+@patch("ingestion.pipeline.detect_speakers", new_callable=AsyncMock)
+@patch("ingestion.pipeline.extract_metadata", new_callable=AsyncMock)
+@patch("ingestion.pipeline.parse_vtt")
+class TestIncrementalIngest:
+    @pytest.mark.asyncio
+    async def test_unchanged_file_skipped(
+        self, mock_parse, mock_extract, mock_detect, mock_chunk, mock_ts, mock_hash,
+    ):
+        from ingestion.pipeline import ingest_file
+
+        client, _, _ = _episode_client(existing_doc={"id": "ep", "content_hash": "hash-new"})
+        mock_ts.return_value = client
+
+        result = await ingest_file("/data/ep.vtt")
+        assert result["status"] == "skipped"
+        mock_parse.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_changed_file_reingested_and_stale_chunks_deleted(
+        self, mock_parse, mock_extract, mock_detect, mock_chunk, mock_ts, mock_hash,
+        sample_segments, labeled_segments, sample_metadata, sample_chunks,
+    ):
+        from ingestion.pipeline import ingest_file
+
+        mock_parse.return_value = sample_segments
+        mock_extract.return_value = sample_metadata
+        mock_detect.return_value = labeled_segments
+        mock_chunk.return_value = sample_chunks
+        client, episodes_col, chunks_col = _episode_client(existing_doc={"id": "ep", "content_hash": "hash-old"})
+        mock_ts.return_value = client
+
+        result = await ingest_file("/data/ep.vtt")
+        assert result["status"] == "success"
+        assert result["chunks_deleted"] == 3
+
+        delete_filter = chunks_col.documents.delete.call_args[0][0]["filter_by"]
+        assert delete_filter == "episode_id:=`ep` && chunk_index:>=1"
+        # Hash is written only after the chunks are in place
+        assert episodes_col.documents.upsert.call_args[0][0]["content_hash"] == ""
+        episodes_col.documents.__getitem__.return_value.update.assert_called_once_with({"content_hash": "hash-new"})
+
+    @pytest.mark.asyncio
+    async def test_new_episode_skips_stale_chunk_delete(
+        self, mock_parse, mock_extract, mock_detect, mock_chunk, mock_ts, mock_hash,
+        sample_segments, labeled_segments, sample_metadata, sample_chunks,
+    ):
+        from ingestion.pipeline import ingest_file
+
+        mock_parse.return_value = sample_segments
+        mock_extract.return_value = sample_metadata
+        mock_detect.return_value = labeled_segments
+        mock_chunk.return_value = sample_chunks
+        client, _, chunks_col = _episode_client()
+        mock_ts.return_value = client
+
+        result = await ingest_file("/data/ep.vtt")
+        assert result["chunks_deleted"] == 0
+        chunks_col.documents.delete.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_duplicate_content_under_other_name(
+        self, mock_parse, mock_extract, mock_detect, mock_chunk, mock_ts, mock_hash,
+    ):
+        from ingestion.pipeline import ingest_file
+
+        client, episodes_col, _ = _episode_client(duplicate_ids=["original_episode"])
+        mock_ts.return_value = client
+
+        result = await ingest_file("/data/copy of episode.vtt")
+        assert result["status"] == "duplicate"
+        assert result["duplicate_of"] == "original_episode"
+        assert episodes_col.documents.search.call_args[0][0]["filter_by"] == "content_hash:=`hash-new`"
+        mock_parse.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_force_reingests_unchanged_file(
+        self, mock_parse, mock_extract, mock_detect, mock_chunk, mock_ts, mock_hash,
+        sample_segments, labeled_segments, sample_metadata, sample_chunks,
+    ):
+        from ingestion.pipeline import ingest_file
+
+        mock_parse.return_value = sample_segments
+        mock_extract.return_value = sample_metadata
+        mock_detect.return_value = labeled_segments
+        mock_chunk.return_value = sample_chunks
+        client, _, _ = _episode_client(existing_doc={"id": "ep", "content_hash": "hash-new"})
+        mock_ts.return_value = client
+
+        result = await ingest_file("/data/ep.vtt", force=True)
+        assert result["status"] == "success"
+        mock_parse.assert_called_once()
+
+
+class TestFileHash:
+    def test_hash_matches_content(self, tmp_path):
+        import hashlib
+        from ingestion.pipeline import _file_hash
+
+        path = tmp_path / "ep.vtt"
+        path.write_bytes(b"WEBVTT\n\n")
+        assert _file_hash(str(path)) == hashlib.sha256(b"WEBVTT\n\n").hexdigest()
+
+
+class TestImportDocuments:
+    def _client(self, documents_mock):
+        client = MagicMock()
+        client.collections.__getitem__.return_value.documents = documents_mock
+        return client
+
+    def test_empty_documents_skip_request(self):
+        from ingestion.pipeline import _import_documents
+
+        documents = MagicMock()
+        result = _import_documents(self._client(documents), "transcript_chunks", [])
+        assert result == {"written": 0, "failed": []}
+        documents.import_.assert_not_called()
+
+    def test_all_succeed(self):
+        from ingestion.pipeline import _import_documents
+
+        documents = MagicMock()
+        documents.import_.return_value = [{"success": True}, {"success": True}]
+        docs = [{"id": "a"}, {"id": "b"}]
+
+        result = _import_documents(self._client(documents), "transcript_chunks", docs)
+        assert result == {"written": 2, "failed": []}
+        assert documents.import_.call_args.kwargs["batch_size"] > 0
+        documents.upsert.assert_not_called()
+
+    def test_rejected_documents_retried_individually(self):
+        from ingestion.pipeline import _import_documents
+
+        documents = MagicMock()
+        documents.import_.return_value = [
+            {"success": True},
+            {"success": False, "error": "timeout embedding"},
+            {"success": False, "error": "bad field"},
+        ]
+        documents.upsert.side_effect = [
+            {"id": "b"},
+            typesense.exceptions.RequestMalformed("bad field"),
+        ]
+        docs = [{"id": "a"}, {"id": "b"}, {"id": "c"}]
+
+        result = _import_documents(self._client(documents), "transcript_chunks", docs)
+        assert result["written"] == 2
+        assert [f["id"] for f in result["failed"]] == ["c"]
+        assert documents.upsert.call_count == 2
+
+
 class TestIngestDirectory:
     @pytest.mark.asyncio
     @patch("ingestion.pipeline.ingest_file", new_callable=AsyncMock)
@@ -189,6 +377,28 @@ class TestIngestDirectory:
         assert result["episodes_processed"] == 3
         assert mock_ingest.call_count == 3
 
+    @pytest.mark.asyncio
+    @patch("ingestion.pipeline.ingest_file", new_callable=AsyncMock)
+    @patch("ingestion.pipeline.os.listdir")
+    async def test_aggregates_metrics(self, mock_listdir, mock_ingest):
+        from ingestion.pipeline import ingest_directory
+
+        mock_listdir.return_value = ["ep1.vtt", "ep2.vtt"]
+        mock_ingest.side_effect = [
+            {"status": "success", "episode_id": "ep1", "chunks_created": 5,
+             "metrics": {"speakers": {"seconds": 1.0, "llm_calls": 2, "prompt_tokens": 300}}},
+            {"status": "success", "episode_id": "ep2", "chunks_created": 5,
+             "metrics": {"speakers": {"seconds": 3.0, "llm_calls": 4, "prompt_tokens": 500}}},
+        ]
+
+        result = await ingest_directory("/data/episodes")
+        speakers = result["metrics"]["stages"]["speakers"]
+        assert speakers["episodes"] == 2
+        assert speakers["llm_calls"] == 6
+        assert speakers["p50_seconds"] == 1.0
+        assert speakers["p95_seconds"] == 3.0
+        assert result["metrics"]["totals"]["prompt_tokens"] == 800
+
     @pytest.mark.asyncio
     @patch("ingestion.pipeline.ingest_file", new_callable=AsyncMock)
     @patch("ingestion.pipeline.os.listdir")
@@ -200,3 +410,521 @@ class TestIngestDirectory:
         result = await ingest_directory("/data/empty")
         assert result["episodes_processed"] == 0
         mock_ingest.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("ingestion.pipeline.ingest_file", new_callable=AsyncMock)
+    @patch("ingestion.pipeline.os.listdir")
+    async def test_reports_progress(self, mock_listdir, mock_ingest):
+        from ingestion.pipeline import ingest_directory
+
+        mock_listdir.return_value = ["ep1.vtt", "ep2.vtt"]
+        mock_ingest.return_value = {"status": "success", "episode_id": "ep", "chunks_created": 5}
+        events = []
+
+        async def on_progress(event):
+            events.append(event)
+
+        await ingest_directory("/data/episodes", on_progress=on_progress)
+        assert events[0] == {"type": "started", "files_total": 2}
+        assert [e["type"] for e in events[1:]] == ["file", "file"]
+        assert {e["result"]["file_path"] for e in events[1:]} == {"/data/episodes/ep1.vtt", "/data/episodes/ep2.vtt"}
+
+    @pytest.mark.asyncio
+    @patch("ingestion.pipeline.ingest_file", new_callable=AsyncMock)
+    @patch("ingestion.pipeline.os.listdir")
+    async def test_concurrency_is_bounded(self, mock_listdir, mock_ingest):
+        import asyncio
+        from ingestion.pipeline import ingest_directory
+
+        mock_listdir.return_value = [f"ep{i}.vtt" for i in range(6)]
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fake_ingest(file_path, force=False, use_cache=True, executor=None):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return {"status": "success", "episode_id": "ep", "chunks_created": 1}
+
+        mock_ingest.side_effect = fake_ingest
+
+        result = await ingest_directory("/data/episodes", concurrency=2)
+        assert result["episodes_processed"] == 6
+        assert result["concurrency"] == 2
+        assert max_in_flight == 2
+
+    @pytest.mark.asyncio
+    @patch("ingestion.pipeline.ingest_file", new_callable=AsyncMock)
+    @patch("ingestion.pipeline.os.listdir")
+    async def test_failure_does_not_stop_batch(self, mock_listdir, mock_ingest):
+        from ingestion.pipeline import ingest_directory
+
+        mock_listdir.return_value = ["bad.vtt", "good.vtt"]
+
+        async def fake_ingest(file_path, force=False, use_cache=True, executor=None):
+            if file_path.endswith("bad.vtt"):
+                raise RuntimeError("LLM unavailable")
+            return {"status": "success", "episode_id": "good", "chunks_created": 4}
+
+        mock_ingest.side_effect = fake_ingest
+
+        result = await ingest_directory("/data/episodes", concurrency=2)
+        assert result["status"] == "partial"
+        assert result["episodes_failed"] == 1
+        by_file = {r["file_path"]: r for r in result["results"]}
+        assert by_file["/data/episodes/bad.vtt"]["status"] == "error"
+        assert by_file["/data/episodes/bad.vtt"]["episode_id"] == "bad"
+        assert "LLM unavailable" in by_file["/data/episodes/bad.vtt"]["error"]
+        assert by_file["/data/episodes/good.vtt"]["chunks_created"] == 4
+        assert all(r["duration_seconds"] >= 0 for r in result["results"])
+        assert result["elapsed_seconds"] >= 0
+
+
+@patch("ingestion.pipeline._file_hash", return_value="hash-new")
+@patch("ingestion.pipeline._get_typesense_client")
+@patch("ingestion.pipeline.detect_speakers", new_callable=AsyncMock)
+@patch("ingestion.pipeline.extract_metadata", new_callable=AsyncMock)
+@patch("ingestion.pipeline.parse_vtt")
+class TestArtifacts:
+    @pytest.fixture(autouse=True)
+    def store(self, tmp_path):
+        from ingestion.artifacts import ArtifactStore
+
+        store = ArtifactStore(str(tmp_path))
+        with patch("ingestion.pipeline.get_artifact_store", return_value=store):
+            yield store
+
+    @pytest.mark.asyncio
+    async def test_resumes_from_stored_stages(
+        self, mock_parse, mock_extract, mock_detect, mock_ts, mock_hash,
+        store, sample_segments, labeled_segments, sample_metadata,
+    ):
+        from ingestion.artifacts import segments_to_json
+        from ingestion.pipeline import ingest_file
+
+        # A previous run finished parsing and metadata before crashing
+        store.save("hash-new", "cues", segments_to_json(sample_segments), "ep", "ep.vtt")
+        store.save("hash-new", "metadata", sample_metadata.model_dump(), "ep", "ep.vtt")
+        mock_detect.return_value = labeled_segments
+        client, _, _ = _episode_client()
+        mock_ts.return_value = client
+
+        result = await ingest_file("/data/ep.vtt")
+        assert result["status"] == "success"
+        mock_parse.assert_not_called()
+        mock_extract.assert_not_called()
+        mock_detect.assert_called_once()
+        assert store.manifest("hash-new")["stages"] == ["cues", "metadata", "labeled"]
+
+    @pytest.mark.asyncio
+    async def test_use_cache_false_recomputes(
+        self, mock_parse, mock_extract, mock_detect, mock_ts, mock_hash,
+        store, sample_segments, labeled_segments, sample_metadata,
+    ):
+        from ingestion.artifacts import segments_to_json
+        from ingestion.pipeline import ingest_file
+
+        store.save("hash-new", "cues", segments_to_json(sample_segments), "ep", "ep.vtt")
+        mock_parse.return_value = sample_segments
+        mock_extract.return_value = sample_metadata
+        mock_detect.return_value = labeled_segments
+        client, _, _ = _episode_client()
+        mock_ts.return_value = client
+
+        await ingest_file("/data/ep.vtt", use_cache=False)
+        mock_parse.assert_called_once()
+        mock_extract.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_rechunk_uses_artifacts_only(
+        self, mock_parse, mock_extract, mock_detect, mock_ts, mock_hash,
+        store, labeled_segments, sample_metadata,
+    ):
+        from ingestion.artifacts import segments_to_json
+        from ingestion.pipeline import rechunk_all
+
+        store.save("hash-new", "metadata", sample_metadata.model_dump(), "ep", "ep.vtt")
+        store.save("hash-new", "labeled", segments_to_json(labeled_segments), "ep", "ep.vtt")
+        store.save("hash-old", "metadata", sample_metadata.model_dump(), "ep_old", "old.vtt")
+        store.save("hash-old", "labeled", segments_to_json(labeled_segments), "ep_old", "old.vtt")
+        client, episodes_col, chunks_col = _episode_client(existing_doc={"id": "ep", "content_hash": "hash-new"})
+        mock_ts.return_value = client
+
+        result = await rechunk_all(chunk_size=3, overlap=0)
+
+        # hash-old no longer matches the indexed content, so only one episode is rebuilt
+        assert result["episodes_rechunked"] == 1
+        assert result["episodes_skipped"] == 1
+        assert result["chunk_size"] == 3
+        docs = chunks_col.documents.import_.call_args[0][0]
+        assert [d["id"] for d in docs] == ["ep_chunk_0", "ep_chunk_1"]
+        assert docs[0]["speaker"] == "Host"
+        chunks_col.documents.delete.assert_called_once()
+        mock_extract.assert_not_called()
+        mock_detect.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_rechunk_requires_store(self, mock_parse, mock_extract, mock_detect, mock_ts, mock_hash):
+        from ingestion.pipeline import rechunk_all
+
+        with patch("ingestion.pipeline.get_artifact_store", return_value=None):
+            with pytest.raises(RuntimeError):
+                await rechunk_all()
+
+
+class TestContentChunkIds:
+    def _chunk(self, text, index=0, speaker="Host"):
+        return TranscriptChunk(episode_id="ep", text=text, speaker=speaker, start_time=float(index), end_time=index + 1.0, chunk_index=index)
+
+    def test_ids_follow_text(self):
+        from ingestion.pipeline import _content_chunk_ids
+
+        a = _content_chunk_ids("ep", [self._chunk("one"), self._chunk("two")])
+        b = _content_chunk_ids("ep", [self._chunk("zero"), self._chunk("one", 1), self._chunk("two", 2)])
+        assert b[1:] == a
+
+    def test_repeated_text_gets_suffix(self):
+        from ingestion.pipeline import _content_chunk_ids
+
+        ids = _content_chunk_ids("ep", [self._chunk("same"), self._chunk("same", 1)])
+        assert ids[1] == ids[0] + "_2"
+
+    @pytest.mark.asyncio
+    async def test_diff_writes_only_changes(self):
+        import json
+        from config import Config
+        from ingestion.pipeline import _content_chunk_ids, _write_chunks
+
+        old = [self._chunk("kept"), self._chunk("moved", 1), self._chunk("removed", 2)]
+        new = [self._chunk("added"), self._chunk("kept", 0), self._chunk("moved", 2)]
+        old_ids = _content_chunk_ids("ep", old)
+        exported = "\n".join(
+            json.dumps({"id": doc_id, **chunk.model_dump(exclude={"text"})})
+            for doc_id, chunk in zip(old_ids, old)
+        )
+        client, _, chunks_col = _episode_client()
+        chunks_col.documents.export.return_value = exported
+        chunks_col.documents.import_.side_effect = lambda docs, *args, **kwargs: [{"success": True}] * len(docs)
+        chunks_col.documents.delete.return_value = {"num_deleted": 1}
+
+        with patch.object(Config, "CHUNK_ID_MODE", "content"):
+            result = await _write_chunks(client, "ep", new, replace=True)
+
+        assert result == {"written": 1, "failed": [], "updated": 1, "unchanged": 1, "skipped": 0, "deleted": 1}
+        (inserted, insert_params), (updated, update_params) = [
+            (c.args[0], c.args[1]) for c in chunks_col.documents.import_.call_args_list
+        ]
+        assert [d["text"] for d in inserted] == ["added"]
+        assert insert_params["action"] == "upsert"
+        assert updated == [{"id": old_ids[1], **new[2].model_dump(exclude={"text"})}]
+        assert update_params["action"] == "update"
+        assert chunks_col.documents.delete.call_args[0][0] == {"filter_by": f"id:[`{old_ids[2]}`]"}
+        assert "include_fields" in chunks_col.documents.export.call_args[0][0]
+
+
+@patch("ingestion.pipeline._file_hash", return_value="hash-new")
+@patch("ingestion.pipeline._get_typesense_client")
+@patch("ingestion.pipeline.chunk_segments", return_value=[])
+@patch("ingestion.pipeline.detect_speakers", new_callable=AsyncMock)
+@patch("ingestion.pipeline.extract_metadata", new_callable=AsyncMock)
+@patch("ingestion.pipeline.parse_vtt")
+class TestSpeculativeSpeakers:
+    @staticmethod
+    def _metadata(guest_names):
+        return EpisodeMetadata(
+            title="Episode", guest_names=guest_names, host_names=["Host"],
+            industry="", topic_tags=[], summary="",
+        )
+
+    @pytest.mark.asyncio
+    async def test_stages_run_concurrently(
+        self, mock_parse, mock_extract, mock_detect, mock_chunk, mock_ts, mock_hash,
+        sample_segments, labeled_segments,
+    ):
+        import asyncio
+        from ingestion.pipeline import ingest_file
+
+        both_started = asyncio.Event()
+        started = []
+
+        async def fake_extract(*args, **kwargs):
+            started.append("metadata")
+            if len(started) == 2:
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), 1)
+            return self._metadata(["Jane Doe"])
+
+        async def fake_detect(*args, **kwargs):
+            started.append("speakers")
+            if len(started) == 2:
+                both_started.set()
+            await asyncio.wait_for(both_started.wait(), 1)
+            return labeled_segments
+
+        mock_parse.return_value = sample_segments
+        mock_extract.side_effect = fake_extract
+        mock_detect.side_effect = fake_detect
+        mock_ts.return_value = _episode_client()[0]
+
+        result = await ingest_file("/data/Episode with jane  doe.vtt")
+
+        assert sorted(started) == ["metadata", "speakers"]
+        mock_detect.assert_called_once_with(sample_segments, "jane  doe", use_cache=True, metrics=ANY)
+        assert "speculation_misses" not in result["metrics"]["speakers"]
+
+    @pytest.mark.asyncio
+    async def test_rerun_when_extracted_guest_differs(
+        self, mock_parse, mock_extract, mock_detect, mock_chunk, mock_ts, mock_hash,
+        sample_segments, labeled_segments,
+    ):
+        from ingestion.pipeline import ingest_file
+
+        mock_parse.return_value = sample_segments
+        mock_extract.return_value = self._metadata(["Dr. Jane Doe-Smith"])
+        mock_detect.return_value = labeled_segments
+        mock_ts.return_value = _episode_client()[0]
+
+        result = await ingest_file("/data/Episode with Jane Doe.vtt")
+
+        assert [c.args[1] for c in mock_detect.call_args_list] == ["Jane Doe", "Dr. Jane Doe-Smith"]
+        assert result["metrics"]["speakers"]["speculation_misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_speculative_labels_not_stored_before_guest_confirmed(
+        self, mock_parse, mock_extract, mock_detect, mock_chunk, mock_ts, mock_hash,
+        tmp_path, sample_segments, labeled_segments,
+    ):
+        from ingestion.artifacts import ArtifactStore
+        from ingestion.pipeline import ingest_file
+
+        store = ArtifactStore(str(tmp_path))
+        mock_parse.return_value = sample_segments
+        mock_extract.return_value = self._metadata(["Dr. Jane Doe-Smith"])
+        # The run dies after labeling for the filename guest, before re-labeling
+        mock_detect.side_effect = [labeled_segments, RuntimeError("killed")]
+        mock_ts.return_value = _episode_client()[0]
+
+        with patch("ingestion.pipeline.get_artifact_store", return_value=store):
+            with pytest.raises(RuntimeError):
+                await ingest_file("/data/Episode with Jane Doe.vtt")
+            assert "labeled" not in store.manifest("hash-new")["stages"]
+
+            mock_detect.side_effect = None
+            mock_detect.return_value = labeled_segments
+            mock_detect.reset_mock()
+            result = await ingest_file("/data/Episode with Jane Doe.vtt")
+
+        assert result["status"] == "success"
+        assert mock_detect.call_args.args[1] == "Dr. Jane Doe-Smith"
+        assert "labeled" in store.manifest("hash-new")["stages"]
+
+    @pytest.mark.asyncio
+    async def test_sequential_without_filename_guest(
+        self, mock_parse, mock_extract, mock_detect, mock_chunk, mock_ts, mock_hash,
+        sample_segments, labeled_segments,
+    ):
+        from ingestion.pipeline import ingest_file
+
+        mock_parse.return_value = sample_segments
+        mock_extract.return_value = self._metadata(["Jane Doe"])
+        mock_detect.return_value = labeled_segments
+        mock_ts.return_value = _episode_client()[0]
+
+        await ingest_file("/data/Episode 12.vtt")
+
+        mock_detect.assert_called_once_with(sample_segments, "Jane Doe", use_cache=True, metrics=ANY)
+
+
+class TestPlanFile:
+    @pytest.mark.asyncio
+    @patch("ingestion.pipeline._file_hash", return_value="hash-new")
+    @patch("ingestion.pipeline._get_typesense_client")
+    async def test_unchanged_file(self, mock_ts, mock_hash):
+        from ingestion.pipeline import plan_file
+
+        client, _, _ = _episode_client(existing_doc={"id": "ep", "content_hash": "hash-new"})
+        mock_ts.return_value = client
+        plan = await plan_file("/data/ep.vtt")
+        assert plan == {"file_path": "/data/ep.vtt", "episode_id": "ep", "action": "skipped"}
+
+    @pytest.mark.asyncio
+    @patch("ingestion.pipeline._file_hash", return_value="hash-new")
+    @patch("ingestion.pipeline._get_typesense_client")
+    async def test_duplicate_file(self, mock_ts, mock_hash):
+        from ingestion.pipeline import plan_file
+
+        client, _, _ = _episode_client(duplicate_ids=["original"])
+        mock_ts.return_value = client
+        plan = await plan_file("/data/copy.vtt")
+        assert plan["action"] == "duplicate"
+        assert plan["duplicate_of"] == "original"
+
+
+class TestRunCpu:
+    @pytest.mark.asyncio
+    async def test_runs_in_executor(self):
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        from ingestion.pipeline import _run_cpu
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            name = await _run_cpu(executor, lambda suffix="": threading.current_thread().name + suffix, suffix="!")
+        assert name != threading.current_thread().name + "!"
+        assert name.endswith("!")
+
+    @pytest.mark.asyncio
+    async def test_inline_without_executor(self):
+        from ingestion.pipeline import _run_cpu
+
+        assert await _run_cpu(None, sum, [1, 2, 3]) == 6
+
+
+class TestRemoveFile:
+    @pytest.mark.asyncio
+    @patch("ingestion.pipeline._get_typesense_client")
+    async def test_deletes_episode_and_chunks(self, mock_ts):
+        from ingestion.pipeline import remove_file
+
+        client = MagicMock()
+        client.collections["transcript_chunks"].documents.delete.return_value = {"num_deleted": 7}
+        mock_ts.return_value = client
+        result = await remove_file("/data/2024-01-01_Jane.vtt")
+
+        assert result["status"] == "deleted"
+        assert result["chunks_deleted"] == 7
+        client.collections["transcript_chunks"].documents.delete.assert_called_once_with(
+            {"filter_by": f"episode_id:=`{result['episode_id']}`"}
+        )
+        client.collections["episodes"].documents[result["episode_id"]].delete.assert_called_once()
+
+    @pytest.mark.asyncio
+    @patch("ingestion.pipeline._get_typesense_client")
+    async def test_not_indexed(self, mock_ts):
+        from ingestion.pipeline import remove_file
+
+        client = MagicMock()
+        client.collections["transcript_chunks"].documents.delete.return_value = {"num_deleted": 0}
+        client.collections["episodes"].documents["ep"].delete.side_effect = typesense.exceptions.ObjectNotFound("gone")
+        mock_ts.return_value = client
+        result = await remove_file("/data/ep.vtt")
+
+        assert result["status"] == "not_found"
+        assert result["chunks_deleted"] == 0
+
+
+class TestBoilerplate:
+    def _chunk(self, text, index=0):
+        return TranscriptChunk(episode_id="ep", text=text, speaker="Host", start_time=float(index), end_time=index + 1.0, chunk_index=index)
+
+    @pytest.mark.asyncio
+    async def test_flags_chunks_seen_in_other_episodes(self, tmp_path):
+        from ingestion.dedup import SignatureIndex
+        from ingestion.metrics import IngestMetrics
+        from ingestion.pipeline import _flag_boilerplate
+
+        sponsor = "This episode is brought to you by Acme Payroll, payroll made simple for small business owners."
+        index = SignatureIndex(str(tmp_path / "dedup.sqlite3"), threshold=0.8)
+        first = [self._chunk(sponsor), self._chunk("Our first guest talks about pricing.", 1)]
+        second = [self._chunk("A different story about hiring.", 0), self._chunk(sponsor, 1)]
+        metrics = IngestMetrics()
+        with patch("ingestion.pipeline.get_dedup_index", return_value=index):
+            await _flag_boilerplate("ep1", first)
+            await _flag_boilerplate("ep2", second, metrics=metrics)
+
+        assert [c.boilerplate for c in first] == [False, False]
+        assert [c.boilerplate for c in second] == [False, True]
+        assert metrics.stages["dedup"]["boilerplate_chunks"] == 1
+
+    @pytest.mark.asyncio
+    async def test_off_leaves_chunks_alone(self):
+        from ingestion.pipeline import _flag_boilerplate
+
+        chunks = [self._chunk("text")]
+        with patch("ingestion.pipeline.get_dedup_index", return_value=None):
+            await _flag_boilerplate("ep", chunks)
+        assert chunks[0].boilerplate is False
+
+    @pytest.mark.asyncio
+    async def test_skip_mode_leaves_out_boilerplate(self):
+        from config import Config
+        from ingestion.pipeline import _write_chunks
+
+        chunks = [self._chunk("kept"), self._chunk("sponsor", 1), self._chunk("also kept", 2)]
+        chunks[1].boilerplate = True
+        client, _, chunks_col = _episode_client()
+        chunks_col.documents.import_.side_effect = lambda docs, *args, **kwargs: [{"success": True}] * len(docs)
+        chunks_col.documents.delete.return_value = {"num_deleted": 1}
+
+        with patch.object(Config, "DEDUP_MODE", "skip"):
+            result = await _write_chunks(client, "ep", chunks, replace=True)
+
+        imported = chunks_col.documents.import_.call_args[0][0]
+        assert [d["id"] for d in imported] == ["ep_chunk_0", "ep_chunk_2"]
+        assert result["skipped"] == 1
+        # Stale chunks are still found by the full chunk count, and a previously written copy is removed
+        deletes = [c.args[0]["filter_by"] for c in chunks_col.documents.delete.call_args_list]
+        assert deletes == ["episode_id:=`ep` && chunk_index:>=3", "id:[`ep_chunk_1`]"]
+
+    @pytest.mark.asyncio
+    async def test_flag_mode_writes_field(self):
+        from ingestion.pipeline import _write_chunks
+
+        chunks = [self._chunk("sponsor")]
+        chunks[0].boilerplate = True
+        client, _, chunks_col = _episode_client()
+        await _write_chunks(client, "ep", chunks, replace=False)
+        assert chunks_col.documents.import_.call_args[0][0][0]["boilerplate"] is True
+
+    @pytest.mark.asyncio
+    @patch("ingestion.pipeline._get_typesense_client")
+    async def test_remove_file_forgets_signatures(self, mock_ts):
+        from ingestion.pipeline import remove_file
+
+        client = MagicMock()
+        client.collections["transcript_chunks"].documents.delete.return_value = {"num_deleted": 1}
+        mock_ts.return_value = client
+        index = MagicMock()
+        index.release.return_value = {}
+        with patch("ingestion.pipeline.get_dedup_index", return_value=index):
+            await remove_file("/data/ep.vtt")
+        index.remove.assert_called_once_with("ep")
+        index.release.assert_called_once_with("ep")
+
+    @pytest.mark.asyncio
+    @patch("ingestion.pipeline._get_typesense_client")
+    async def test_remove_file_unflags_promoted_copy(self, mock_ts, tmp_path):
+        from ingestion.dedup import SignatureIndex
+        from ingestion.pipeline import _flag_boilerplate, remove_file
+
+        sponsor = "This episode is brought to you by Acme Payroll, payroll made simple for small business owners."
+        index = SignatureIndex(str(tmp_path / "dedup.sqlite3"), threshold=0.8)
+        client, _, chunks_col = _episode_client()
+        chunks_col.documents.delete.return_value = {"num_deleted": 1}
+        chunks_col.documents.export.return_value = "\n".join(json.dumps(doc) for doc in [
+            {"id": "ep2_chunk_0", "chunk_index": 0, "boilerplate": False},
+            {"id": "ep2_chunk_1", "chunk_index": 1, "boilerplate": True},
+        ])
+        mock_ts.return_value = client
+        with patch("ingestion.pipeline.get_dedup_index", return_value=index):
+            await _flag_boilerplate("ep1", [self._chunk(sponsor)])
+            await _flag_boilerplate("ep2", [self._chunk("A different story about hiring."), self._chunk(sponsor, 1)])
+            await remove_file("/data/ep1.vtt")
+
+        updates = chunks_col.documents.import_.call_args[0][0]
+        assert updates == [{"id": "ep2_chunk_1", "boilerplate": False}]
+
+    @pytest.mark.asyncio
+    async def test_skip_mode_rebuilds_promoted_episode(self):
+        from config import Config
+        from ingestion.pipeline import _write_promoted
+
+        with patch.object(Config, "DEDUP_MODE", "skip"), \
+             patch("ingestion.pipeline._get_typesense_client"), \
+             patch("ingestion.pipeline.get_artifact_store") as mock_store, \
+             patch("ingestion.pipeline._rechunk_episode", new_callable=AsyncMock) as mock_rechunk:
+            mock_rechunk.return_value = {"written": 2, "updated": 0, "failed": [], "deleted": 0}
+            await _write_promoted({"ep2": [1]})
+
+        assert mock_rechunk.call_args.args[1:4] == (mock_store.return_value, "ep2", None)
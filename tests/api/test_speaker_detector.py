@@ -2,6 +2,7 @@ import json
 from unittest.mock import AsyncMock, patch, MagicMock
 import pytest
 
+from ingestion.metrics import IngestMetrics
 from models.schemas import ParsedCue
 
 
@@ -89,3 +90,309 @@ class TestDetectSpeakers:
         result = await detect_speakers(segments, "Guest", batch_size=2)
         assert len(result) == 5
         assert mock_llm.ainvoke.call_count == 3
+
+    @pytest.mark.asyncio
+    @patch("ingestion.speaker_detector.get_llm")
+    async def test_concurrent_batches_keep_order(self, mock_get_llm):
+        import asyncio
+        import re
+        from ingestion.speaker_detector import detect_speakers
+
+        segments = [
+            ParsedCue(start_time=float(i), end_time=float(i + 1), text=f"Segment {i}")
+            for i in range(10)
+        ]
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fake_ainvoke(prompt):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            first = int(re.search(r"\[0\] \([^)]*\): Segment (\d+)", prompt).group(1))
+            # Later batches finish first to prove reassembly is order-preserving
+            await asyncio.sleep(0.01 * (10 - first))
+            in_flight -= 1
+            response = MagicMock()
+            response.content = json.dumps([
+                {"index": 0, "speaker": f"Speaker {first}"},
+                {"index": 1, "speaker": f"Speaker {first + 1}"},
+            ])
+            return response
+
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.side_effect = fake_ainvoke
+        mock_get_llm.return_value = mock_llm
+
+        result = await detect_speakers(segments, "Guest", batch_size=2, max_concurrency=3)
+        assert [seg.speaker for seg in result] == [f"Speaker {i}" for i in range(10)]
+        assert [seg.text for seg in result] == [seg.text for seg in segments]
+        assert max_in_flight == 3
+
+    @pytest.mark.asyncio
+    @patch("ingestion.speaker_detector.get_llm")
+    async def test_failed_batch_is_retried(self, mock_get_llm, sample_segments):
+        from ingestion.speaker_detector import detect_speakers
+
+        bad = MagicMock()
+        bad.content = "[{\"index\": 0, \"speak"
+        good = MagicMock()
+        good.content = json.dumps([
+            {"index": 0, "speaker": "Steven Sikash"},
+            {"index": 1, "speaker": "Jane Doe"},
+        ])
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.side_effect = [bad, good]
+        mock_get_llm.return_value = mock_llm
+
+        result = await detect_speakers(sample_segments, "Jane Doe")
+        assert [seg.speaker for seg in result] == ["Steven Sikash", "Jane Doe"]
+        assert mock_llm.ainvoke.call_count == 2
+
+    @pytest.mark.asyncio
+    @patch("ingestion.speaker_detector.get_llm")
+    async def test_accepts_labels_object(self, mock_get_llm, sample_segments):
+        from ingestion.speaker_detector import detect_speakers
+
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.return_value = MagicMock(content=json.dumps({"labels": [
+            {"index": 0, "speaker": "Steven Sikash", "confidence": 0.9},
+            {"index": 1, "speaker": "Jane Doe", "confidence": 0.8},
+        ]}))
+        mock_get_llm.return_value = mock_llm
+
+        result = await detect_speakers(sample_segments, "Jane Doe")
+        assert [seg.speaker for seg in result] == ["Steven Sikash", "Jane Doe"]
+        assert mock_get_llm.call_args.kwargs["response_format"]["type"] == "json_schema"
+
+    @pytest.mark.asyncio
+    @patch("ingestion.speaker_detector.get_llm")
+    async def test_truncated_response_retries_only_lost_segments(self, mock_get_llm):
+        from ingestion.speaker_detector import detect_speakers
+
+        segments = [
+            ParsedCue(start_time=float(i), end_time=float(i + 1), text=f"Segment {i}")
+            for i in range(4)
+        ]
+        prompts = []
+
+        async def fake_ainvoke(prompt):
+            prompts.append(prompt)
+            if len(prompts) == 1:
+                # Cut off at the completion limit after two labels
+                content = '{"labels": [{"index": 0, "speaker": "A", "confidence": 1}, ' \
+                          '{"index": 1, "speaker": "B", "confidence": 1}, {"index": 2, "spea'
+            else:
+                content = json.dumps({"labels": [{"index": 0, "speaker": "C"}, {"index": 1, "speaker": "D"}]})
+            return MagicMock(content=content)
+
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.side_effect = fake_ainvoke
+        mock_get_llm.return_value = mock_llm
+
+        metrics = IngestMetrics()
+        result = await detect_speakers(segments, "Guest", metrics=metrics)
+
+        assert [seg.speaker for seg in result] == ["A", "B", "C", "D"]
+        assert len(prompts) == 2
+        retried = prompts[1].split("Transcript segments:")[1]
+        assert "[0] (2.0s - 3.0s): Segment 2" in retried
+        assert "[1] (3.0s - 4.0s): Segment 3" in retried
+        assert "Segment 0" not in retried and "Segment 1" not in retried
+        speakers = metrics.stages["speakers"]
+        assert speakers["repaired_responses"] == 1
+        assert speakers["retries"] == 1
+        assert speakers["segments_retried"] == 2
+
+    @pytest.mark.asyncio
+    @patch("ingestion.speaker_detector.get_llm")
+    async def test_unlabeled_after_retries_are_counted(self, mock_get_llm, sample_segments):
+        from ingestion.speaker_detector import detect_speakers
+
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.return_value = MagicMock(content="I cannot determine the speakers.")
+        mock_get_llm.return_value = mock_llm
+
+        metrics = IngestMetrics()
+        result = await detect_speakers(sample_segments, "Jane Doe", metrics=metrics)
+        assert [seg.speaker for seg in result] == ["", ""]
+        assert mock_llm.ainvoke.call_count == 3
+        assert metrics.stages["speakers"]["segments_unlabeled"] == 2
+
+    @pytest.mark.asyncio
+    @patch("ingestion.speaker_detector.asyncio.sleep", new_callable=AsyncMock)
+    @patch("ingestion.speaker_detector.get_llm")
+    async def test_llm_error_retried_then_raised(self, mock_get_llm, mock_sleep, sample_segments):
+        from ingestion.speaker_detector import detect_speakers
+
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.side_effect = RuntimeError("rate limited")
+        mock_get_llm.return_value = mock_llm
+
+        with pytest.raises(RuntimeError):
+            await detect_speakers(sample_segments, "Jane Doe")
+        assert mock_llm.ainvoke.call_count == 3
+        assert mock_sleep.await_count == 2
+
+
+class TestHeuristicPrepass:
+    @pytest.mark.asyncio
+    @patch("ingestion.speaker_detector.get_llm")
+    async def test_confident_batches_skip_llm(self, mock_get_llm):
+        from ingestion.speaker_detector import detect_speakers
+
+        segments = [
+            ParsedCue(start_time=0.0, end_time=1.0, text="I'm Steven, welcome back."),
+            ParsedCue(start_time=1.0, end_time=2.0, text="Thanks for having me."),
+            ParsedCue(start_time=2.0, end_time=3.0, text="Right."),
+            ParsedCue(start_time=3.0, end_time=4.0, text="Sure."),
+        ]
+        response = MagicMock()
+        response.content = json.dumps([
+            {"index": 0, "speaker": "Steven Sikash"},
+            {"index": 1, "speaker": "Jane Doe"},
+        ])
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.return_value = response
+        mock_get_llm.return_value = mock_llm
+
+        metrics = IngestMetrics()
+        result = await detect_speakers(segments, "Jane Doe", batch_size=2, use_heuristics=True, metrics=metrics)
+
+        assert [seg.speaker for seg in result] == ["Steven Sikash", "Jane Doe", "Steven Sikash", "Jane Doe"]
+        assert mock_llm.ainvoke.call_count == 1
+        # Only the two unmatched segments are sent to the LLM
+        prompt = mock_llm.ainvoke.call_args[0][0]
+        to_label = prompt.split("Transcript segments:")[1]
+        assert "Right." in to_label and "for having me" not in to_label
+        speakers = metrics.stages["speakers"]
+        assert speakers["llm_batches"] == 1
+        assert speakers["llm_batches_skipped"] == 1
+        assert speakers["heuristic_labeled"] == 2
+        assert speakers["llm_calls"] == 1
+
+    @pytest.mark.asyncio
+    @patch("ingestion.speaker_detector.get_llm")
+    async def test_all_confident_makes_no_llm_calls(self, mock_get_llm):
+        from ingestion.speaker_detector import detect_speakers
+
+        segments = [ParsedCue(start_time=0.0, end_time=1.0, text="Thanks for having me.")]
+        result = await detect_speakers(segments, "Jane Doe", use_heuristics=True)
+
+        assert result[0].speaker == "Jane Doe"
+        mock_get_llm.assert_not_called()
+
+
+    @pytest.mark.asyncio
+    @patch("ingestion.speaker_detector.Config.SPEAKER_CONTEXT_SEGMENTS", 0)
+    @patch("ingestion.speaker_detector.get_llm")
+    async def test_labeled_neighbours_and_hints_in_prompt(self, mock_get_llm):
+        from ingestion.speaker_detector import detect_speakers
+
+        segments = [
+            ParsedCue(start_time=0.0, end_time=1.0, text="So how did you start?"),
+            ParsedCue(start_time=1.0, end_time=2.0, text="Thanks for having me."),
+            ParsedCue(start_time=2.0, end_time=3.0, text="Right."),
+        ]
+        response = MagicMock()
+        response.content = json.dumps([
+            {"index": 0, "speaker": "Mike Liske"},
+            {"index": 1, "speaker": "Jane Doe"},
+        ])
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.return_value = response
+        mock_get_llm.return_value = mock_llm
+
+        result = await detect_speakers(segments, "Jane Doe", use_heuristics=True)
+
+        to_label = mock_llm.ainvoke.call_args[0][0].split("Transcript segments:")[1]
+        assert to_label.strip().splitlines()[:3] == [
+            "[0] (0.0s - 1.0s) (likely Steven Sikash): So how did you start?",
+            "[context] (1.0s - 2.0s): Jane Doe: Thanks for having me.",
+            "[1] (2.0s - 3.0s): Right.",
+        ]
+        assert [seg.speaker for seg in result] == ["Mike Liske", "Jane Doe", "Jane Doe"]
+
+
+class TestTokenBudgetPacking:
+    def test_packs_to_budget(self):
+        from ingestion.speaker_detector import _pack_batches
+
+        tokens = [40, 40, 40, 40, 40]
+        assert _pack_batches(list(range(5)), tokens, 100, 50, 0) == [[0, 1], [2, 3], [4]]
+
+    def test_max_segments(self):
+        from ingestion.speaker_detector import _pack_batches
+
+        assert _pack_batches(list(range(5)), [1] * 5, 1000, 2, 0) == [[0, 1], [2, 3], [4]]
+
+    def test_context_counts_toward_budget(self):
+        from ingestion.speaker_detector import _pack_batches
+
+        tokens = [40] * 6
+        # The second batch starts with 2 context segments (80 tokens) already spent
+        assert _pack_batches(list(range(6)), tokens, 120, 50, 2) == [[0, 1, 2], [3], [4], [5]]
+
+    def test_gaps_count_toward_budget(self):
+        from ingestion.speaker_detector import _pack_batches
+
+        # Segments 1 and 2 are shown between 0 and 3 as context
+        assert _pack_batches([0, 3, 4], [40] * 5, 120, 50, 0) == [[0], [3, 4]]
+
+    def test_oversized_segment_alone(self):
+        from ingestion.speaker_detector import _pack_batches
+
+        assert _pack_batches([0, 1, 2], [10, 500, 10], 100, 50, 0) == [[0], [1], [2]]
+
+    @pytest.mark.asyncio
+    @patch("ingestion.speaker_detector.Config.SPEAKER_CONTEXT_SEGMENTS", 1)
+    @patch("ingestion.speaker_detector.get_llm")
+    async def test_context_segments_not_relabeled(self, mock_get_llm):
+        from ingestion.speaker_detector import detect_speakers
+
+        segments = [
+            ParsedCue(start_time=float(i), end_time=float(i + 1), text=f"Segment {i}")
+            for i in range(4)
+        ]
+        prompts = []
+
+        async def fake_ainvoke(prompt):
+            prompts.append(prompt)
+            response = MagicMock()
+            response.content = json.dumps([{"index": i, "speaker": f"Speaker {len(prompts)}"} for i in range(2)])
+            return response
+
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.side_effect = fake_ainvoke
+        mock_get_llm.return_value = mock_llm
+
+        # Batches [0, 1] and [2, 3], the second with segment 1 as context
+        result = await detect_speakers(segments, "Guest", batch_size=2, max_concurrency=1)
+
+        assert len(prompts) == 2
+        assert "Preceding context" not in prompts[0]
+        context, to_label = prompts[1].split("Transcript segments:")
+        assert "[context] (1.0s - 2.0s): Segment 1" in context
+        assert "Segment 1" not in to_label
+        assert [seg.speaker for seg in result] == ["Speaker 1", "Speaker 1", "Speaker 2", "Speaker 2"]
+
+    @pytest.mark.asyncio
+    @patch("ingestion.speaker_detector.Config.SPEAKER_BATCH_TOKENS", 100)
+    @patch("ingestion.speaker_detector.count_tokens", side_effect=lambda texts: [len(t.split()) for t in texts])
+    @patch("ingestion.speaker_detector.get_llm")
+    async def test_long_segments_get_smaller_batches(self, mock_get_llm, mock_count):
+        from ingestion.speaker_detector import detect_speakers
+
+        short = [ParsedCue(start_time=float(i), end_time=float(i + 1), text="Yes.") for i in range(6)]
+        long = [ParsedCue(start_time=float(i), end_time=float(i + 1), text="word " * 60) for i in range(6)]
+        mock_response = MagicMock()
+        mock_response.content = "[]"
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.return_value = mock_response
+        mock_get_llm.return_value = mock_llm
+
+        await detect_speakers(short, "Guest")
+        assert mock_llm.ainvoke.call_count == 1
+        mock_llm.ainvoke.reset_mock()
+        await detect_speakers(long, "Guest")
+        assert mock_llm.ainvoke.call_count == 6
@@ -0,0 +1,67 @@
+from models.schemas import ParsedCue
+
+
+def _cue(text: str) -> ParsedCue:
+    return ParsedCue(start_time=0.0, end_time=1.0, text=text)
+
+
+class TestLabelHeuristically:
+    def test_host_self_intro(self):
+        from ingestion.speaker_heuristics import label_heuristically, SELF_INTRO_CONFIDENCE
+
+        labels = label_heuristically([_cue("Hey everyone, I'm Mike and this is the show.")], "Jane Doe")
+        assert labels == [("Mike Liske", SELF_INTRO_CONFIDENCE)]
+
+    def test_guest_self_intro(self):
+        from ingestion.speaker_heuristics import label_heuristically
+
+        labels = label_heuristically([_cue("My name is Jane and I run a med spa.")], "Jane Doe")
+        assert labels[0][0] == "Jane Doe"
+
+    def test_this_is_only_at_segment_start(self):
+        from ingestion.speaker_heuristics import label_heuristically, SELF_INTRO_CONFIDENCE
+
+        labels = label_heuristically([
+            _cue("This is Steve, and you're listening to the show."),
+            _cue("And this is Mike, he handles our operations."),
+            _cue("It's Mike's favourite part of the business."),
+        ], "Jane Doe")
+        assert labels[0] == ("Steven Sikash", SELF_INTRO_CONFIDENCE)
+        assert labels[1][0] != "Mike Liske"
+        assert labels[2][0] != "Mike Liske"
+
+    def test_guest_thanks(self):
+        from ingestion.speaker_heuristics import label_heuristically, GUEST_THANKS_CONFIDENCE
+
+        labels = label_heuristically([_cue("Thanks so much for having me.")], "Jane Doe")
+        assert labels == [("Jane Doe", GUEST_THANKS_CONFIDENCE)]
+
+    def test_long_answer_is_guest(self):
+        from ingestion.speaker_heuristics import label_heuristically
+
+        labels = label_heuristically([_cue("word " * 80)], "Jane Doe")
+        assert labels[0][0] == "Jane Doe"
+
+    def test_weak_rules_below_default_threshold(self):
+        from config import Config
+        from ingestion.speaker_heuristics import HOST_TURN_CONFIDENCE, MONOLOGUE_CONFIDENCE
+
+        assert MONOLOGUE_CONFIDENCE < Config.SPEAKER_HEURISTIC_THRESHOLD
+        assert HOST_TURN_CONFIDENCE < Config.SPEAKER_HEURISTIC_THRESHOLD
+
+    def test_question_is_low_confidence_host(self):
+        from ingestion.speaker_heuristics import label_heuristically, HOST_NAMES, HOST_TURN_CONFIDENCE
+
+        labels = label_heuristically([_cue("So how did you get started?")], "Jane Doe")
+        assert labels == [(HOST_NAMES[0], HOST_TURN_CONFIDENCE)]
+
+    def test_no_match(self):
+        from ingestion.speaker_heuristics import label_heuristically
+
+        assert label_heuristically([_cue("Right.")], "Jane Doe") == [("", 0.0)]
+
+    def test_no_guest_name(self):
+        from ingestion.speaker_heuristics import label_heuristically
+
+        labels = label_heuristically([_cue("Thanks for having me."), _cue("word " * 80)], "")
+        assert labels == [("", 0.0), ("", 0.0)]
@@ -0,0 +1,19 @@
+from unittest.mock import patch
+
+
+class TestCountTokens:
+    def test_estimates_without_tokenizer(self):
+        from ingestion.tokens import count_tokens
+
+        with patch("ingestion.tokens._encoding", return_value=None):
+            assert count_tokens(["abcd", "abcde", ""]) == [1, 2, 0]
+
+    def test_uses_tokenizer(self):
+        from ingestion.tokens import count_tokens
+
+        class FakeEncoding:
+            def encode_ordinary(self, text):
+                return text.split()
+
+        with patch("ingestion.tokens._encoding", return_value=FakeEncoding()):
+            assert count_tokens(["one two three", "four"]) == [3, 1]
@@ -0,0 +1,33 @@
+from benchmarks.reference import long_transcript, reference_stages, tokenized_stages
+from ingestion.transcript import tokenize
+from ingestion.vtt_parser import Cue
+
+
+def _segments(*texts: str) -> list[Cue]:
+    return [Cue(float(i), float(i + 1), text) for i, text in enumerate(texts)]
+
+
+class TestTokenize:
+    def test_offsets_are_cumulative_word_counts(self):
+        transcript = tokenize(_segments("one two", "", "three four five"))
+        assert transcript.words == ["one", "two", "three", "four", "five"]
+        assert list(transcript.offsets) == [0, 2, 2, 5]
+        assert transcript.word_count == 5
+        assert transcript.segment_count == 3
+
+    def test_text(self):
+        transcript = tokenize(_segments("one two", "three four five"))
+        assert transcript.text(1, 4) == "two three four"
+
+    def test_empty(self):
+        transcript = tokenize([])
+        assert transcript.word_count == 0
+        assert transcript.text(0, 2000) == ""
+
+
+class TestTokenizedStages:
+    def test_five_hour_transcript_matches_reference(self):
+        segments = long_transcript(hours=5)
+        metadata = {"guest_names": ["Guest"], "industry": "Tech", "topic_tags": ["AI"]}
+
+        assert tokenized_stages(segments, metadata) == reference_stages(segments)
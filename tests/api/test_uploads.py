@@ -0,0 +1,113 @@
+from unittest.mock import patch
+import pytest
+
+from ingestion.uploads import iter_uploads
+
+VTT = b"WEBVTT\n\n00:00:00.000 --> 00:00:02.000\nHello there.\n\n00:00:02.500 --> 00:00:04.000\nWelcome back.\n"
+BOUNDARY = "----upload-boundary"
+CONTENT_TYPE = f"multipart/form-data; boundary={BOUNDARY}"
+
+
+def multipart_body(files: dict[str, bytes], fields: dict[str, str] | None = None) -> bytes:
+    parts = []
+    for name, value in (fields or {}).items():
+        parts.append(f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for filename, data in files.items():
+        head = (
+            f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="files"; filename="{filename}"\r\n'
+            f"Content-Type: text/vtt\r\n\r\n"
+        )
+        parts.append(head.encode() + data + b"\r\n")
+    return b"".join(parts) + f"--{BOUNDARY}--\r\n".encode()
+
+
+async def chunked(body: bytes, size: int = 7):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+async def collect(body: bytes, content_type: str = CONTENT_TYPE, size: int = 7) -> list[tuple]:
+    return [item async for item in iter_uploads(chunked(body, size), content_type)]
+
+
+class TestIterUploads:
+    @pytest.mark.asyncio
+    async def test_parses_each_file(self):
+        body = multipart_body(
+            {"Episode One with Jane.vtt": VTT, "two.vtt": VTT.replace(b"Hello", b"Hi")},
+            fields={"note": "ignored"},
+        )
+        items = await collect(body)
+
+        assert [item[0] for item in items] == ["Episode One with Jane.vtt", "two.vtt"]
+        for name, segments, content_hash, seconds, error in items:
+            assert error is None
+            assert len(segments) == 2
+            assert len(content_hash) == 64
+            assert seconds >= 0
+        assert items[0][1][0].text == "Hello there."
+        assert items[0][2] != items[1][2]
+
+    @pytest.mark.asyncio
+    async def test_hash_matches_file_on_disk(self, tmp_path):
+        from ingestion.pipeline import _file_hash
+
+        (tmp_path / "ep.vtt").write_bytes(VTT)
+        [(_, _, content_hash, _, _)] = await collect(multipart_body({"ep.vtt": VTT}), size=4096)
+        assert content_hash == _file_hash(str(tmp_path / "ep.vtt"))
+
+    @pytest.mark.asyncio
+    async def test_client_directories_stripped(self):
+        [item] = await collect(multipart_body({"C:\\transcripts\\ep.vtt": VTT}))
+        assert item[0] == "ep.vtt"
+
+    @pytest.mark.asyncio
+    async def test_bad_files_reported_not_raised(self):
+        items = await collect(multipart_body({"notes.txt": b"hello", "bad.vtt": b"\xff\xfe\xfa", "ok.vtt": VTT}))
+
+        by_name = {item[0]: item for item in items}
+        assert isinstance(by_name["notes.txt"][4], ValueError)
+        assert isinstance(by_name["bad.vtt"][4], UnicodeDecodeError)
+        assert by_name["ok.vtt"][4] is None
+
+    @pytest.mark.asyncio
+    async def test_large_file_streams_through_small_queue(self):
+        cue = b"00:00:00.000 --> 00:00:01.000\nA sentence.\n\n"
+        big = b"WEBVTT\n\n" + cue * 20000
+        [item] = await collect(multipart_body({"big.vtt": big}), size=1024)
+        assert item[4] is None
+        assert len(item[1]) == 20000
+
+    @pytest.mark.asyncio
+    async def test_rejects_other_content_types(self):
+        with pytest.raises(ValueError, match="multipart/form-data"):
+            await collect(VTT, content_type="text/vtt")
+
+    @pytest.mark.asyncio
+    async def test_truncated_body(self):
+        body = multipart_body({"ep.vtt": VTT})
+        with pytest.raises(ValueError, match="middle of a file"):
+            await collect(body[:len(body) // 2])
+
+
+class TestIngestUploads:
+    @pytest.mark.asyncio
+    async def test_results_shaped_like_files(self):
+        from ingestion.pipeline import ingest_uploads
+
+        async def fake(filename, content_hash, parse, force, use_cache, executor, metrics):
+            segments = await parse()
+            return {"status": "success", "episode_id": filename[:-4], "chunks_created": len(segments),
+                    "metrics": metrics.to_dict()}
+
+        body = multipart_body({"a.vtt": VTT, "b.vtt": b"\xff"})
+        with patch("ingestion.pipeline._ingest_content", side_effect=fake):
+            results = await ingest_uploads(iter_uploads(chunked(body), CONTENT_TYPE), concurrency=1)
+
+        by_file = {r["file_path"]: r for r in results}
+        assert by_file["a.vtt"]["status"] == "success"
+        assert by_file["a.vtt"]["chunks_created"] == 2
+        assert "parse" in by_file["a.vtt"]["metrics"]
+        assert by_file["b.vtt"]["status"] == "error"
+        assert by_file["b.vtt"]["episode_id"] == "b"
+        assert "UnicodeDecodeError" in by_file["b.vtt"]["error"]
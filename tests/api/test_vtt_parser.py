@@ -1,7 +1,7 @@
 import tempfile
 import os
 import pytest
-from ingestion.vtt_parser import _time_to_seconds, parse_vtt
+from ingestion.vtt_parser import Cue, _time_to_seconds, iter_merged_cues, parse_vtt
 
 
 class TestTimeToSeconds:
@@ -21,6 +21,9 @@ class TestTimeToSeconds:
         result = _time_to_seconds("00:00:01.250")
         assert abs(result - 1.25) < 0.001
 
+    def test_minutes_only_format(self):
+        assert _time_to_seconds("02:30.500") == 150.5
+
 
 class TestParseVtt:
     def _write_vtt(self, content: str) -> str:
@@ -108,3 +111,53 @@ class TestParseVtt:
         result = parse_vtt(path)
         assert all(r.text.strip() for r in result)
         os.unlink(path)
+
+    def test_identifiers_notes_and_tags(self):
+        vtt = (
+            "\ufeffWEBVTT\n\n"
+            "NOTE produced by the recorder\n\n"
+            "1\n"
+            "00:00:01.000 --> 00:00:02.000 align:start position:10%\n"
+            "<v Steven>Hello</v>\n\n"
+            "2\n"
+            "00:00:02.000 --> 00:00:03.000\n"
+            "<i>world.</i>\n\n"
+        )
+        path = self._write_vtt(vtt)
+        result = parse_vtt(path)
+        assert [(r.start_time, r.end_time, r.text) for r in result] == [(1.0, 3.0, "Hello world.")]
+        os.unlink(path)
+
+    def test_returns_compact_cues(self):
+        path = self._write_vtt("WEBVTT\n\n00:00:01.000 --> 00:00:03.000\nHello world.\n")
+        result = parse_vtt(path)
+        assert isinstance(result[0], Cue)
+        assert result[0].speaker == ""
+        assert not hasattr(result[0], "__dict__")
+        os.unlink(path)
+
+
+class TestIterMergedCues:
+    def test_yields_before_input_is_exhausted(self):
+        consumed = []
+
+        def lines():
+            for line in [
+                "WEBVTT", "",
+                "00:00:01.000 --> 00:00:02.000", "First.", "",
+                "00:00:02.000 --> 00:00:03.000", "Second.", "",
+                "00:00:03.000 --> 00:00:04.000", "Third.", "",
+            ]:
+                consumed.append(line)
+                yield line
+
+        merged = iter_merged_cues(lines())
+        first = next(merged)
+        assert first.text == "First."
+        # Only read as far as the cue that completes the first segment
+        assert "Third." not in consumed
+        assert [c.text for c in merged] == ["Second.", "Third."]
+
+    def test_accepts_lines_with_newlines(self):
+        lines = ["WEBVTT\n", "\n", "00:00:01.000 --> 00:00:02.000\n", "Hi there.\r\n"]
+        assert [c.text for c in iter_merged_cues(lines)] == ["Hi there."]
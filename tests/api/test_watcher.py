@@ -0,0 +1,159 @@
+import asyncio
+import os
+from unittest.mock import AsyncMock, patch
+import pytest
+
+
+async def _wait_for(condition, timeout=5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        if loop.time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.02)
+
+
+@pytest.fixture
+def handled():
+    """Results passed to the watcher's on_result callback, in order."""
+    results = []
+
+    async def on_result(path, result):
+        results.append((os.path.basename(path), result["status"]))
+
+    return results, on_result
+
+
+def _watcher(directory, on_result, **kwargs):
+    from ingestion.watcher import TranscriptWatcher
+
+    return TranscriptWatcher(
+        str(directory),
+        debounce_seconds=kwargs.pop("debounce_seconds", 0.1),
+        force_polling=True,
+        poll_interval=0.05,
+        on_result=on_result,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+class TestTranscriptWatcher:
+    @patch("ingestion.watcher.remove_file", new_callable=AsyncMock)
+    @patch("ingestion.watcher.ingest_file", new_callable=AsyncMock, return_value={"status": "success"})
+    async def test_new_file_ingested(self, mock_ingest, mock_remove, tmp_path, handled):
+        results, on_result = handled
+        (tmp_path / "old.vtt").write_text("WEBVTT\n")
+        stop = asyncio.Event()
+        task = asyncio.create_task(_watcher(tmp_path, on_result).run(stop))
+        await asyncio.sleep(0.1)
+
+        (tmp_path / "new.vtt").write_text("WEBVTT\n")
+        (tmp_path / "notes.txt").write_text("ignored")
+        await _wait_for(lambda: results)
+        stop.set()
+        await task
+
+        assert results == [("new.vtt", "success")]
+        mock_ingest.assert_awaited_once_with(str(tmp_path / "new.vtt"))
+        mock_remove.assert_not_called()
+
+    @patch("ingestion.watcher.remove_file", new_callable=AsyncMock, return_value={"status": "deleted"})
+    @patch("ingestion.watcher.ingest_file", new_callable=AsyncMock)
+    async def test_deleted_file_removed(self, mock_ingest, mock_remove, tmp_path, handled):
+        results, on_result = handled
+        path = tmp_path / "sub" / "gone.vtt"
+        path.parent.mkdir()
+        path.write_text("WEBVTT\n")
+        stop = asyncio.Event()
+        task = asyncio.create_task(_watcher(tmp_path, on_result).run(stop))
+        await asyncio.sleep(0.1)
+
+        path.unlink()
+        await _wait_for(lambda: results)
+        stop.set()
+        await task
+
+        assert results == [("gone.vtt", "deleted")]
+        mock_remove.assert_awaited_once_with(str(path))
+        mock_ingest.assert_not_called()
+
+    @patch("ingestion.watcher.remove_file", new_callable=AsyncMock)
+    @patch("ingestion.watcher.ingest_file", new_callable=AsyncMock, return_value={"status": "success"})
+    async def test_partial_writes_debounced(self, mock_ingest, mock_remove, tmp_path, handled):
+        results, on_result = handled
+        stop = asyncio.Event()
+        task = asyncio.create_task(_watcher(tmp_path, on_result, debounce_seconds=0.3).run(stop))
+        await asyncio.sleep(0.1)
+
+        path = tmp_path / "slow.vtt"
+        with open(path, "w") as f:
+            for _ in range(6):
+                f.write("WEBVTT\n")
+                f.flush()
+                await asyncio.sleep(0.1)
+        await _wait_for(lambda: results)
+        await asyncio.sleep(0.4)
+        stop.set()
+        await task
+
+        # Ingested once, after the last write
+        mock_ingest.assert_awaited_once_with(str(path))
+
+    @patch("ingestion.watcher.remove_file", new_callable=AsyncMock)
+    @patch("ingestion.watcher.ingest_file", new_callable=AsyncMock)
+    async def test_changed_while_running_is_rerun(self, mock_ingest, mock_remove, tmp_path, handled):
+        results, on_result = handled
+        release = asyncio.Event()
+        calls = []
+
+        async def slow_ingest(path):
+            calls.append(path)
+            if len(calls) == 1:
+                await release.wait()
+            return {"status": "success"}
+
+        mock_ingest.side_effect = slow_ingest
+        path = tmp_path / "ep.vtt"
+        path.write_text("WEBVTT\n")
+        watcher = _watcher(tmp_path, on_result, debounce_seconds=0)
+
+        watcher.notice({str(path)})
+        watcher.dispatch_settled()
+        await _wait_for(lambda: calls)
+
+        watcher.notice({str(path)})
+        watcher.dispatch_settled()
+        await asyncio.sleep(0.05)
+        assert len(calls) == 1
+
+        release.set()
+        await _wait_for(lambda: len(results) == 1)
+        watcher.dispatch_settled()
+        await _wait_for(lambda: len(results) == 2)
+        assert len(calls) == 2
+
+    @patch("ingestion.watcher.remove_file", new_callable=AsyncMock)
+    @patch("ingestion.watcher.ingest_file", new_callable=AsyncMock, side_effect=RuntimeError("boom"))
+    async def test_failure_does_not_stop_watcher(self, mock_ingest, mock_remove, tmp_path, handled):
+        results, on_result = handled
+        path = tmp_path / "bad.vtt"
+        path.write_text("WEBVTT\n")
+        watcher = _watcher(tmp_path, on_result, debounce_seconds=0)
+
+        watcher.notice({str(path)})
+        watcher.dispatch_settled()
+        await _wait_for(lambda: mock_ingest.await_count == 1)
+        await _wait_for(lambda: not watcher._running)
+        assert results == []
+
+
+class TestWatchCommand:
+    def test_parser(self):
+        from ingestion.cli import build_parser
+
+        args = build_parser().parse_args(["watch", "/data", "--poll", "--debounce", "5"])
+        assert args.directory == "/data"
+        assert args.poll is True
+        assert args.debounce == 5.0
+        assert args.scan_on_start is False
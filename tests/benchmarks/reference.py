@@ -0,0 +1,58 @@
+"""
+The metadata word split and chunker as they were before transcripts were
+tokenized once (ingestion.transcript), kept to check the tokenized stages
+against and to time them side by side.
+"""
+import random
+
+from ingestion.chunker import chunk_segments
+from ingestion.transcript import tokenize
+from ingestion.vtt_parser import Cue
+
+
+def reference_stages(segments: list[Cue], chunk_size: int = 500, overlap: int = 50) -> tuple:
+    """Metadata intro/outro and chunks by splitting every segment's text and copying word lists."""
+    words = " ".join(seg.text for seg in segments).split()
+    intro = " ".join(words[:2000])
+    outro = " ".join(words[-500:]) if len(words) > 500 else ""
+
+    chunks = []
+    current_words, current_start, current_end, current_speaker = [], 0.0, 0.0, ""
+    for segment in segments:
+        seg_words = segment.text.split()
+        speaker = segment.speaker or current_speaker
+        if not current_words:
+            current_start = segment.start_time
+            current_speaker = speaker
+        if len(current_words) + len(seg_words) > chunk_size and current_words:
+            chunks.append((" ".join(current_words), current_speaker, current_start, current_end))
+            current_words = current_words[-overlap:] if len(current_words) > overlap else current_words
+            current_start = segment.start_time
+        current_words.extend(seg_words)
+        current_end = segment.end_time
+        current_speaker = speaker
+    if current_words:
+        chunks.append((" ".join(current_words), current_speaker, current_start, current_end))
+    return intro, outro, chunks
+
+
+def tokenized_stages(segments: list[Cue], metadata: dict) -> tuple:
+    """The same outputs from one tokenized transcript, as the pipeline computes them now."""
+    transcript = tokenize(segments)
+    intro = transcript.text(0, 2000)
+    outro = transcript.text(transcript.word_count - 500, transcript.word_count)
+    chunks = chunk_segments(segments, "ep", metadata, transcript=transcript)
+    return intro, outro, [(c.text, c.speaker, c.start_time, c.end_time) for c in chunks]
+
+
+def long_transcript(hours: float = 5, seed: int = 7) -> list[Cue]:
+    """About 150 words per minute for `hours`, in sentence-sized segments with mixed speakers."""
+    rng = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(2000)]
+    segments, t = [], 0.0
+    while t < hours * 3600:
+        n = rng.randint(3, 25)
+        duration = n / 2.5
+        segments.append(Cue(t, t + duration, " ".join(rng.choices(vocabulary, k=n)), rng.choice(["", "Host", "Guest"])))
+        t += duration
+    return segments
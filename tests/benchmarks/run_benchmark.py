@@ -0,0 +1,252 @@
+"""
+Ingestion throughput benchmark.
+
+Generates synthetic VTT files and runs each ingestion stage against stubbed
+LLM and Typesense backends with configurable latency, reporting per-stage
+throughput and peak memory as JSON.
+
+    cd tests
+    python -m benchmarks.run_benchmark --episodes 4 --minutes 60 --output report.json
+    python -m benchmarks.run_benchmark --baseline report.json   # exit 1 on regression
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import ExitStack
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "api"))
+
+from config import Config  # noqa: E402
+from ingestion.chunker import chunk_segments  # noqa: E402
+from ingestion.dedup import SignatureIndex  # noqa: E402
+from ingestion.pipeline import _write_chunks, ingest_directory  # noqa: E402
+from ingestion.speaker_detector import detect_speakers  # noqa: E402
+from ingestion.vtt_parser import parse_vtt  # noqa: E402
+
+from benchmarks.reference import long_transcript, reference_stages, tokenized_stages  # noqa: E402
+from benchmarks.stubs import StubLLM, StubTypesenseClient  # noqa: E402
+from benchmarks.synthetic import write_synthetic_episodes  # noqa: E402
+
+REPORT_VERSION = 1
+
+
+async def _measure(run, track_memory: bool) -> dict:
+    """Time one run of a stage, then repeat it under tracemalloc for its peak memory."""
+    started = time.perf_counter()
+    items = await run()
+    seconds = time.perf_counter() - started
+
+    peak_mb = None
+    if track_memory:
+        tracemalloc.start()
+        try:
+            await run()
+            peak_mb = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 3)
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "items": items,
+        "seconds": round(seconds, 4),
+        "per_second": round(items / seconds, 2) if seconds else None,
+        "peak_mb": peak_mb,
+    }
+
+
+def _stubbed_backends(llm: StubLLM, typesense_latency: float) -> ExitStack:
+    """Patch the LLM, Typesense and on-disk caches for a benchmark run."""
+    stack = ExitStack()
+    stack.enter_context(patch("ingestion.speaker_detector.get_llm", lambda *args, **kwargs: llm))
+    stack.enter_context(patch("ingestion.metadata_extractor.get_llm", lambda *args, **kwargs: llm))
+    stack.enter_context(patch(
+        "ingestion.pipeline._get_typesense_client",
+        lambda: StubTypesenseClient(typesense_latency),
+    ))
+    stack.enter_context(patch.object(Config, "LLM_CACHE_ENABLED", False))
+    stack.enter_context(patch.object(Config, "ARTIFACTS_ENABLED", False))
+    stack.enter_context(patch.object(Config, "EMBEDDING_MODE", "typesense"))
+    return stack
+
+
+async def run_benchmark(
+    episodes: int = 2,
+    minutes: float = 30,
+    llm_latency: float = 0.05,
+    typesense_latency: float = 0.005,
+    concurrency: int | None = None,
+    track_memory: bool = True,
+    directory: str | None = None,
+    transcript_hours: float = 5,
+) -> dict:
+    """
+    Run every stage over `episodes` synthetic files and return the report.
+
+    Stages: parse (cues/s), speakers (cues/s), chunk (chunks/s), upsert
+    (chunks/s through the Typesense write path) and end_to_end (episodes/s
+    through ingest_directory, including metadata extraction). The
+    transcript_reference and transcript_tokenized stages (words/s) time
+    the metadata word split and chunking of one `transcript_hours` long
+    transcript before and after tokenizing it once.
+    """
+    with ExitStack() as cleanup:
+        if directory is None:
+            directory = cleanup.enter_context(tempfile.TemporaryDirectory())
+        paths = write_synthetic_episodes(directory, episodes, minutes)
+        llm = StubLLM(llm_latency)
+        cleanup.enter_context(_stubbed_backends(llm, typesense_latency))
+        # A fresh signature index per run, so earlier runs' chunks are not flagged as duplicates
+        dedup_path = os.path.join(cleanup.enter_context(tempfile.TemporaryDirectory()), "dedup.sqlite3")
+        cleanup.enter_context(patch(
+            "ingestion.pipeline.get_dedup_index",
+            lambda: SignatureIndex(dedup_path, Config.DEDUP_THRESHOLD),
+        ))
+
+        parsed = {path: parse_vtt(path) for path in paths}
+        long_segments = long_transcript(transcript_hours)
+        long_words = sum(len(seg.text.split()) for seg in long_segments)
+        labeled = {}
+        chunked = {}
+
+        async def parse():
+            return sum(len(parse_vtt(path)) for path in paths)
+
+        async def speakers():
+            for path in paths:
+                labeled[path] = await detect_speakers(parsed[path], "Guest")
+            return sum(len(segments) for segments in labeled.values())
+
+        async def chunk():
+            for path in paths:
+                chunked[path] = chunk_segments(labeled[path], os.path.basename(path), {})
+            return sum(len(chunks) for chunks in chunked.values())
+
+        async def upsert():
+            client = StubTypesenseClient(typesense_latency)
+            written = 0
+            for path in paths:
+                result = await _write_chunks(client, os.path.basename(path), chunked[path], replace=False)
+                written += result["written"]
+            return written
+
+        async def transcript_reference():
+            reference_stages(long_segments)
+            return long_words
+
+        async def transcript_tokenized():
+            tokenized_stages(long_segments, {})
+            return long_words
+
+        async def end_to_end():
+            result = await ingest_directory(directory, force=True, concurrency=concurrency)
+            return result["episodes_processed"]
+
+        stages = {}
+        for name, unit, run in (
+            ("parse", "cues", parse),
+            ("speakers", "cues", speakers),
+            ("chunk", "chunks", chunk),
+            ("upsert", "chunks", upsert),
+            ("transcript_reference", "words", transcript_reference),
+            ("transcript_tokenized", "words", transcript_tokenized),
+            ("end_to_end", "episodes", end_to_end),
+        ):
+            calls_before = llm.calls
+            stages[name] = {"unit": unit, **await _measure(run, track_memory)}
+            if name in ("speakers", "end_to_end"):
+                stages[name]["llm_calls"] = (llm.calls - calls_before) // (2 if track_memory else 1)
+
+    return {
+        "version": REPORT_VERSION,
+        "config": {
+            "episodes": episodes,
+            "minutes": minutes,
+            "llm_latency": llm_latency,
+            "typesense_latency": typesense_latency,
+            "concurrency": concurrency or Config.INGEST_CONCURRENCY,
+            "transcript_hours": transcript_hours,
+            "words": sum(len(seg.text.split()) for segments in parsed.values() for seg in segments),
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "stages": stages,
+    }
+
+
+def compare_reports(baseline: dict, current: dict, tolerance: float = 0.2) -> list[str]:
+    """
+    List regressions between two reports.
+
+    A stage regresses when its throughput falls, or its peak memory grows,
+    by more than `tolerance` (a fraction) relative to the baseline.
+    """
+    regressions = []
+    for name, before in baseline.get("stages", {}).items():
+        after = current.get("stages", {}).get(name)
+        if after is None:
+            continue
+        if before.get("per_second") and after.get("per_second") is not None:
+            if after["per_second"] < before["per_second"] * (1 - tolerance):
+                regressions.append(
+                    f"{name}: {after['per_second']} {after['unit']}/s vs baseline {before['per_second']}"
+                )
+        if before.get("peak_mb") and after.get("peak_mb") is not None:
+            if after["peak_mb"] > before["peak_mb"] * (1 + tolerance):
+                regressions.append(f"{name}: peak {after['peak_mb']} MB vs baseline {before['peak_mb']} MB")
+    return regressions
+
+
+def _print_summary(report: dict) -> None:
+    for name, stage in report["stages"].items():
+        peak = f"{stage['peak_mb']:>8.2f} MB" if stage["peak_mb"] is not None else "       - MB"
+        print(f"{name:<20} {stage['items']:>8} {stage['unit']:<8} {stage['seconds']:>9.3f}s "
+              f"{stage['per_second']:>12} /s  peak {peak}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark ingestion throughput against stubbed backends.")
+    parser.add_argument("--episodes", type=int, default=2)
+    parser.add_argument("--minutes", type=float, default=30, help="length of each synthetic episode")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per stub LLM call")
+    parser.add_argument("--typesense-latency", type=float, default=0.005, help="seconds per stub Typesense request")
+    parser.add_argument("--concurrency", type=int, default=None, help="episodes in flight for end_to_end")
+    parser.add_argument("--transcript-hours", type=float, default=5, help="length of the transcript_* stages' transcript")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="compare against this JSON report; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_benchmark(
+        episodes=args.episodes,
+        minutes=args.minutes,
+        llm_latency=args.llm_latency,
+        typesense_latency=args.typesense_latency,
+        concurrency=args.concurrency,
+        transcript_hours=args.transcript_hours,
+        track_memory=not args.no_memory,
+    ))
+    _print_summary(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_reports(json.load(f), report, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
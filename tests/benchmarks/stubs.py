@@ -0,0 +1,111 @@
+import asyncio
+import json
+import re
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+import typesense.exceptions
+
+_SEGMENT_INDEX = re.compile(r"^\[(\d+)\]", re.MULTILINE)
+
+
+class StubLLM:
+    """
+    Stand-in for the ingestion chat model with a fixed per-call latency.
+
+    Answers speaker-detection prompts with a label for every segment index
+    in the prompt, and anything else with a metadata object.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    async def ainvoke(self, prompt, **kwargs):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return SimpleNamespace(content=self._respond(str(prompt)))
+
+    @staticmethod
+    def _respond(prompt: str) -> str:
+        if "Transcript segments:" in prompt:
+            indices = [int(i) for i in _SEGMENT_INDEX.findall(prompt)]
+            speakers = ("Steven Sikash", "Guest")
+            return json.dumps([{"index": i, "speaker": speakers[i % 2], "confidence": 0.9} for i in indices])
+        return json.dumps({
+            "title": "Synthetic Episode",
+            "guest_names": ["Guest"],
+            "host_names": ["Steven Sikash", "Mike Liske"],
+            "industry": "Benchmarking",
+            "topic_tags": ["synthetic"],
+            "summary": "A generated episode.",
+        })
+
+
+class _StubDocument:
+    def __init__(self, documents: "_StubDocuments", doc_id: str):
+        self._documents = documents
+        self._id = doc_id
+
+    def retrieve(self):
+        self._documents.wait()
+        if self._id not in self._documents.store:
+            raise typesense.exceptions.ObjectNotFound("Not found")
+        return self._documents.store[self._id]
+
+    def update(self, fields: dict):
+        self._documents.wait()
+        self._documents.store.setdefault(self._id, {"id": self._id}).update(fields)
+        return self._documents.store[self._id]
+
+
+class _StubDocuments:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.store: dict[str, dict] = {}
+        self.requests = 0
+
+    def wait(self) -> None:
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def __getitem__(self, doc_id: str) -> _StubDocument:
+        return _StubDocument(self, doc_id)
+
+    def upsert(self, doc: dict):
+        self.wait()
+        self.store[doc["id"]] = doc
+        return doc
+
+    def import_(self, documents: list[dict], params=None, batch_size=None):
+        batch_size = batch_size or len(documents) or 1
+        for start in range(0, len(documents), batch_size):
+            self.wait()
+            for doc in documents[start:start + batch_size]:
+                self.store.setdefault(doc["id"], {}).update(doc)
+        return [{"success": True} for _ in documents]
+
+    def search(self, params: dict):
+        self.wait()
+        return {"found": 0, "hits": []}
+
+    def export(self, params=None) -> str:
+        self.wait()
+        return ""
+
+    def delete(self, params: dict):
+        self.wait()
+        return {"num_deleted": 0}
+
+
+class StubTypesenseClient:
+    """In-memory Typesense client covering the calls the ingestion pipeline makes."""
+
+    def __init__(self, latency: float = 0.0):
+        self.collections = defaultdict(lambda: SimpleNamespace(documents=_StubDocuments(latency)))
+
+    @property
+    def requests(self) -> int:
+        return sum(c.documents.requests for c in self.collections.values())
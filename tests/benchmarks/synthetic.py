@@ -0,0 +1,50 @@
+import os
+import random
+
+_VOCABULARY = [f"word{i}" for i in range(3000)]
+_GUESTS = ["Jane Doe", "John Smith", "Maria Garcia", "Wei Chen", "Amara Okafor"]
+
+
+def _timestamp(ms: int) -> str:
+    hours, ms = divmod(ms, 3_600_000)
+    minutes, ms = divmod(ms, 60_000)
+    seconds, ms = divmod(ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{ms:03d}"
+
+
+def synthetic_vtt(minutes: float, seed: int = 0, words_per_minute: int = 150) -> str:
+    """
+    Return WebVTT text for a synthetic episode of about `minutes` minutes.
+
+    Cues are 2-6 seconds of speech at `words_per_minute`. About one cue in
+    three ends a sentence and one sentence in five is a question, so cue
+    merging and speaker heuristics see realistic input.
+    """
+    rng = random.Random(seed)
+    lines = ["WEBVTT", ""]
+    t_ms = 0
+    end_ms = int(minutes * 60_000)
+    index = 1
+    while t_ms < end_ms:
+        duration_ms = rng.randint(2000, 6000)
+        words = rng.choices(_VOCABULARY, k=max(1, duration_ms * words_per_minute // 60_000))
+        text = " ".join(words)
+        if rng.random() < 1 / 3:
+            text += "?" if rng.random() < 0.2 else "."
+        lines += [str(index), f"{_timestamp(t_ms)} --> {_timestamp(t_ms + duration_ms)}", text, ""]
+        t_ms += duration_ms + rng.choice((0, 0, 0, 500, 2500))
+        index += 1
+    return "\n".join(lines)
+
+
+def write_synthetic_episodes(directory: str, episodes: int, minutes: float, seed: int = 0) -> list[str]:
+    """Write `episodes` synthetic VTT files named like real episodes; return their paths."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for n in range(episodes):
+        guest = _GUESTS[n % len(_GUESTS)]
+        path = os.path.join(directory, f"Episode {n + 1} with {guest}.vtt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(synthetic_vtt(minutes, seed=seed + n))
+        paths.append(path)
+    return paths
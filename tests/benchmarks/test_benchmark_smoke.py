@@ -0,0 +1,64 @@
+import json
+import pytest
+
+from benchmarks.run_benchmark import compare_reports, main, run_benchmark
+from benchmarks.synthetic import synthetic_vtt
+
+
+class TestSyntheticVtt:
+    def test_parses_to_requested_length(self, tmp_path):
+        from ingestion.vtt_parser import parse_vtt
+
+        path = tmp_path / "ep.vtt"
+        path.write_text(synthetic_vtt(minutes=5))
+        segments = parse_vtt(str(path))
+        assert segments
+        assert 5 * 60 - 10 <= segments[-1].end_time <= 5 * 60 + 10
+
+    def test_deterministic(self):
+        assert synthetic_vtt(minutes=1, seed=3) == synthetic_vtt(minutes=1, seed=3)
+
+
+class TestRunBenchmark:
+    @pytest.mark.asyncio
+    async def test_report_covers_every_stage(self):
+        report = await run_benchmark(episodes=2, minutes=3, llm_latency=0, typesense_latency=0, transcript_hours=0.2)
+
+        assert set(report["stages"]) == {
+            "parse", "speakers", "chunk", "upsert", "transcript_reference", "transcript_tokenized", "end_to_end",
+        }
+        for stage in report["stages"].values():
+            assert stage["items"] > 0
+            assert stage["per_second"] > 0
+            assert stage["peak_mb"] is not None
+        assert report["stages"]["end_to_end"]["items"] == 2
+        assert report["stages"]["speakers"]["llm_calls"] > 0
+        assert report["stages"]["upsert"]["items"] == report["stages"]["chunk"]["items"]
+        assert report["stages"]["transcript_reference"]["items"] == report["stages"]["transcript_tokenized"]["items"]
+        json.dumps(report)
+
+    def test_cli_writes_report(self, tmp_path, capsys):
+        output = tmp_path / "report.json"
+        args = [
+            "--episodes", "1", "--minutes", "2", "--llm-latency", "0", "--typesense-latency", "0",
+            "--transcript-hours", "0.2", "--no-memory",
+        ]
+        assert main(args + ["--output", str(output)]) == 0
+        report = json.loads(output.read_text())
+        assert report["stages"]["parse"]["peak_mb"] is None
+        assert "parse" in capsys.readouterr().out
+
+
+class TestCompareReports:
+    def _report(self, per_second, peak_mb):
+        return {"stages": {"parse": {"unit": "cues", "per_second": per_second, "peak_mb": peak_mb}}}
+
+    def test_within_tolerance(self):
+        assert compare_reports(self._report(1000, 10), self._report(900, 11)) == []
+
+    def test_throughput_regression(self):
+        regressions = compare_reports(self._report(1000, 10), self._report(500, 10))
+        assert len(regressions) == 1 and regressions[0].startswith("parse")
+
+    def test_memory_regression(self):
+        assert compare_reports(self._report(1000, 10), self._report(1000, 20))
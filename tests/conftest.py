@@ -1,6 +1,52 @@
+import importlib.util
 import sys
 import os
+import pytest
+
+# Keep tests hermetic: never read or write the on-disk LLM cache, artifacts or dedup index
+os.environ["LLM_CACHE_ENABLED"] = "false"
+os.environ["ARTIFACTS_ENABLED"] = "false"
+os.environ["DEDUP_MODE"] = "off"
+# Speaker detection tests script the LLM per segment; heuristic tests opt in
+os.environ["SPEAKER_HEURISTICS_ENABLED"] = "false"
 
 # Add api/ and mcp/ to sys.path so tests can import modules directly
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "api"))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "mcp"))
+
+# Test directory -> service whose config its tests import
+_SERVICES = {"api": "api", "benchmarks": "api", "mcp": "mcp"}
+_configs: dict[str, object] = {}
+
+
+def _use_config(path) -> None:
+    """
+    Make `import config` resolve to the config of the service a test path belongs to.
+
+    api/ and mcp/ both ship a top-level `config`; whichever is in
+    sys.modules when a service module is first imported is the Config it
+    keeps. Tests under tests/api and tests/benchmarks are collected and run
+    with the API's module installed, tests under tests/mcp with the MCP's.
+    """
+    parts = os.path.relpath(path, os.path.dirname(__file__)).split(os.sep)
+    service = _SERVICES.get(parts[0])
+    if service is None:
+        return
+    module = _configs.get(service)
+    if module is None:
+        config_path = os.path.join(os.path.dirname(__file__), "..", service, "config.py")
+        spec = importlib.util.spec_from_file_location(f"{service}_config", config_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _configs[service] = module
+    sys.modules["config"] = module
+
+
+def pytest_collectstart(collector):
+    _use_config(collector.path)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    # Modules first imported inside a test bind the Config current at the time
+    _use_config(item.path)
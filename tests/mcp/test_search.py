@@ -1,5 +1,6 @@
 from unittest.mock import patch, MagicMock
-from tools.search import search_transcripts
+import pytest
+from tools.search import compare_search_modes, search_transcripts
 
 
 MOCK_HITS = {
@@ -47,6 +48,19 @@ class TestSearchTranscripts:
         assert "industry:=Tech" in call_args["filter_by"]
         assert "speaker:=Jane Doe" in call_args["filter_by"]
 
+    @patch("tools.search.get_typesense_client")
+    def test_excludes_boilerplate_by_default(self, mock_client_fn):
+        mock_client = MagicMock()
+        search = mock_client.collections.__getitem__.return_value.documents.search
+        search.return_value = MOCK_HITS
+        mock_client_fn.return_value = mock_client
+
+        search_transcripts("AI")
+        assert search.call_args[0][0]["filter_by"] == "boilerplate:!=true"
+
+        search_transcripts("AI", include_boilerplate=True)
+        assert "filter_by" not in search.call_args[0][0]
+
     @patch("tools.search.get_typesense_client")
     def test_empty_results(self, mock_client_fn):
         mock_client = MagicMock()
@@ -65,3 +79,84 @@ class TestSearchTranscripts:
         search_transcripts("AI", limit=5)
         call_args = mock_client.collections.__getitem__.return_value.documents.search.call_args[0][0]
         assert call_args["per_page"] == 5
+
+
+def _collections(episode_hits, chunk_hits):
+    """Client mock whose episodes and transcript_chunks searches return the given responses."""
+    episodes, chunks = MagicMock(), MagicMock()
+    episodes.documents.search.return_value = episode_hits
+    chunks.documents.search.return_value = chunk_hits
+    client = MagicMock()
+    client.collections.__getitem__ = lambda self, key: {"episodes": episodes, "transcript_chunks": chunks}[key]
+    return client, episodes, chunks
+
+
+def _chunk_hits(*keys):
+    return {
+        "found": len(keys),
+        "out_of": 1000,
+        "search_time_ms": 3,
+        "hits": [{"document": {"text": "t", "episode_id": ep, "chunk_index": i}} for ep, i in keys],
+    }
+
+
+class TestHierarchicalSearch:
+    @patch("tools.search.get_typesense_client")
+    def test_searches_chunks_of_top_episodes(self, mock_client_fn):
+        client, episodes, chunks = _collections(
+            {"hits": [{"document": {"id": "ep-1"}}, {"document": {"id": "ep-2"}}]}, MOCK_HITS,
+        )
+        mock_client_fn.return_value = client
+
+        results = search_transcripts("pricing", mode="hierarchical", top_episodes=2, industry="Tech")
+
+        assert len(results) == 1
+        episode_params = episodes.documents.search.call_args[0][0]
+        assert episode_params["per_page"] == 2
+        assert "embedding" in episode_params["query_by"]
+        assert episode_params["filter_by"] == "industry:=`Tech`"
+        chunk_filter = chunks.documents.search.call_args[0][0]["filter_by"]
+        assert chunk_filter.startswith("episode_id:[`ep-1`,`ep-2`] && ")
+
+    @patch("tools.search.get_typesense_client")
+    def test_no_matching_episodes(self, mock_client_fn):
+        client, _, chunks = _collections({"hits": []}, MOCK_HITS)
+        mock_client_fn.return_value = client
+
+        assert search_transcripts("pricing", mode="hierarchical") == []
+        chunks.documents.search.assert_not_called()
+
+    @patch("tools.search.Config.SEARCH_MODE", "hierarchical")
+    @patch("tools.search.get_typesense_client")
+    def test_default_mode_from_config(self, mock_client_fn):
+        client, episodes, _ = _collections({"hits": [{"document": {"id": "ep-1"}}]}, MOCK_HITS)
+        mock_client_fn.return_value = client
+
+        search_transcripts("pricing")
+        episodes.documents.search.assert_called_once()
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            search_transcripts("pricing", mode="nested")
+
+
+class TestCompareSearchModes:
+    @patch("tools.search.get_typesense_client")
+    def test_reports_candidates_and_recall(self, mock_client_fn):
+        client, _, chunks = _collections({"hits": [{"document": {"id": "ep-1"}}], "search_time_ms": 1}, None)
+        chunks.documents.search.side_effect = [
+            _chunk_hits(("ep-1", 0), ("ep-1", 1), ("ep-2", 0), ("ep-3", 4)),
+            {**_chunk_hits(("ep-1", 0), ("ep-1", 1), ("ep-1", 2)), "found": 40},
+        ]
+        mock_client_fn.return_value = client
+
+        report = compare_search_modes("pricing", limit=4, top_episodes=1)
+
+        assert report["flat"]["candidates"] == 4
+        assert report["hierarchical"]["candidates"] == 40
+        assert report["hierarchical"]["episodes"] == ["ep-1"]
+        assert report["hierarchical"]["search_time_ms"] == 4
+        assert report["flat"]["corpus"] == 1000
+        assert report["recall"] == 0.5
+        assert report["episode_recall"] == 0.5
+        assert report["flat"]["latency_ms"] >= 0
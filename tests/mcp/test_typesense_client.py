@@ -0,0 +1,29 @@
+from unittest.mock import MagicMock
+from utils.typesense_client import ensure_collections
+
+
+class TestEnsureCollections:
+    def test_creates_missing_collections(self):
+        client = MagicMock()
+        client.collections.retrieve.return_value = []
+
+        ensure_collections(client)
+
+        created = [c.args[0]["name"] for c in client.collections.create.call_args_list]
+        assert created == ["episodes", "transcript_chunks"]
+
+    def test_adds_new_fields_to_existing_collection(self):
+        client = MagicMock()
+        client.collections.retrieve.return_value = [
+            {"name": "episodes", "fields": [{"name": "title"}, {"name": "summary"}]},
+            {"name": "transcript_chunks", "fields": []},
+        ]
+
+        ensure_collections(client)
+
+        client.collections.create.assert_not_called()
+        updates = client.collections.__getitem__.return_value.update.call_args_list
+        episode_update = updates[0].args[0]["fields"]
+        added = {f["name"] for f in episode_update}
+        assert "content_hash" in added
+        assert "title" not in added